@@ -46,11 +46,50 @@ for mapping in domain_mapping.split(','):
         if f'www.{domain}' not in ALLOWED_HOSTS:
             ALLOWED_HOSTS.append(f'www.{domain}')
 
-# Thumbnail settings
-THUMBNAIL_SIZE = (256, 256)
+# Thumbnail settings (the admin list and cards without image derivatives)
+THUMBNAIL_SIZE = (300, 300)
 THUMBNAIL_QUALITY = 85  # Good balance between quality and file size
 THUMBNAIL_FORMAT = 'WEBP'  # Use WebP for better compression
 
+# New images get their thumbnail and derivatives from `python manage.py run_worker`
+# instead of inside the request that saved them
+IMAGE_PROCESSING_ASYNC = os.getenv('IMAGE_PROCESSING_ASYNC', 'True') == 'True'
+# Background tasks: failed ones are retried after TASK_RETRY_DELAY seconds,
+# doubling up to TASK_RETRY_MAX_DELAY; a task still running after
+# TASK_LOCK_TIMEOUT seconds is taken to be abandoned and run again
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '5'))
+TASK_RETRY_DELAY = int(os.getenv('TASK_RETRY_DELAY', '30'))
+TASK_RETRY_MAX_DELAY = int(os.getenv('TASK_RETRY_MAX_DELAY', '3600'))
+TASK_LOCK_TIMEOUT = int(os.getenv('TASK_LOCK_TIMEOUT', '600'))
+# Seconds an idle worker waits before looking for tasks again
+TASK_POLL_INTERVAL = float(os.getenv('TASK_POLL_INTERVAL', '2'))
+
+# Generated line art is stored as a gray palette PNG with this many levels
+# (16 keeps smooth edges, 2 is 1-bit); `python manage.py recompress_media`
+# converts existing images
+LINE_ART_OPTIMIZE = os.getenv('LINE_ART_OPTIMIZE', 'True') == 'True'
+LINE_ART_LEVELS = int(os.getenv('LINE_ART_LEVELS', '16'))
+
+# Responsive image derivatives, rendered with {% responsive_image %}; AVIF is
+# written when the pillow-avif-plugin package is installed.
+# `python manage.py build_image_derivatives` builds them for existing pages.
+DERIVATIVE_WIDTHS = (256, 512, 768, 1024)
+DERIVATIVE_FORMATS = ('avif', 'webp', 'png')
+DERIVATIVE_QUALITY = 80
+
+# On-demand transforms at /media/t/<w>x<h>/<format>/<path> ({% image_transform_url %});
+# only these boxes and formats are rendered, into a disk cache bounded with LRU
+TRANSFORM_SIZES = ((200, 200), (256, 256), (400, 400), (512, 512), (800, 800), (1024, 1024))
+TRANSFORM_FORMATS = ('webp', 'png', 'avif')
+TRANSFORM_CACHE_ROOT = os.getenv('TRANSFORM_CACHE_ROOT', os.path.join(BASE_DIR, 'cache', 'transforms'))
+TRANSFORM_CACHE_MAX_BYTES = int(os.getenv('TRANSFORM_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+TRANSFORM_CACHE_RESCAN = 300
+# Renders at a time per gunicorn worker
+TRANSFORM_WORKERS = int(os.getenv('TRANSFORM_WORKERS', '2'))
+
+# Most pages in one ZIP download (/<lang>/pack.zip?ids=... or ?q=...)
+PACK_MAX_PAGES = int(os.getenv('PACK_MAX_PAGES', '24'))
+
 # Application definition
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -213,17 +252,25 @@ AWS_DEFAULT_ACL = 'public-read'
 AWS_S3_FILE_OVERWRITE = False
 AWS_QUERYSTRING_AUTH = False
 
+# Downloads are streamed by the worker unless handed off: 'x-accel-redirect'
+# (nginx, with an internal location for the prefix aliasing MEDIA_ROOT),
+# 'x-sendfile' (Apache/lighttpd) or 'redirect' (to the storage URL)
+MEDIA_DOWNLOAD_OFFLOAD = os.getenv('MEDIA_DOWNLOAD_OFFLOAD', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+# Seconds browsers reuse media files before revalidating; names with a content
+# hash are cached for a year as immutable
+MEDIA_MAX_AGE = int(os.getenv('MEDIA_MAX_AGE', '3600'))
+
 # Use S3 for storage when AWS credentials are provided
 if AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY and AWS_STORAGE_BUCKET_NAME:
     DEFAULT_FILE_STORAGE = 'coloring_pages.storage_backends.MediaStorage'
     STATICFILES_STORAGE = 'coloring_pages.storage_backends.StaticStorage'
+    # Let S3 send the bytes of downloads instead of proxying them
+    MEDIA_DOWNLOAD_OFFLOAD = os.getenv('MEDIA_DOWNLOAD_OFFLOAD', 'redirect')
 
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
-# Thumbnail settings
-THUMBNAIL_SIZE = (300, 300)
-
 # Login URL for admin
 LOGIN_URL = '/admin/login/'
 
@@ -233,3 +280,74 @@ DEFAULT_FROM_EMAIL = 'noreply@ausmalbar.com'
 
 # Mixpanel settings
 MIXPANEL_TOKEN = os.getenv('MIXPANEL_TOKEN')
+
+# Cache configuration
+# Use a cache shared by all workers (Redis, Memcached, ...) in production so the
+# catalog version counter is seen by every gunicorn worker
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Seconds the detail, home and legal pages are cached for anonymous visitors.
+# Entries are invalidated when a page they show is saved or deleted.
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '600'))
+
+# Search settings
+# Dotted path to a search backend class; chosen from the database vendor when empty
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', '')
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', '1000'))
+# Seconds before the in-process trigram and suggestion indexes are rebuilt
+SEARCH_TRIGRAM_INDEX_TTL = int(os.getenv('SEARCH_TRIGRAM_INDEX_TTL', '300'))
+# Seconds between catalog version polls of the in-memory search index
+SEARCH_MEMORY_POLL_INTERVAL = float(os.getenv('SEARCH_MEMORY_POLL_INTERVAL', '2'))
+# Seconds search results are cached (0 disables the cache). Entries are keyed by
+# the catalog version, so with a shared cache they never outlive a page change.
+SEARCH_RESULT_CACHE_TIMEOUT = int(os.getenv('SEARCH_RESULT_CACHE_TIMEOUT', '600'))
+
+# Listing pagination: the first pages get numbered links, deeper pages of the
+# browse listing are fetched with a (created_at, id) cursor. Above the given
+# number of rows PostgreSQL's planner estimate replaces the exact count.
+LISTING_NUMBERED_PAGES = int(os.getenv('LISTING_NUMBERED_PAGES', '10'))
+LISTING_ESTIMATE_COUNT_ABOVE = int(os.getenv('LISTING_ESTIMATE_COUNT_ABOVE', '100000'))
+
+# Search query logging is buffered per worker and written in batches by a
+# background thread (see coloring_pages/search/querylog.py). Lower the sample
+# rate to log only a fraction of the searches under load.
+SEARCH_LOG_BATCH_SIZE = int(os.getenv('SEARCH_LOG_BATCH_SIZE', '200'))
+SEARCH_LOG_FLUSH_INTERVAL = float(os.getenv('SEARCH_LOG_FLUSH_INTERVAL', '10'))
+SEARCH_LOG_DEDUPE_WINDOW = 5 * 60
+SEARCH_LOG_SAMPLE_RATE = float(os.getenv('SEARCH_LOG_SAMPLE_RATE', '1.0'))
+# Seconds the popular searches shown on the empty search page are cached
+SEARCH_POPULAR_CACHE_TIMEOUT = int(os.getenv('SEARCH_POPULAR_CACHE_TIMEOUT', '900'))
+# Search-as-you-type: suggestions per list, seconds the popular queries are
+# kept before being re-read, and how long clients may cache a response
+SEARCH_SUGGEST_LIMIT = 5
+SEARCH_SUGGEST_QUERIES_TTL = int(os.getenv('SEARCH_SUGGEST_QUERIES_TTL', '300'))
+SEARCH_SUGGEST_MAX_AGE = int(os.getenv('SEARCH_SUGGEST_MAX_AGE', '300'))
+# Seconds the bilingual search term map (see `manage.py build_term_map`) is
+# kept in memory before it is re-read
+SEARCH_TERM_MAP_TTL = int(os.getenv('SEARCH_TERM_MAP_TTL', '3600'))
+
+# Related pages ("more like this") from TF-IDF vectors of titles and prompts;
+# rebuild the whole table with `manage.py build_related_pages`
+RELATED_PAGES_COUNT = int(os.getenv('RELATED_PAGES_COUNT', '8'))
+RELATED_PAGES_MIN_SCORE = float(os.getenv('RELATED_PAGES_MIN_SCORE', '0.05'))
+# Ignore terms on more than this share of the pages; they add little to the
+# similarity but make every page a candidate neighbour of every other page
+RELATED_PAGES_MAX_DF = float(os.getenv('RELATED_PAGES_MAX_DF', '0.05'))
+RELATED_PAGES_MAX_TERMS = int(os.getenv('RELATED_PAGES_MAX_TERMS', '30'))
+# Compute the neighbours of new pages in a background thread
+RELATED_PAGES_UPDATE_ON_SAVE = os.getenv('RELATED_PAGES_UPDATE_ON_SAVE', 'True') == 'True'
+
+# Warn on the confirm page when a generated image is within this many bits
+# (of 64) of the perceptual hash of a catalog page
+DUPLICATE_IMAGE_MAX_DISTANCE = int(os.getenv('DUPLICATE_IMAGE_MAX_DISTANCE', '8'))
+DUPLICATE_IMAGE_LIMIT = int(os.getenv('DUPLICATE_IMAGE_LIMIT', '5'))
+
+# Before generating, offer pages whose prompts are at least this similar
+# (IDF-weighted Jaccard of word stems and stem pairs)
+PROMPT_SIMILARITY_THRESHOLD = float(os.getenv('PROMPT_SIMILARITY_THRESHOLD', '0.5'))
+PROMPT_SIMILARITY_LIMIT = int(os.getenv('PROMPT_SIMILARITY_LIMIT', '5'))
@@ -8,6 +8,8 @@ from django.conf.urls.i18n import i18n_patterns
 from django.views.static import serve
 import os
 
+from coloring_pages.serving import serve_media
+from coloring_pages.transforms import transform_image
 from coloring_pages.sitemaps import sitemaps
 from coloring_pages.views import sitemap
 from coloring_pages.views.robots import robots
@@ -42,12 +44,12 @@ urlpatterns += [
     path('i18n/', include('django.conf.urls.i18n')),
 ]
 
-# Serve media files in both development and production
-from django.views.static import serve
-
-# Serve media files
+# Serve media files in both development and production (ETags, immutable
+# hashed names, precompressed variants; see coloring_pages/serving.py)
 urlpatterns += [
-    path(f'{settings.MEDIA_URL.strip("/")}/<path:path>', serve, {'document_root': settings.MEDIA_ROOT}),
+    path(f'{settings.MEDIA_URL.strip("/")}/t/<int:width>x<int:height>/<str:fmt>/<path:path>',
+         transform_image, name='media_transform'),
+    path(f'{settings.MEDIA_URL.strip("/")}/<path:path>', serve_media, name='media'),
 ]
 
 # Serve static files in development
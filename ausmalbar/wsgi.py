@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ausmalbar.settings')
 
 application = get_wsgi_application()
+
+# Build the in-memory search index in each worker before it takes requests
+from coloring_pages.search.memory import warm_up_search_index
+
+warm_up_search_index()
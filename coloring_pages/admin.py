@@ -3,14 +3,17 @@ from django.utils.translation import gettext_lazy as _
 from .models.coloring_page import ColoringPage
 from .models.search import SearchQuery
 from .models.system_prompt import SystemPrompt
+from .models.task import Task
 from .views.admin.coloring_page import ColoringPageAdmin
 from .views.admin.search import SearchQueryAdmin
 from .views.admin.system_prompt import SystemPromptAdmin
+from .views.admin.task import TaskAdmin
 
 # Register models with their respective admin classes
 admin.site.register(ColoringPage, ColoringPageAdmin)
 admin.site.register(SearchQuery, SearchQueryAdmin)
 admin.site.register(SystemPrompt, SystemPromptAdmin)
+admin.site.register(Task, TaskAdmin)
 
 # Admin site configuration
 admin.site.site_header = 'Ausmalbar Administration'
@@ -1,5 +1,40 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 class ColoringPagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'coloring_pages'
+
+    def ready(self):
+        from .catalog import catalog_changed, page_deleted, page_saved
+        from .models.coloring_page import ColoringPage
+        from .pagecache import page_changed
+        from .search.backends import ensure_search_schema
+        from .search.duplicates import duplicate_index
+        from .search.memory import engine
+        from .search.prompts import engine as prompt_engine
+        from .search.related import page_created
+        from .search.suggest import engine as suggest_engine
+        from .search.trigram import page_index
+
+        # Install the search indexes that live outside the Django model
+        post_migrate.connect(ensure_search_schema, sender=self)
+
+        # Rebuild this worker's trigram index after catalog changes
+        post_save.connect(page_index.invalidate, sender=ColoringPage)
+        post_delete.connect(page_index.invalidate, sender=ColoringPage)
+
+        # Count catalog changes so other workers can catch up
+        post_save.connect(page_saved, sender=ColoringPage)
+        post_delete.connect(page_deleted, sender=ColoringPage)
+        catalog_changed.connect(engine.expire_poll)
+        catalog_changed.connect(suggest_engine.expire_poll)
+        catalog_changed.connect(duplicate_index.expire_poll)
+        catalog_changed.connect(prompt_engine.expire_poll)
+
+        # Compute the related pages of new pages
+        post_save.connect(page_created, sender=ColoringPage)
+
+        # Invalidate the cached pages of anonymous visitors that show a page
+        post_save.connect(page_changed, sender=ColoringPage)
+        post_delete.connect(page_changed, sender=ColoringPage)
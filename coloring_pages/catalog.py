@@ -0,0 +1,87 @@
+"""
+Catalog generation counter shared by all workers.
+
+Every committed ``ColoringPage`` save or delete bumps a version number in the
+Django cache and records which page changed under that version. Workers that
+keep derived data in memory (e.g. the in-memory search index) poll the
+version and replay the recorded changes to catch up.
+
+The counter only spans workers when the default cache is shared between them
+(Redis, Memcached, ...). With a per-process cache each worker only sees its
+own writes.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import Signal
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_CHANGE_KEY = 'catalog:change:%d'
+# How long individual changes are kept for lagging workers to replay
+CATALOG_CHANGE_TIMEOUT = 60 * 60
+
+# Sent in the writing worker after a change was committed and counted
+catalog_changed = Signal()
+
+
+def get_catalog_version():
+    """
+    Get the current catalog version.
+
+    Returns:
+        int: The version, 0 if nothing has changed since the cache was cleared
+    """
+    return cache.get(CATALOG_VERSION_KEY) or 0
+
+
+def bump_catalog_version(pk, deleted=False):
+    """
+    Increment the catalog version and record the changed page under it.
+
+    Args:
+        pk: The primary key of the page that changed
+        deleted: Whether the page was deleted
+
+    Returns:
+        int: The new version, or None if the cache cannot count
+    """
+    cache.add(CATALOG_VERSION_KEY, 0, timeout=None)
+    try:
+        version = cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # The dummy cache never stores the counter
+        return None
+    cache.set(CATALOG_CHANGE_KEY % version, (pk, deleted), timeout=CATALOG_CHANGE_TIMEOUT)
+    catalog_changed.send(sender=None, pk=pk, deleted=deleted, version=version)
+    return version
+
+
+def get_catalog_changes(since, until):
+    """
+    Get the changes recorded after version ``since`` up to version ``until``.
+
+    Args:
+        since: The last version the caller has applied
+        until: The version to catch up to
+
+    Returns:
+        list: ``(pk, deleted)`` tuples in version order, or None if some of
+        the changes have already expired
+    """
+    keys = [CATALOG_CHANGE_KEY % version for version in range(since + 1, until + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return None
+    return [changes[key] for key in keys]
+
+
+def page_saved(sender, instance, **kwargs):
+    """post_save handler that bumps the catalog version once committed."""
+    pk = instance.pk
+    transaction.on_commit(lambda: bump_catalog_version(pk))
+
+
+def page_deleted(sender, instance, **kwargs):
+    """post_delete handler that bumps the catalog version once committed."""
+    # The instance loses its pk after delete(), so capture it now
+    pk = instance.pk
+    transaction.on_commit(lambda: bump_catalog_version(pk, deleted=True))
@@ -0,0 +1,184 @@
+"""
+Responsive image derivatives of the coloring pages.
+
+When a page gets a new image, it is resized to each of ``DERIVATIVE_WIDTHS``
+(never upscaled) and encoded as WebP, PNG and, with the ``pillow-avif-plugin``
+package installed, AVIF. The files are named after a hash of the original,
+e.g. ``coloring_pages/derivatives/cat-512.3f2a9c1b04de.webp``, so they can be
+cached as immutable (see ``coloring_pages.serving``).
+
+What was built is recorded in ``ColoringPage.derivatives`` as a compact
+manifest from which every URL can be derived::
+
+    {'n': 'cat', 'k': '3f2a9c1b04de', 'w': [256, 512, 768, 1024],
+     'f': ['avif', 'webp', 'png'], 's': [1024, 1024]}
+
+The ``{% responsive_image %}`` tag (``templatetags/images.py``) renders it as
+a ``<picture>`` with ``srcset``, so a phone loads a 512px WebP of a few dozen
+KB instead of the full-size PNG.
+
+``build_placeholder()`` adds the image's size and a 16px WebP as a data URI,
+about 150 bytes, to ``ColoringPage.metadata['placeholder']``. The tag sets
+them as ``width``/``height`` and as the inline background of the ``<img>``,
+so the box is reserved and shows a blurred preview in the first paint,
+without another request.
+"""
+import base64
+import hashlib
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from .lineart import flatten
+
+try:
+    # Registers the AVIF codec with Pillow < 11
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_DIR = 'coloring_pages/derivatives'
+# Preferred first; browsers take the first <source> type they support
+FORMATS = ('avif', 'webp', 'png')
+PLACEHOLDER_SIZE = 16
+CONTENT_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'png': 'image/png'}
+
+
+def can_encode(fmt):
+    """
+    Whether Pillow can write a format here.
+    """
+    plugin = Image.registered_extensions().get(f'.{fmt}')
+    return plugin is not None and plugin in Image.SAVE
+
+
+def available_formats():
+    """
+    The configured formats Pillow can write here.
+    """
+    formats = getattr(settings, 'DERIVATIVE_FORMATS', FORMATS)
+    return [fmt for fmt in FORMATS if fmt in formats and can_encode(fmt)]
+
+
+def derivative_name(manifest, width, fmt):
+    return f'{DERIVATIVE_DIR}/{manifest["n"]}-{width}.{manifest["k"]}.{fmt}'
+
+
+def derivative_names(manifest):
+    return [derivative_name(manifest, width, fmt) for width in manifest.get('w', ()) for fmt in manifest.get('f', ())]
+
+
+def derivative_height(manifest, width):
+    original_width, original_height = manifest['s']
+    return max(1, round(original_height * width / original_width))
+
+
+def to_line_art(img):
+    """
+    Flatten transparency onto white paper and drop the colour channels.
+    """
+    return flatten(img).convert('L')
+
+
+def encode(img, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'png':
+        img.save(buffer, format='PNG', optimize=True)
+    elif fmt == 'webp':
+        img.save(buffer, format='WEBP', quality=getattr(settings, 'DERIVATIVE_QUALITY', 80), method=6)
+    else:
+        img.save(buffer, format='AVIF', quality=getattr(settings, 'DERIVATIVE_QUALITY', 80) - 20)
+    return buffer.getvalue()
+
+
+def build_derivatives(image_file, storage):
+    """
+    Write the derivatives of an image to storage.
+
+    Args:
+        image_file: The original image, a file or ``FieldFile``
+        storage: Storage to write the derivatives to
+
+    Returns:
+        dict: The manifest to store in ``ColoringPage.derivatives``
+    """
+    image_file.seek(0)
+    data = image_file.read()
+    image_file.seek(0)
+    stem = os.path.splitext(os.path.basename(image_file.name))[0]
+    manifest = {
+        'n': stem,
+        'k': hashlib.sha1(data).hexdigest()[:12],
+        'w': [],
+        'f': available_formats(),
+    }
+    with Image.open(io.BytesIO(data)) as img:
+        img = to_line_art(img)
+        manifest['s'] = list(img.size)
+        widths = sorted({width for width in settings.DERIVATIVE_WIDTHS if width < img.width} | {
+            min(img.width, max(settings.DERIVATIVE_WIDTHS))
+        })
+        for width in widths:
+            resized = img if width == img.width else img.resize(
+                (width, derivative_height(manifest, width)), Image.Resampling.LANCZOS
+            )
+            for fmt in manifest['f']:
+                name = derivative_name(manifest, width, fmt)
+                if storage.exists(name):
+                    # Same original, same hash: built before
+                    continue
+                storage.save(name, ContentFile(encode(resized, fmt)))
+            manifest['w'].append(width)
+    return manifest
+
+
+def build_placeholder(img):
+    """
+    Get the size of an image and a tiny preview of it.
+
+    Returns:
+        dict: ``width``, ``height`` and ``uri``, a ``data:`` URI to store in
+        ``ColoringPage.metadata['placeholder']``
+    """
+    width, height = img.size
+    preview = to_line_art(img)
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+    buffer = io.BytesIO()
+    if can_encode('webp'):
+        preview.save(buffer, format='WEBP', quality=40, method=6)
+        content_type = 'image/webp'
+    else:
+        preview.save(buffer, format='PNG', optimize=True)
+        content_type = 'image/png'
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return {'width': width, 'height': height, 'uri': f'data:{content_type};base64,{encoded}'}
+
+
+def delete_derivatives(manifest, storage):
+    for name in derivative_names(manifest or {}):
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.warning('Could not delete derivative %s: %s', name, e)
+
+
+def get_sources(manifest, storage):
+    """
+    Get the ``srcset`` of each format of a manifest.
+
+    Returns:
+        list: ``(format, content type, srcset)`` tuples, preferred first
+    """
+    sources = []
+    for fmt in manifest['f']:
+        srcset = ', '.join(
+            f'{storage.url(derivative_name(manifest, width, fmt))} {width}w' for width in manifest['w']
+        )
+        sources.append((fmt, CONTENT_TYPES[fmt], srcset))
+    return sources
@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from coloring_pages.search.duplicates import MultiIndexHash, to_signed
+
+
+class Command(BaseCommand):
+    help = 'Measure build time and lookup latency of the near-duplicate image index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, nargs='+', default=[10000, 100000],
+            help='Catalog sizes to benchmark (default: 10000 100000)'
+        )
+        parser.add_argument('--radius', type=int, default=8, help='Hamming distance searched')
+        parser.add_argument('--variants', type=int, default=4, help='Near-identical images per motif')
+        parser.add_argument('--lookups', type=int, default=2000, help='Number of timed lookups')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def flip(self, rng, value, bits):
+        for bit in rng.sample(range(64), bits):
+            value ^= 1 << bit
+        return value
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        self.stdout.write(f'{"pages":>10} {"build":>10} {"p50":>10} {"p99":>10} {"max":>10}')
+        for pages in options['pages']:
+            # Repeated prompts produce clusters of similar images
+            hashes = []
+            while len(hashes) < pages:
+                motif = rng.getrandbits(64)
+                hashes.extend(self.flip(rng, motif, rng.randint(0, 6)) for _ in range(options['variants']))
+            hashes = [to_signed(value) for value in hashes[:pages]]
+
+            started = time.perf_counter()
+            tree = MultiIndexHash()
+            for pk, value in enumerate(hashes, 1):
+                tree.add(value, pk)
+            build_time = time.perf_counter() - started
+
+            # Half the lookups are near a stored image, half are new motifs
+            queries = [
+                to_signed(self.flip(rng, rng.choice(hashes) & (2 ** 64 - 1), rng.randint(0, 4)))
+                if i % 2 else rng.getrandbits(64)
+                for i in range(options['lookups'])
+            ]
+            timings = []
+            for value in queries:
+                started = time.perf_counter()
+                tree.search(value, options['radius'])
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+            self.stdout.write(
+                f'{pages:>10,} {build_time:>8.1f} s {p50 * 1000:>7.3f} ms '
+                f'{p99 * 1000:>7.3f} ms {timings[-1] * 1000:>7.3f} ms'
+            )
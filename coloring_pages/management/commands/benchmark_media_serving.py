@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.cache import close_caches
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.test import RequestFactory, override_settings
+from django.views.static import serve
+
+from coloring_pages.serving import media_index, serve_media
+
+
+def consume(response, sink):
+    file = getattr(response, 'file_to_stream', None)
+    if file is not None and hasattr(file, 'fileno'):
+        # What gunicorn's wsgi.file_wrapper does
+        os.sendfile(sink, file.fileno(), 0, os.fstat(file.fileno()).st_size)
+    elif response.streaming:
+        for _chunk in response.streaming_content:
+            pass
+    response.close()
+
+
+class Command(BaseCommand):
+    help = 'Compare the throughput of django.views.static.serve and serve_media'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=2000, help='Number of media files')
+        parser.add_argument('--size', type=int, default=200 * 1024, help='Bytes per file')
+        parser.add_argument('--requests', type=int, default=20000, help='Requests per measurement')
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp()
+        try:
+            names = []
+            payload = os.urandom(options['size'])
+            for number in range(options['files']):
+                name = f'coloring_pages/page_{number}.png'
+                os.makedirs(os.path.join(media_root, os.path.dirname(name)), exist_ok=True)
+                with open(os.path.join(media_root, name), 'wb') as file:
+                    file.write(payload)
+                names.append(name)
+
+            # Measure the views, not the end-of-request housekeeping
+            request_finished.disconnect(close_old_connections)
+            request_finished.disconnect(close_caches)
+            with override_settings(MEDIA_ROOT=media_root, MEDIA_DOWNLOAD_OFFLOAD=''), open(os.devnull, 'wb') as sink:
+                self.sink = sink.fileno()
+                media_index.entries.clear()
+                self.stdout.write(f'{"":<16} {"serve":>12} {"serve_media":>12} {"x-accel":>12}')
+                for label, conditional in (('full GET', False), ('revalidation', True)):
+                    rates = [
+                        self.measure(lambda request, path: serve(request, path, document_root=media_root),
+                                     names, options['requests'], conditional),
+                        self.measure(serve_media, names, options['requests'], conditional),
+                    ]
+                    # nginx sends the bytes; the worker only answers the request
+                    with override_settings(MEDIA_DOWNLOAD_OFFLOAD='x-accel-redirect'):
+                        rates.append(self.measure(serve_media, names, options['requests'], conditional))
+                    self.stdout.write(f'{label:<16} ' + ' '.join(f'{rate:>10,.0f}/s' for rate in rates))
+        finally:
+            request_finished.connect(close_old_connections)
+            request_finished.connect(close_caches)
+            shutil.rmtree(media_root, ignore_errors=True)
+        self.stdout.write(self.style.SUCCESS('Done'))
+
+    def measure(self, view, names, requests, conditional):
+        factory = RequestFactory()
+        validators = {}
+        for name in names:
+            response = view(factory.get('/media/' + name), name)
+            # serve() only knows Last-Modified
+            validators[name] = (
+                {'HTTP_IF_NONE_MATCH': response['ETag']} if response.has_header('ETag')
+                else {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}
+            )
+            consume(response, self.sink)
+
+        requests = [
+            (factory.get('/media/' + name, **(validators[name] if conditional else {})), name)
+            for name in (names[number % len(names)] for number in range(requests))
+        ]
+        started = time.perf_counter()
+        for request, name in requests:
+            response = view(request, name)
+            consume(response, self.sink)
+        return len(requests) / (time.perf_counter() - started)
@@ -0,0 +1,57 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from coloring_pages.search.prompts import PromptIndex
+
+
+class Command(BaseCommand):
+    help = 'Measure build time and lookup latency of the similar prompt index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, nargs='+', default=[10000, 100000],
+            help='Catalog sizes to benchmark (default: 10000 100000)'
+        )
+        parser.add_argument('--vocabulary', type=int, default=20000, help='Number of distinct words')
+        parser.add_argument('--lookups', type=int, default=2000, help='Number of timed lookups')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+            for _ in range(options['vocabulary'])
+        ]
+        # Word frequencies follow Zipf's law, as in real prompts
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+        self.stdout.write(f'{"pages":>10} {"build":>10} {"p50":>10} {"p99":>10} {"max":>10}')
+        for pages in options['pages']:
+            prompts = [' '.join(rng.choices(vocabulary, weights, k=20)) for _ in range(pages)]
+
+            started = time.perf_counter()
+            index = PromptIndex()
+            for pk, prompt in enumerate(prompts, 1):
+                index.add(pk, prompt)
+            build_time = time.perf_counter() - started
+
+            # Half the lookups are edits of an existing prompt, half are new
+            queries = []
+            for i in range(options['lookups']):
+                words = rng.choice(prompts).split() if i % 2 else rng.choices(vocabulary, weights, k=20)
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+                queries.append(' '.join(words))
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                index.search(query)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+            self.stdout.write(
+                f'{pages:>10,} {build_time:>8.1f} s {p50 * 1000:>7.3f} ms '
+                f'{p99 * 1000:>7.3f} ms {timings[-1] * 1000:>7.3f} ms'
+            )
@@ -0,0 +1,51 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from coloring_pages.search.related import TfidfMatrix, page_terms
+
+
+class Command(BaseCommand):
+    help = 'Measure the TF-IDF matrix build and the related pages job on a synthetic catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, nargs='+', default=[10000, 100000],
+            help='Catalog sizes to benchmark (default: 10000 100000)'
+        )
+        parser.add_argument('--vocabulary', type=int, default=20000, help='Number of distinct words')
+        parser.add_argument('--neighbours', type=int, default=8, help='Related pages per page')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+            for _ in range(options['vocabulary'])
+        ]
+        # Word frequencies follow Zipf's law, as in real prompts
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+        def words(count):
+            return ' '.join(rng.choices(vocabulary, weights, k=count))
+
+        self.stdout.write(f'{"pages":>10} {"matrix":>10} {"neighbours":>12} {"per page":>10} {"memory":>10}')
+        for pages in options['pages']:
+            documents = [page_terms(words(4), words(4), words(20)) for _ in range(pages)]
+            ids = list(range(1, pages + 1))
+
+            started = time.perf_counter()
+            matrix = TfidfMatrix(ids, documents)
+            build_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for pk in ids:
+                matrix.neighbours(pk, options['neighbours'], min_score=0.05)
+            job_time = time.perf_counter() - started
+
+            self.stdout.write(
+                f'{pages:>10,} {build_time:>8.1f} s {job_time:>10.1f} s '
+                f'{job_time / pages * 1000:>7.2f} ms {matrix.memory_usage() / 2**20:>7.1f} MB'
+            )
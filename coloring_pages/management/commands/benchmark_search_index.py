@@ -0,0 +1,72 @@
+import itertools
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from coloring_pages.search.memory import InvertedIndex
+
+
+class Command(BaseCommand):
+    help = 'Measure memory, build time and query latency of the in-memory search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, nargs='+', default=[10000, 100000],
+            help='Catalog sizes to benchmark (default: 10000 100000)'
+        )
+        parser.add_argument('--vocabulary', type=int, default=20000, help='Number of distinct words')
+        parser.add_argument('--queries', type=int, default=200, help='Number of timed queries')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = self.make_vocabulary(rng, options['vocabulary'])
+        # Zipf-like word frequencies, like natural language
+        weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+        self.stdout.write(f'{"pages":>10} {"memory":>12} {"build":>10} {"query":>10}')
+        for pages in options['pages']:
+            build_time, index = self.build(rng, vocabulary, weights, pages)
+            query_time = self.time_queries(rng, vocabulary, index, options['queries'])
+            memory = index.memory_usage()
+            self.stdout.write(
+                f'{pages:>10,} {memory / 1024 / 1024:>9.1f} MB {build_time:>8.1f} s '
+                f'{query_time * 1000:>7.2f} ms'
+            )
+            del index
+
+    @staticmethod
+    def make_vocabulary(rng, size):
+        words = set()
+        while len(words) < size:
+            words.add(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+        return sorted(words, key=lambda word: rng.random())
+
+    @staticmethod
+    def build(rng, vocabulary, cum_weights, pages):
+        def text(words):
+            return ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=words))
+
+        # Only time the indexing, not the generation of the synthetic text
+        elapsed = 0.0
+        index = InvertedIndex()
+        for pk in range(1, pages + 1):
+            texts = (text(4), text(4), text(20), text(20), text(20))
+            started = time.perf_counter()
+            index.add(pk, texts, keep_sorted=False)
+            elapsed += time.perf_counter() - started
+        started = time.perf_counter()
+        index.finish()
+        return elapsed + time.perf_counter() - started, index
+
+    @staticmethod
+    def time_queries(rng, vocabulary, index, count):
+        # Words of average frequency: neither stop words nor hapaxes
+        candidates = vocabulary[50:2000]
+        queries = [' '.join(rng.sample(candidates, 2)) for _ in range(count)]
+        started = time.perf_counter()
+        for query in queries:
+            index.search(query, 1000)
+        return (time.perf_counter() - started) / count
@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.text import slugify
+
+from coloring_pages.models import ColoringPage
+from coloring_pages.models.base import create_unique_slug
+
+
+def probe_slug(model, field_value, slug_field_name):
+    """The previous allocator: one query per candidate."""
+    slug = slugify(field_value)
+    unique_slug, num = slug, 1
+    while model.objects.filter(**{f'{slug_field_name}__iexact': unique_slug}).exists():
+        unique_slug = f'{slug}-{num}'
+        num += 1
+    return unique_slug
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure the unique slug allocation against many pages with the same title (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collisions', type=int, nargs='+', default=[10, 100, 1000, 5000],
+            help='Numbers of existing pages with the title (default: 10 100 1000 5000)'
+        )
+        parser.add_argument('--title', default='Cute Cat', help='The colliding title')
+        parser.add_argument('--others', type=int, default=2000, help='Pages with similar, non-colliding slugs')
+
+    def handle(self, *args, **options):
+        slug = slugify(options['title'])
+        self.stdout.write(
+            f'{"collisions":>10} {"probe queries":>14} {"probe time":>11} {"queries":>8} {"time":>9}'
+        )
+        for collisions in options['collisions']:
+            try:
+                with transaction.atomic():
+                    self.create_pages(slug, collisions, options['others'])
+
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        expected = probe_slug(ColoringPage, options['title'], 'seo_url_en')
+                        probe_time = time.perf_counter() - started
+                    probe_queries = len(queries)
+
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        allocated = create_unique_slug(ColoringPage, options['title'], 'title_en', 'seo_url_en')
+                        allocate_time = time.perf_counter() - started
+                    if allocated != expected:
+                        self.stderr.write(f'   Allocated {allocated}, the probe gave {expected}')
+
+                    self.stdout.write(
+                        f'{collisions:>10,} {probe_queries:>14,} {probe_time * 1000:>8.1f} ms '
+                        f'{len(queries):>8} {allocate_time * 1000:>6.1f} ms'
+                    )
+                    raise Rollback
+            except Rollback:
+                pass
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished; the test pages were rolled back'))
+
+    def create_pages(self, slug, collisions, others):
+        """
+        Insert ``slug``, ``slug-1`` ... and slugs that only share its prefix.
+        """
+        slugs = [slug] + [f'{slug}-{num}' for num in range(1, collisions)]
+        # Matched by the prefix but not by the pattern
+        slugs += [f'{slug}-and-dog-{num}' for num in range(others)]
+        pages = [
+            ColoringPage(
+                title_en=value, title_de=value, description_en='', description_de='', prompt='',
+                seo_url_en=value, seo_url_de=f'benchmark-{index}',
+            )
+            for index, value in enumerate(slugs)
+        ]
+        ColoringPage.objects.bulk_create(pages, batch_size=500)
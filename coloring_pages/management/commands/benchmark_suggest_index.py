@@ -0,0 +1,51 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from coloring_pages.search.suggest import TitleIndex
+
+
+class Command(BaseCommand):
+    help = 'Measure build time and lookup latency of the search suggestion index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, nargs='+', default=[10000, 100000],
+            help='Catalog sizes to benchmark (default: 10000 100000)'
+        )
+        parser.add_argument('--vocabulary', type=int, default=5000, help='Number of distinct words')
+        parser.add_argument('--lookups', type=int, default=5000, help='Number of timed lookups')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+            for _ in range(options['vocabulary'])
+        ]
+
+        self.stdout.write(f'{"pages":>10} {"build":>10} {"p50":>10} {"p99":>10} {"max":>10}')
+        for pages in options['pages']:
+            started = time.perf_counter()
+            index = TitleIndex()
+            for pk in range(1, pages + 1):
+                title = ' '.join(rng.choices(vocabulary, k=rng.randint(2, 4))).title()
+                index.add(pk, title, title, f'page-{pk}', f'seite-{pk}')
+            index.finish()
+            build_time = time.perf_counter() - started
+
+            # Prefixes as typed: one to five letters of a real word
+            prefixes = [rng.choice(vocabulary)[:rng.randint(1, 5)] for _ in range(options['lookups'])]
+            timings = []
+            for prefix in prefixes:
+                started = time.perf_counter()
+                index.lookup('en', prefix, 5)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+            self.stdout.write(
+                f'{pages:>10,} {build_time:>8.1f} s {p50 * 1000:>7.3f} ms '
+                f'{p99 * 1000:>7.3f} ms {timings[-1] * 1000:>7.3f} ms'
+            )
@@ -0,0 +1,79 @@
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw
+
+from coloring_pages.lineart import optimize_line_art
+from coloring_pages.models import ColoringPage
+from coloring_pages.vectorize import adjust_vertices, binarize, path_data, simplify, smooth, trace_paths
+
+
+def synthetic_drawing(rng, size, shapes):
+    """
+    Anti-aliased outlines of random circles and strokes, drawn at twice the size.
+    """
+    img = Image.new('L', (size * 2, size * 2), 255)
+    draw = ImageDraw.Draw(img)
+    for _ in range(shapes):
+        x, y, radius = rng.randrange(size * 2), rng.randrange(size * 2), rng.randrange(20, size // 2)
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), outline=0, width=rng.randrange(4, 14))
+        draw.line(
+            [(rng.randrange(size * 2), rng.randrange(size * 2)) for _ in range(2)],
+            fill=0, width=rng.randrange(4, 14),
+        )
+    buffer = io.BytesIO()
+    img.resize((size, size), Image.Resampling.LANCZOS).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Measure the SVG tracer stage by stage on 1024px drawings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1024, help='Width and height of the synthetic drawings')
+        parser.add_argument(
+            '--shapes', type=int, nargs='+', default=[5, 20, 40],
+            help='Circles and strokes per synthetic drawing (default: 5 20 40)'
+        )
+        parser.add_argument('--pages', type=int, default=0, help='Trace this many stored page images instead')
+        parser.add_argument('--tolerance', type=float, default=1.0, help='Simplification tolerance in pixels')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if options['pages']:
+            storage = ColoringPage._meta.get_field('image').storage
+            inputs = []
+            for pk, name in ColoringPage.objects.exclude(image='').values_list('id', 'image')[:options['pages']]:
+                with storage.open(name) as file:
+                    inputs.append((f'page {pk}', file.read()))
+        else:
+            inputs = [
+                (f'{shapes} shapes', synthetic_drawing(rng, options['size'], shapes))
+                for shapes in options['shapes']
+            ]
+
+        self.stdout.write(
+            f'{"input":<14} {"paths":>6} {"curves":>7} {"binarize":>9} {"trace":>9} {"fit":>9} '
+            f'{"total":>9} {"PNG":>9} {"SVG":>9}'
+        )
+        for label, data in inputs:
+            started = time.perf_counter()
+            with Image.open(io.BytesIO(data)) as img:
+                ink = binarize(img)
+            binarized = time.perf_counter()
+            paths = trace_paths(ink)
+            traced = time.perf_counter()
+            fitted = [smooth(adjust_vertices(points, simplify(points, options['tolerance']))) for points in paths]
+            svg_size = sum(len(path_data(segments)) for segments in fitted)
+            finished = time.perf_counter()
+
+            self.stdout.write(
+                f'{label:<14} {len(paths):>6,} {sum(map(len, fitted)):>7,} '
+                f'{(binarized - started) * 1000:>6.0f} ms {(traced - binarized) * 1000:>6.0f} ms '
+                f'{(finished - traced) * 1000:>6.0f} ms {(finished - started) * 1000:>6.0f} ms '
+                f'{len(optimize_line_art(data)) / 1024:>6.0f} KB {svg_size / 1024:>6.0f} KB'
+            )
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from coloring_pages.derivatives import build_derivatives, delete_derivatives
+from coloring_pages.models import ColoringPage
+from coloring_pages.pagecache import invalidate_pages
+
+
+def build_page(pk, name, old):
+    field = ColoringPage._meta.get_field('image')
+    try:
+        with field.storage.open(name) as file:
+            manifest = build_derivatives(file, field.storage)
+        if old and old.get('k') != manifest['k']:
+            delete_derivatives(old, field.storage)
+        return pk, manifest, None
+    except Exception as e:
+        return pk, None, e
+
+
+class Command(BaseCommand):
+    help = 'Build the responsive WebP/AVIF/PNG derivatives of the coloring page images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=min(8, os.cpu_count() or 1),
+            help='Number of images resized and encoded in parallel (default: up to 8)'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Rebuild pages that have derivatives, e.g. after changing DERIVATIVE_WIDTHS'
+        )
+        parser.add_argument('--batch-size', type=int, default=100, help='Pages saved per query')
+
+    def handle(self, *args, **options):
+        pages = ColoringPage.objects.exclude(image='')
+        if not options['all']:
+            pages = pages.filter(derivatives={})
+        rows = pages.values_list('id', 'image', 'derivatives').iterator(chunk_size=1000)
+
+        updated, failed, batch = 0, 0, []
+        # Pillow releases the GIL while resizing and encoding
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for pk, manifest, error in executor.map(lambda row: build_page(*row), rows):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'   Page {pk}: {error}')
+                    continue
+                batch.append(ColoringPage(pk=pk, derivatives=manifest))
+                if len(batch) >= options['batch_size']:
+                    updated += self.save(batch)
+                    batch = []
+            updated += self.save(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Built derivatives of {updated} images, {failed} failed'))
+
+    def save(self, batch):
+        with transaction.atomic():
+            ColoringPage.objects.bulk_update(batch, ['derivatives'])
+            # bulk_update sends no signals: drop the cached pages showing them
+            pks = [page.pk for page in batch]
+            transaction.on_commit(lambda: invalidate_pages(pks))
+        return len(batch)
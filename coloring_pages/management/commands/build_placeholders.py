@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from PIL import Image
+
+from coloring_pages.derivatives import build_placeholder
+from coloring_pages.models import ColoringPage
+from coloring_pages.pagecache import invalidate_all
+
+
+def build_page(pk, name, metadata):
+    storage = ColoringPage._meta.get_field('image').storage
+    try:
+        with storage.open(name) as file, Image.open(file) as img:
+            placeholder = build_placeholder(img)
+        return pk, dict(metadata or {}, placeholder=placeholder), None
+    except Exception as e:
+        return pk, None, e
+
+
+class Command(BaseCommand):
+    help = 'Store the image size and a tiny inline preview of the coloring pages in their metadata'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=min(8, os.cpu_count() or 1),
+            help='Number of images read in parallel (default: up to 8)'
+        )
+        parser.add_argument('--all', action='store_true', help='Rebuild pages that have a placeholder')
+        parser.add_argument('--batch-size', type=int, default=100, help='Pages saved per query')
+
+    def handle(self, *args, **options):
+        pages = ColoringPage.objects.exclude(image='')
+        if not options['all']:
+            pages = pages.filter(Q(metadata__isnull=True) | ~Q(metadata__has_key='placeholder'))
+        rows = pages.values_list('id', 'image', 'metadata').iterator(chunk_size=1000)
+
+        updated, failed, batch = 0, 0, []
+        # Pillow releases the GIL while decoding and resizing
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for pk, metadata, error in executor.map(lambda row: build_page(*row), rows):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'   Page {pk}: {error}')
+                    continue
+                batch.append(ColoringPage(pk=pk, metadata=metadata))
+                if len(batch) >= options['batch_size']:
+                    updated += self.save(batch)
+                    batch = []
+            updated += self.save(batch)
+
+        if updated:
+            # The cards of every listing show them
+            transaction.on_commit(invalidate_all)
+        self.stdout.write(self.style.SUCCESS(f'Built placeholders of {updated} images, {failed} failed'))
+
+    def save(self, batch):
+        ColoringPage.objects.bulk_update(batch, ['metadata'])
+        return len(batch)
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from coloring_pages.search.related import build_related_pages, update_related_pages
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related pages ("more like this") of the coloring pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, nargs='+',
+            help='Only update these pages and offer them to their neighbours (default: all pages)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['pages']:
+            update_related_pages(options['pages'])
+            count = len(options['pages'])
+        else:
+            count = build_related_pages()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Computed the related pages of {count} pages in {elapsed:.1f} s'))
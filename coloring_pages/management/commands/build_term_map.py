@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from coloring_pages.models import ColoringPage, SearchTermTranslation
+from coloring_pages.search.expansion import compute_term_map
+
+
+class Command(BaseCommand):
+    help = 'Learn the bilingual search term map from the English and German page texts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-pages', type=int, default=2,
+            help='Minimum number of pages a term pair has to appear on (default: 2)'
+        )
+        parser.add_argument(
+            '--min-score', type=float, default=0.3,
+            help='Minimum Dice coefficient of a term pair (default: 0.3)'
+        )
+        parser.add_argument(
+            '--max-translations', type=int, default=3,
+            help='Maximum number of translations per term (default: 3)'
+        )
+
+    def handle(self, *args, **options):
+        rows = ColoringPage.objects.values_list(
+            'title_en', 'title_de', 'description_en', 'description_de'
+        ).iterator(chunk_size=2000)
+        term_map = compute_term_map(
+            rows,
+            min_pages=options['min_pages'],
+            min_score=options['min_score'],
+            max_translations=options['max_translations'],
+        )
+
+        with transaction.atomic():
+            SearchTermTranslation.objects.all().delete()
+            SearchTermTranslation.objects.bulk_create(
+                (
+                    SearchTermTranslation(language=language, term=term[:100], translation=translation[:100], score=score)
+                    for language, term, translation, score in term_map
+                ),
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Stored {len(term_map)} term translations'))
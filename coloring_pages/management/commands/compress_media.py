@@ -0,0 +1,60 @@
+import gzip
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from coloring_pages.serving import ENCODINGS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# PNG, WebP and AVIF are compressed already; only text formats gain
+COMPRESSIBLE_EXTENSIONS = {'.svg', '.json', '.txt', '.xml', '.css', '.js', '.html'}
+VARIANT_SUFFIXES = {suffix for _encoding, suffix in ENCODINGS}
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class Command(BaseCommand):
+    help = 'Write .gz (and .br with the brotli package) variants of compressible media files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-saving', type=float, default=0.05,
+            help='Skip variants that save less than this share of the size (default: 0.05)'
+        )
+        parser.add_argument('--force', action='store_true', help='Rewrite variants that are up to date')
+
+    def handle(self, *args, **options):
+        encodings = [(encoding, suffix) for encoding, suffix in ENCODINGS if encoding != 'br' or brotli]
+        written, saved = 0, 0
+        for root, _dirs, files in os.walk(settings.MEDIA_ROOT):
+            for filename in files:
+                extension = os.path.splitext(filename)[1].lower()
+                if extension in VARIANT_SUFFIXES or extension not in COMPRESSIBLE_EXTENSIONS:
+                    continue
+                path = os.path.join(root, filename)
+                data = None
+                for encoding, suffix in encodings:
+                    variant = path + suffix
+                    if not options['force'] and os.path.exists(variant) and os.path.getmtime(variant) >= os.path.getmtime(path):
+                        continue
+                    if data is None:
+                        with open(path, 'rb') as file:
+                            data = file.read()
+                    compressed = compress(data, encoding)
+                    if len(compressed) > len(data) * (1 - options['min_saving']):
+                        continue
+                    with open(variant, 'wb') as file:
+                        file.write(compressed)
+                    written += 1
+                    saved += len(data) - len(compressed)
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} variants, saving {saved / 1024:.0f} KB per full transfer'))
@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from coloring_pages.lineart import optimize_line_art
+from coloring_pages.models import ColoringPage
+from coloring_pages.pagecache import invalidate_pages
+
+
+def recompress_page(pk, name, metadata, levels, dry_run):
+    storage = ColoringPage._meta.get_field('image').storage
+    try:
+        with storage.open(name) as file:
+            data = file.read()
+        optimized = optimize_line_art(data, levels)
+        new_name = None
+        if optimized is not data and not dry_run:
+            # The storage never overwrites, so this gets a new name next to the old one
+            new_name = storage.save(os.path.splitext(name)[0] + '.png', ContentFile(optimized))
+        metadata = dict(metadata or {}, line_art={'before': len(data), 'after': len(optimized), 'levels': levels})
+        return pk, name, new_name, metadata, None
+    except Exception as e:
+        return pk, name, None, None, e
+
+
+class Command(BaseCommand):
+    help = 'Recompress coloring page images as small gray palette PNGs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=min(8, os.cpu_count() or 1),
+            help='Number of images recompressed in parallel (default: up to 8)'
+        )
+        parser.add_argument(
+            '--levels', type=int, default=settings.LINE_ART_LEVELS,
+            help='Gray levels to keep (default: LINE_ART_LEVELS)'
+        )
+        parser.add_argument('--all', action='store_true', help='Also process images recompressed before')
+        parser.add_argument('--dry-run', action='store_true', help='Report the savings without writing anything')
+        parser.add_argument('--batch-size', type=int, default=100, help='Pages saved per query')
+
+    def handle(self, *args, **options):
+        pages = ColoringPage.objects.exclude(image='').order_by('pk')
+        if not options['all']:
+            # Pages are marked when done, so an interrupted run continues where it stopped
+            pages = pages.filter(Q(metadata__isnull=True) | ~Q(metadata__has_key='line_art'))
+        rows = pages.values_list('id', 'image', 'metadata').iterator(chunk_size=1000)
+
+        self.before = self.after = self.processed = self.failed = 0
+        batch = []
+        storage = ColoringPage._meta.get_field('image').storage
+        # Pillow and zlib release the GIL while encoding
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            results = executor.map(
+                lambda row: recompress_page(*row, options['levels'], options['dry_run']), rows
+            )
+            for pk, name, new_name, metadata, error in results:
+                if error is not None:
+                    self.failed += 1
+                    self.stderr.write(f'   Page {pk}: {error}')
+                    continue
+                self.processed += 1
+                self.before += metadata['line_art']['before']
+                self.after += metadata['line_art']['after']
+                batch.append((pk, name, new_name, metadata))
+                if len(batch) >= options['batch_size']:
+                    self.save(batch, storage, options['dry_run'])
+                    batch = []
+            self.save(batch, storage, options['dry_run'])
+
+        saved = self.before - self.after
+        share = saved / self.before if self.before else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Recompressed {self.processed} images, {self.failed} failed: '
+            f'{self.before / 1048576:.1f} MB -> {self.after / 1048576:.1f} MB '
+            f'({saved / 1048576:.1f} MB, {share:.0%} saved)'
+        ))
+
+    def save(self, batch, storage, dry_run):
+        if dry_run or not batch:
+            return
+        pages = []
+        for pk, name, new_name, metadata in batch:
+            page = ColoringPage(pk=pk, metadata=metadata)
+            page.image.name = new_name or name
+            pages.append(page)
+        with transaction.atomic():
+            ColoringPage.objects.bulk_update(pages, ['image', 'metadata'])
+            replaced = [(pk, name) for pk, name, new_name, _metadata in batch if new_name]
+
+            def cleanup():
+                for _pk, name in replaced:
+                    storage.delete(name)
+                invalidate_pages([pk for pk, _name in replaced])
+
+            transaction.on_commit(cleanup)
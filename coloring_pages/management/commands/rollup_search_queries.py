@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from coloring_pages.models import DailySearchRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily search rollups from the logged search queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=2,
+            help='Number of days to rebuild, including today (default: 2)'
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        self.stdout.write(self.style.MIGRATE_HEADING('Rebuilding daily search rollups'))
+        for offset in range(options['days']):
+            day = today - timedelta(days=offset)
+            count = DailySearchRollup.rebuild_day(day)
+            self.stdout.write(f'   {day}: {count} queries')
+        self.stdout.write(self.style.SUCCESS('Search rollups rebuilt'))
@@ -0,0 +1,53 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from coloring_pages.tasks import claim_task, run_task
+
+
+class Command(BaseCommand):
+    help = 'Run the queued background tasks, such as building the thumbnails and derivatives of new images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when no task is due instead of waiting')
+        parser.add_argument(
+            '--sleep', type=float, default=None,
+            help='Seconds to wait when no task is due (default: TASK_POLL_INTERVAL)'
+        )
+        parser.add_argument('--max-tasks', type=int, default=None, help='Exit after running this many tasks')
+
+    def handle(self, *args, **options):
+        sleep = options['sleep'] if options['sleep'] is not None else getattr(settings, 'TASK_POLL_INTERVAL', 2)
+        self.stopping = False
+        if not options['once']:
+            # Finish the current task on docker stop / Ctrl+C, then exit
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        succeeded, failed = 0, 0
+        while not self.stopping and (options['max_tasks'] is None or succeeded + failed < options['max_tasks']):
+            if not options['once']:
+                # Reconnects after database restarts between tasks
+                close_old_connections()
+            claimed = claim_task()
+            if claimed is None:
+                if options['once']:
+                    break
+                time.sleep(sleep)
+                continue
+            started = time.perf_counter()
+            if run_task(claimed):
+                succeeded += 1
+                outcome = 'done'
+            else:
+                failed += 1
+                outcome = f'failed (attempt {claimed.attempts} of {claimed.max_attempts})'
+            self.stdout.write(f'   {claimed.name} #{claimed.pk}: {outcome} in {time.perf_counter() - started:.2f}s')
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded + failed} tasks, {failed} failed'))
+
+    def stop(self, signum, frame):
+        self.stopping = True
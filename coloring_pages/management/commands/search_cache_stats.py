@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from coloring_pages.catalog import get_catalog_version
+from coloring_pages.search.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the hit and miss counters of the search result cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after showing them')
+
+    def handle(self, *args, **options):
+        stats = get_cache_stats()
+        ratio = stats['hit_ratio']
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Search result cache'))
+        self.stdout.write(f'   Timeout: {settings.SEARCH_RESULT_CACHE_TIMEOUT} s')
+        self.stdout.write(f'   Catalog version: {get_catalog_version()}')
+        self.stdout.write(f'   Hits: {stats["hits"]}')
+        self.stdout.write(f'   Misses: {stats["misses"]}')
+        self.stdout.write(f'   Hit ratio: {ratio:.1%}' if ratio is not None else '   Hit ratio: n/a')
+
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from coloring_pages.models import ColoringPage
+from coloring_pages.vectorize import store_vector, trace_svg
+
+
+def trace_page(pk, name):
+    storage = ColoringPage._meta.get_field('image').storage
+    try:
+        with storage.open(name) as file:
+            return pk, name, trace_svg(file.read()), None
+    except Exception as e:
+        return pk, name, None, e
+
+
+class Command(BaseCommand):
+    help = 'Trace the coloring page images into SVG for the vector downloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=min(8, os.cpu_count() or 1),
+            help='Number of images traced in parallel processes (default: up to 8)'
+        )
+        parser.add_argument('--all', action='store_true', help='Trace pages again that have a tracing')
+
+    def handle(self, *args, **options):
+        pages = ColoringPage.objects.exclude(image='')
+        if options['all']:
+            old = dict(pages.exclude(vector='').values_list('id', 'vector'))
+            pages.update(vector='')
+            storage = ColoringPage._meta.get_field('vector').storage
+            for name in old.values():
+                storage.delete(name)
+        rows = list(pages.filter(vector='').values_list('id', 'image'))
+
+        # Tracing runs Python loops, so it takes processes rather than threads to
+        # use more than one core; the children only read files, never the database
+        traced, failed, before, after = 0, 0, 0, 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            pks, names = zip(*rows) if rows else ((), ())
+            for pk, name, svg, error in executor.map(trace_page, pks, names, chunksize=4):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'   Page {pk}: {error}')
+                    continue
+                if store_vector(ColoringPage, pk, name, svg):
+                    traced += 1
+                    before += ColoringPage._meta.get_field('image').storage.size(name)
+                    after += len(svg)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Traced {traced} images, {failed} failed: {before / 1048576:.1f} MB of PNG '
+            f'as {after / 1048576:.1f} MB of SVG'
+        ))
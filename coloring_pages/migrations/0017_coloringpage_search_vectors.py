@@ -0,0 +1,55 @@
+from django.db import migrations
+
+SEARCH_VECTOR_COLUMNS = {
+    'search_vector_en': (
+        "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description_en, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(prompt, '')), 'C')"
+    ),
+    'search_vector_de': (
+        "setweight(to_tsvector('german', coalesce(title_de, '')), 'A') || "
+        "setweight(to_tsvector('german', coalesce(description_de, '')), 'B') || "
+        "setweight(to_tsvector('german', coalesce(prompt, '')), 'C')"
+    ),
+}
+
+
+def add_search_vectors(apps, schema_editor):
+    """
+    Add generated tsvector columns with GIN indexes on PostgreSQL.
+
+    The columns are maintained by PostgreSQL itself and are not part of the
+    Django model. Other databases are handled by their search backend.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    table = apps.get_model('coloring_pages', 'ColoringPage')._meta.db_table
+    for column, expression in SEARCH_VECTOR_COLUMNS.items():
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD COLUMN {column} tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {table}_{column}_gin ON {table} USING GIN ({column})"
+        )
+
+
+def remove_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    table = apps.get_model('coloring_pages', 'ColoringPage')._meta.db_table
+    for column in SEARCH_VECTOR_COLUMNS:
+        schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {column}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0016_alter_systemprompt_unique_together'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vectors, remove_search_vectors),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+TRIGRAM_COLUMNS = ('title_en', 'title_de', 'prompt')
+
+
+def add_trigram_indexes(apps, schema_editor):
+    """
+    Enable pg_trgm and add trigram GIN indexes on PostgreSQL.
+
+    Other databases use the in-process trigram index instead.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    table = apps.get_model('coloring_pages', 'ColoringPage')._meta.db_table
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX {table}_{column}_trgm ON {table} "
+            f"USING GIN ({column} gin_trgm_ops)"
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    table = apps.get_model('coloring_pages', 'ColoringPage')._meta.db_table
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0017_coloringpage_search_vectors'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
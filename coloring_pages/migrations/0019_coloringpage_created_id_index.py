@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0018_coloringpage_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coloringpage',
+            index=models.Index(fields=['-created_at', '-id'], name='coloringpage_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:13
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import Lower, TruncDate, Trim
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Roll up the search queries logged so far.
+    """
+    SearchQuery = apps.get_model('coloring_pages', 'SearchQuery')
+    DailySearchRollup = apps.get_model('coloring_pages', 'DailySearchRollup')
+    rows = (
+        SearchQuery.objects
+        .annotate(day=TruncDate('created_at'), normalized=Lower(Trim('query')))
+        .values('day', 'language', 'normalized')
+        .annotate(
+            search_count=Count('id'),
+            zero_result_count=Count('id', filter=Q(result_count=0)),
+        )
+        .order_by()
+    )
+    DailySearchRollup.objects.bulk_create(
+        (
+            DailySearchRollup(
+                day=row['day'],
+                language=row['language'],
+                query=row['normalized'][:255],
+                search_count=row['search_count'],
+                zero_result_count=row['zero_result_count'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0019_coloringpage_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySearchRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('language', models.CharField(max_length=10)),
+                ('query', models.CharField(max_length=255)),
+                ('search_count', models.PositiveIntegerField(default=0)),
+                ('zero_result_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Search Rollup',
+                'verbose_name_plural': 'Daily Search Rollups',
+                'ordering': ['-day', '-search_count'],
+                'indexes': [models.Index(fields=['language', 'day'], name='coloring_pa_languag_bb0bee_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysearchrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'language', 'query'), name='unique_daily_search_rollup'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0020_dailysearchrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTermTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=10)),
+                ('term', models.CharField(max_length=100)),
+                ('translation', models.CharField(max_length=100)),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'verbose_name': 'Search Term Translation',
+                'verbose_name_plural': 'Search Term Translations',
+                'ordering': ['language', 'term', '-score'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchtermtranslation',
+            constraint=models.UniqueConstraint(fields=('language', 'term', 'translation'), name='unique_search_term_translation'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0021_searchtermtranslation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='coloring_pages.coloringpage')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='coloring_pages.coloringpage')),
+            ],
+            options={
+                'verbose_name': 'Related Page',
+                'verbose_name_plural': 'Related Pages',
+                'ordering': ['page', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='relatedpage',
+            constraint=models.UniqueConstraint(fields=('page', 'rank'), name='unique_related_page_rank'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0022_relatedpage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coloringpage',
+            name='image_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0023_coloringpage_image_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coloringpage',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coloring_pages', '0024_coloringpage_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coloringpage',
+            name='vector',
+            field=models.FileField(blank=True, editable=False, upload_to='coloring_pages/vectors/'),
+        ),
+    ]
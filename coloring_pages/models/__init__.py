@@ -7,11 +7,17 @@ To import models, use: `from coloring_pages.models import ModelName`
 # Import models from their respective modules
 from .coloring_page import ColoringPage
 from .system_prompt import SystemPrompt
-from .search import SearchQuery
+from .search import DailySearchRollup, SearchQuery, SearchTermTranslation
+from .related import RelatedPage
+from .task import Task
 
 # This makes the models available when importing from coloring_pages.models
 __all__ = [
     'ColoringPage',
     'SystemPrompt',
     'SearchQuery',
+    'DailySearchRollup',
+    'SearchTermTranslation',
+    'RelatedPage',
+    'Task',
 ]
@@ -1,7 +1,11 @@
 """
 Base models and utilities for the coloring_pages app.
 """
+import copy
+
 from django.db import models
+from django.db.models import DEFERRED
+from django.db.models.fields.files import FieldFile
 from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
@@ -23,29 +27,42 @@ except (ImportError, OSError):
     GEOIP_AVAILABLE = False
 
 
-def create_unique_slug(model, field_value, field_name, slug_field_name):
+def create_unique_slug(model, field_value, field_name, slug_field_name, exclude_pk=None):
     """
-    Create a unique slug by appending an index if necessary.
+    Create a unique slug by appending the first free index if necessary.
+
+    The slug and its taken ``slug-N`` variants are read in one query, whose
+    prefix match uses the index of the slug field, instead of one query per
+    candidate. Another save can still take the slug before this one is
+    written; callers retry on ``IntegrityError`` (see ``ColoringPage.save``).
     
     Args:
         model: The model class
         field_value: The value to convert to a slug
         field_name: The name of the field being slugified
         slug_field_name: The name of the slug field
+        exclude_pk: The instance the slug is for, whose own slug is free
         
     Returns:
         str: A unique slug
     """
     slug = slugify(field_value)
-    unique_slug = slug
+    # slugify() leaves only [a-z0-9_-], which need no escaping in the pattern
+    taken = model.objects.filter(
+        models.Q(**{slug_field_name: slug})
+        | models.Q(**{f'{slug_field_name}__startswith': f'{slug}-', f'{slug_field_name}__regex': rf'^{slug}-[0-9]+$'})
+    )
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+    taken = set(taken.values_list(slug_field_name, flat=True))
+    if slug not in taken:
+        return slug
+
+    suffixes = {int(value[len(slug) + 1:]) for value in taken if value != slug}
     num = 1
-    
-    # Check if a slug with this name already exists
-    while model.objects.filter(**{f"{slug_field_name}__iexact": unique_slug}).exists():
-        unique_slug = f"{slug}-{num}"
+    while num in suffixes:
         num += 1
-    
-    return unique_slug
+    return f"{slug}-{num}"
 
 
 class TimeStampedModel(models.Model):
@@ -58,3 +75,77 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class DirtyFieldsMixin:
+    """
+    Tracks which fields of a model instance changed since it was loaded or
+    last saved, without querying the database.
+
+    A tuple of the field values is taken when the instance is created (which
+    ``from_db`` does too), refreshed or saved; ``get_changed_fields()``
+    compares against it. Saving an existing instance writes only the changed
+    columns, plus ``auto_now`` ones, through ``update_fields``, so concurrent
+    edits of other fields are not overwritten with stale values.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._snapshot = self._take_snapshot()
+
+    @classmethod
+    def _tracked_fields(cls):
+        fields = cls.__dict__.get('_tracked_fields_cache')
+        if fields is None:
+            fields = tuple(field for field in cls._meta.concrete_fields if not field.primary_key)
+            cls._tracked_fields_cache = fields
+        return fields
+
+    def _tracked_value(self, field):
+        value = self.__dict__.get(field.attname, DEFERRED)
+        if isinstance(value, FieldFile):
+            # A newly assigned file is a change even under the same name
+            return value.name if value._committed else (value.name, )
+        if isinstance(value, (dict, list)):
+            # JSON values are often changed in place
+            return copy.deepcopy(value)
+        return value
+
+    def _take_snapshot(self):
+        return tuple(self._tracked_value(field) for field in self._tracked_fields())
+
+    def get_changed_fields(self):
+        """
+        Get the names of the fields changed since the instance was loaded or saved.
+
+        Returns:
+            list: Field names; empty for unsaved instances
+        """
+        if self._state.adding:
+            return []
+        return [
+            field.name for field, old in zip(self._tracked_fields(), self._snapshot)
+            if self._tracked_value(field) != old
+        ]
+
+    def _update_snapshot(self, fields=None):
+        """
+        Take the current values of ``fields`` (names or attnames), or of all fields, as unchanged.
+        """
+        fields = None if fields is None else set(fields)
+        self._snapshot = tuple(
+            self._tracked_value(field) if fields is None or field.name in fields or field.attname in fields
+            else old
+            for field, old in zip(self._tracked_fields(), self._snapshot)
+        )
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._update_snapshot(fields)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if not self._state.adding and not args and update_fields is None and not kwargs.get('force_insert'):
+            auto_now = [field.name for field in self._tracked_fields() if getattr(field, 'auto_now', False)]
+            kwargs['update_fields'] = update_fields = list(dict.fromkeys(self.get_changed_fields() + auto_now))
+        super().save(*args, **kwargs)
+        self._update_snapshot(update_fields)
@@ -3,7 +3,7 @@ Models related to coloring pages.
 """
 import os
 import io
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
 from django.core.files.base import ContentFile
 from django.urls import reverse
@@ -11,13 +11,30 @@ from django.utils import timezone
 from django.utils.translation import get_language, gettext_lazy as _
 from PIL import Image
 
-from .base import TimeStampedModel, create_unique_slug
+from ..derivatives import build_derivatives, build_placeholder, delete_derivatives
+from ..printing import delete_print_pdfs
+from ..search.duplicates import image_hash
+from .base import DirtyFieldsMixin, TimeStampedModel, create_unique_slug
 
+# Saves tried with freshly allocated slugs when another page took them first
+SLUG_SAVE_ATTEMPTS = 3
 
-class ColoringPage(TimeStampedModel):
+
+class ColoringPage(DirtyFieldsMixin, TimeStampedModel):
     """
     Represents a coloring page with multilingual content.
     """
+    IMAGE_PENDING = 'pending'
+    IMAGE_PROCESSING = 'processing'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+    IMAGE_STATUS_CHOICES = [
+        (IMAGE_PENDING, _('Pending')),
+        (IMAGE_PROCESSING, _('Processing')),
+        (IMAGE_READY, _('Ready')),
+        (IMAGE_FAILED, _('Failed')),
+    ]
+
     # English fields
     title_en = models.CharField(max_length=200, verbose_name=_('Title (English)'))
     description_en = models.TextField(verbose_name=_('Description (English)'))
@@ -35,6 +52,19 @@ class ColoringPage(TimeStampedModel):
     seo_url_de = models.SlugField(max_length=255, unique=True, blank=True, null=True, 
                                  verbose_name=_('SEO URL (German)'))
     
+    # Perceptual hash of the image for near-duplicate detection
+    image_hash = models.BigIntegerField(blank=True, null=True, editable=False)
+
+    # Manifest of the resized WebP/AVIF/PNG versions of the image
+    derivatives = models.JSONField(blank=True, default=dict, editable=False)
+
+    # SVG tracing of the image, made on first download or by trace_vectors
+    vector = models.FileField(upload_to='coloring_pages/vectors/', blank=True, editable=False)
+
+    # Progress of the thumbnail and derivatives, built by `run_worker` after a new image
+    image_status = models.CharField(max_length=20, choices=IMAGE_STATUS_CHOICES, default=IMAGE_READY,
+                                    editable=False, verbose_name=_('Image status'))
+
     # Metadata for additional data like system prompt information
     metadata = models.JSONField(blank=True, null=True, default=dict,
                               help_text=_('Additional metadata stored as JSON'))
@@ -43,74 +73,127 @@ class ColoringPage(TimeStampedModel):
         indexes = [
             models.Index(fields=['seo_url_en']),
             models.Index(fields=['seo_url_de']),
+            # Backs the keyset pagination of the browse listing
+            models.Index(fields=['-created_at', '-id'], name='coloringpage_created_id_idx'),
         ]
         ordering = ['-created_at']
     
     def save(self, *args, **kwargs):
+        # Compared with the values the page was loaded with, without a query;
+        # only the changed columns are written (see DirtyFieldsMixin)
+        changed_fields = self.get_changed_fields()
+
         # Generate SEO URLs if they don't exist or if the title has changed
-        if not self.seo_url_en or 'title_en' in self.get_changed_fields():
-            self.seo_url_en = create_unique_slug(ColoringPage, self.title_en, 'title_en', 'seo_url_en')
-        
-        if not self.seo_url_de or 'title_de' in self.get_changed_fields():
-            self.seo_url_de = create_unique_slug(ColoringPage, self.title_de, 'title_de', 'seo_url_de')
+        slug_fields = [
+            (title_field, slug_field)
+            for title_field, slug_field in (('title_en', 'seo_url_en'), ('title_de', 'seo_url_de'))
+            if not getattr(self, slug_field) or title_field in changed_fields
+        ]
+        self.allocate_slugs(slug_fields)
         
         # Process image and generate thumbnail if this is a new image or the image has changed
-        if self.image and (not self.pk or 'image' in self.get_changed_fields()):
-            try:
-                # Open original image
-                with Image.open(self.image) as img:
-                    # Convert to RGB if necessary (for PNG with transparency)
-                    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                        img = background
-                    
-                    # Create thumbnail with high-quality downsampling
-                    img.thumbnail(
-                        settings.THUMBNAIL_SIZE,
-                        Image.Resampling.LANCZOS
-                    )
-                    
-                    # Save thumbnail to memory in WebP format
-                    thumb_io = io.BytesIO()
-                    img.save(
-                        thumb_io,
-                        format=settings.THUMBNAIL_FORMAT,
-                        quality=settings.THUMBNAIL_QUALITY,
-                        optimize=True,
-                        progressive=True
-                    )
-                    
-                    # Create thumbnail filename with WebP extension
-                    original_name = os.path.splitext(os.path.basename(self.image.name))[0]
-                    thumb_filename = f"{original_name}_thumb.{settings.THUMBNAIL_FORMAT.lower()}"
-                    
-                    # Delete old thumbnail if it exists
-                    if self.thumbnail:
-                        self.thumbnail.delete(save=False)
-                    
-                    # Save new thumbnail
-                    self.thumbnail.save(
-                        thumb_filename,
-                        ContentFile(thumb_io.getvalue()),
-                        save=False
-                    )
-                    
-            except Exception as e:
-                # If there's an error processing the image, continue without thumbnail
-                print(f"Error generating thumbnail: {str(e)}")
-        
-        super().save(*args, **kwargs)
-    
-    def get_changed_fields(self):
-        """Helper method to get changed fields"""
-        if not self.pk:
-            return []
-        model = self.__class__
-        old = model.objects.get(pk=self.pk)
-        return [field.name for field in model._meta.fields 
-                if getattr(self, field.name) != getattr(old, field.name)]
+        process_later = False
+        if self.image and (not self.pk or 'image' in changed_fields):
+            if getattr(settings, 'IMAGE_PROCESSING_ASYNC', True):
+                # Left to `run_worker`, so saving does not wait for the storage
+                self.image_status = self.IMAGE_PENDING
+                process_later = True
+            else:
+                try:
+                    self.process_image()
+                    self.image_status = self.IMAGE_READY
+                except Exception as e:
+                    print(f"Error processing image: {str(e)}")
+                    self.image_status = self.IMAGE_FAILED
+
+        if not slug_fields:
+            super().save(*args, **kwargs)
+        else:
+            for attempt in range(SLUG_SAVE_ATTEMPTS):
+                try:
+                    with transaction.atomic():
+                        super().save(*args, **kwargs)
+                    break
+                except IntegrityError:
+                    # Another page took the same slug since it was allocated
+                    if attempt == SLUG_SAVE_ATTEMPTS - 1:
+                        raise
+                    self.allocate_slugs(slug_fields)
+
+        if process_later:
+            # Imported here because the task module imports the models
+            from ..tasks import enqueue_image_processing
+            enqueue_image_processing(self)
+
+    def allocate_slugs(self, slug_fields):
+        """
+        Set unique slugs from the titles.
 
+        Args:
+            slug_fields: ``(title field, slug field)`` pairs
+        """
+        for title_field, slug_field in slug_fields:
+            setattr(self, slug_field, create_unique_slug(
+                ColoringPage, getattr(self, title_field), title_field, slug_field, exclude_pk=self.pk
+            ))
+
+    def process_image(self):
+        """
+        Build the hash, placeholder, thumbnail and derivatives of the image.
+
+        Sets the fields without saving them; raises if the image cannot be read.
+        """
+        # Open original image
+        with Image.open(self.image) as img:
+            # Convert to RGB if necessary (for PNG with transparency)
+            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                img = background
+
+            self.image_hash = image_hash(img)
+            self.metadata = dict(self.metadata or {}, placeholder=build_placeholder(img))
+
+            # Create thumbnail with high-quality downsampling
+            img.thumbnail(
+                settings.THUMBNAIL_SIZE,
+                Image.Resampling.LANCZOS
+            )
+
+            # Save thumbnail to memory in WebP format
+            thumb_io = io.BytesIO()
+            img.save(
+                thumb_io,
+                format=settings.THUMBNAIL_FORMAT,
+                quality=settings.THUMBNAIL_QUALITY,
+                optimize=True,
+                progressive=True
+            )
+
+            # Create thumbnail filename with WebP extension
+            original_name = os.path.splitext(os.path.basename(self.image.name))[0]
+            thumb_filename = f"{original_name}_thumb.{settings.THUMBNAIL_FORMAT.lower()}"
+
+            # Delete old thumbnail if it exists
+            if self.thumbnail:
+                self.thumbnail.delete(save=False)
+
+            # Save new thumbnail
+            self.thumbnail.save(
+                thumb_filename,
+                ContentFile(thumb_io.getvalue()),
+                save=False
+            )
+
+        old_derivatives = self.derivatives
+        self.derivatives = build_derivatives(self.image, self.image.storage)
+        if old_derivatives and old_derivatives.get('k') != self.derivatives['k']:
+            delete_derivatives(old_derivatives, self.image.storage)
+
+        # Traced again from the new image when next needed
+        if self.vector:
+            self.vector.delete(save=False)
+    
     def __str__(self):
         return self.title_en
 
@@ -137,8 +220,15 @@ class ColoringPage(TimeStampedModel):
         if self.thumbnail:
             thumbnail_storage, thumbnail_path = self.thumbnail.storage, self.thumbnail.path
         
+        derivatives = self.derivatives
+        vector = self.vector.name
+
         # Call the parent delete method
         super().delete(*args, **kwargs)
+        delete_derivatives(derivatives, storage)
+        delete_print_pdfs(self.image.name, storage)
+        if vector:
+            storage.delete(vector)
         
         # Delete the files after the model is deleted
         try:
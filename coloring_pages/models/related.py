@@ -0,0 +1,70 @@
+"""
+Precomputed "more like this" neighbours of the coloring pages.
+"""
+from collections import defaultdict
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .coloring_page import ColoringPage
+
+
+class RelatedPage(models.Model):
+    """
+    One of the most similar pages of a page, computed from the TF-IDF vectors
+    of the titles and prompts (see ``coloring_pages.search.related``).
+    """
+    page = models.ForeignKey(ColoringPage, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(ColoringPage, on_delete=models.CASCADE, related_name='related_to')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        verbose_name = _('Related Page')
+        verbose_name_plural = _('Related Pages')
+        ordering = ['page', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['page', 'rank'], name='unique_related_page_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.page_id} -> {self.related_id} ({self.score:.2f})"
+
+    @classmethod
+    def for_neighbours(cls, page_id, neighbours):
+        return [
+            cls(page_id=page_id, related_id=related_id, rank=rank, score=score)
+            for rank, (related_id, score) in enumerate(neighbours)
+        ]
+
+    @classmethod
+    def replace(cls, page_id, neighbours):
+        """
+        Replace the stored neighbours of a page.
+
+        Args:
+            page_id: The page
+            neighbours: ``(page id, score)`` tuples, most similar first
+        """
+        cls.objects.filter(page_id=page_id).delete()
+        cls.objects.bulk_create(cls.for_neighbours(page_id, neighbours))
+
+    @classmethod
+    def get_neighbours(cls, page_ids):
+        """
+        Returns:
+            dict: page id -> list of ``(page id, score)`` tuples, most similar first
+        """
+        neighbours = defaultdict(list)
+        rows = cls.objects.filter(page_id__in=page_ids).order_by('page_id', 'rank')
+        for page_id, related_id, score in rows.values_list('page_id', 'related_id', 'score'):
+            neighbours[page_id].append((related_id, score))
+        return dict(neighbours)
+
+    @staticmethod
+    def get_related_pages(page, limit=None):
+        """
+        The related pages of a page, most similar first, in one query.
+        """
+        pages = ColoringPage.objects.filter(related_to__page=page).order_by('related_to__rank')
+        return pages[:limit] if limit else pages
@@ -1,7 +1,15 @@
 """
 Models for search functionality and analytics.
 """
-from django.db import models
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Lower, Trim
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .base import TimeStampedModel, geoip, GEOIP_AVAILABLE
@@ -45,7 +53,16 @@ class SearchQuery(TimeStampedModel):
         if cls.is_duplicate_search(request, query):
             return None
             
-        search = cls(
+        search = cls.from_request(request, query, result_count)
+        search.save()
+        return search
+    
+    @classmethod
+    def from_request(cls, request, query, result_count):
+        """
+        Build an unsaved search query record from a request.
+        """
+        return cls(
             query=query,
             result_count=result_count,
             session_key=request.session.session_key,
@@ -55,8 +72,6 @@ class SearchQuery(TimeStampedModel):
             user_agent=request.META.get('HTTP_USER_AGENT'),
             referrer_url=request.META.get('HTTP_REFERER')
         )
-        search.save()
-        return search
     
     @classmethod
     def is_duplicate_search(cls, request, query):
@@ -82,28 +97,10 @@ class SearchQuery(TimeStampedModel):
         """
         Get the most popular search queries in the last N days that returned at least 1 result.
         If language is provided, only return searches from that language.
-        """
-        from django.utils import timezone
-        from django.db.models import Count
         
-        time_threshold = timezone.now() - timezone.timedelta(days=days)
-        
-        queryset = cls.objects.filter(
-            created_at__gte=time_threshold,
-            result_count__gt=0
-        )
-        
-        if language:
-            queryset = queryset.filter(language=language)
-        
-        # Convert the queryset to a list of dictionaries with both query and count
-        return list(
-            queryset
-            .values('query')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-            .values('query', 'count')[:limit]
-        )
+        The counts come from the daily rollups, see ``DailySearchRollup``.
+        """
+        return DailySearchRollup.get_popular_searches(days=days, limit=limit, language=language)
     
     def get_country(self):
         """
@@ -126,3 +123,177 @@ class SearchQuery(TimeStampedModel):
         else:
             ip = request.META.get('REMOTE_ADDR')
         return ip
+
+
+class DailySearchRollup(models.Model):
+    """
+    Number of searches per day, language and query.
+    
+    Rollups are incremented whenever the search log is written and can be
+    rebuilt from the raw ``SearchQuery`` rows with the
+    ``rollup_search_queries`` command. Queries are counted lowercase.
+    """
+    POPULAR_KEY = 'search:popular:%s:%d:%d'
+    
+    day = models.DateField()
+    language = models.CharField(max_length=10)
+    query = models.CharField(max_length=255)
+    search_count = models.PositiveIntegerField(default=0)
+    zero_result_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('Daily Search Rollup')
+        verbose_name_plural = _('Daily Search Rollups')
+        ordering = ['-day', '-search_count']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'language', 'query'], name='unique_daily_search_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['language', 'day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.query} ({self.day}, {self.language}: {self.search_count})"
+    
+    @staticmethod
+    def normalize_query(query):
+        return query.strip().lower()[:255]
+    
+    @classmethod
+    def add_searches(cls, searches):
+        """
+        Add saved search queries to their rollups.
+        
+        Args:
+            searches: ``SearchQuery`` instances with their ``created_at`` set
+        """
+        totals = defaultdict(lambda: [0, 0])
+        for search in searches:
+            key = (timezone.localdate(search.created_at), search.language, cls.normalize_query(search.query))
+            totals[key][0] += 1
+            totals[key][1] += search.result_count == 0
+        if not totals:
+            return
+        
+        with transaction.atomic():
+            # Make sure every row exists, then increment them in place so
+            # concurrent writers do not overwrite each other
+            cls.objects.bulk_create(
+                [cls(day=day, language=language, query=query) for day, language, query in totals],
+                ignore_conflicts=True
+            )
+            for (day, language, query), (search_count, zero_result_count) in totals.items():
+                cls.objects.filter(day=day, language=language, query=query).update(
+                    search_count=F('search_count') + search_count,
+                    zero_result_count=F('zero_result_count') + zero_result_count,
+                )
+    
+    @classmethod
+    def rebuild_day(cls, day):
+        """
+        Recompute the rollups of one day from the raw search queries.
+        
+        Returns:
+            int: The number of rollups written
+        """
+        rows = (
+            SearchQuery.objects
+            .filter(created_at__date=day)
+            .annotate(normalized=Lower(Trim('query')))
+            .values('language', 'normalized')
+            .annotate(
+                search_count=Count('id'),
+                zero_result_count=Count('id', filter=Q(result_count=0)),
+            )
+        )
+        rollups = [
+            cls(
+                day=day,
+                language=row['language'],
+                query=row['normalized'][:255],
+                search_count=row['search_count'],
+                zero_result_count=row['zero_result_count'],
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            cls.objects.filter(day=day).delete()
+            cls.objects.bulk_create(rollups)
+        return len(rollups)
+    
+    @classmethod
+    def in_period(cls, days, language=None):
+        """
+        Get the rollups of the last N days, including today.
+        """
+        queryset = cls.objects.filter(day__gt=timezone.localdate() - timedelta(days=days))
+        if language:
+            queryset = queryset.filter(language=language)
+        return queryset
+    
+    @classmethod
+    def get_popular_searches(cls, days=30, limit=10, language=None):
+        """
+        Get the most searched queries with results, cached for
+        ``SEARCH_POPULAR_CACHE_TIMEOUT`` seconds.
+        
+        Returns:
+            list: Dictionaries with the ``query`` and its ``count``
+        """
+        key = cls.POPULAR_KEY % (language or 'all', days, limit)
+        popular = cache.get(key)
+        if popular is None:
+            popular = cls.get_top_queries(days, limit, language)
+            cache.set(key, popular, timeout=getattr(settings, 'SEARCH_POPULAR_CACHE_TIMEOUT', 15 * 60))
+        return popular
+    
+    @classmethod
+    def get_top_queries(cls, days=30, limit=10, language=None, zero_results=False):
+        """
+        Get the most searched queries of the last N days.
+        
+        Args:
+            days: Number of days to look back
+            limit: Maximum number of queries
+            language: Only count searches in this language
+            zero_results: Count the searches without results instead of those with results
+        
+        Returns:
+            list: Dictionaries with the ``query`` and its ``count``
+        """
+        if zero_results:
+            count = Sum('zero_result_count')
+        else:
+            count = Sum(F('search_count') - F('zero_result_count'))
+        return list(
+            cls.in_period(days, language)
+            .values('query')
+            .annotate(count=count)
+            .filter(count__gt=0)
+            .order_by('-count', 'query')
+            .values('query', 'count')[:limit]
+        )
+
+
+class SearchTermTranslation(models.Model):
+    """
+    A translation of a search term stem, learned from the aligned English
+    and German texts of the pages by the ``build_term_map`` command.
+    """
+    language = models.CharField(max_length=10)
+    term = models.CharField(max_length=100)
+    translation = models.CharField(max_length=100)
+    score = models.FloatField()
+
+    class Meta:
+        verbose_name = _('Search Term Translation')
+        verbose_name_plural = _('Search Term Translations')
+        ordering = ['language', 'term', '-score']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['language', 'term', 'translation'], name='unique_search_term_translation'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.term} ({self.language}) -> {self.translation}"
@@ -0,0 +1,48 @@
+"""
+Background tasks, run by ``python manage.py run_worker``.
+"""
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .base import TimeStampedModel
+
+
+class Task(TimeStampedModel):
+    """
+    A unit of background work in the database-backed queue
+    (see ``coloring_pages.tasks``).
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, _('Pending')),
+        (RUNNING, _('Running')),
+        (DONE, _('Done')),
+        (FAILED, _('Failed')),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name=_('Name'))
+    # The same work is queued only once
+    key = models.CharField(max_length=255, unique=True, verbose_name=_('Idempotency key'))
+    payload = models.JSONField(blank=True, default=dict, verbose_name=_('Payload'))
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING, verbose_name=_('Status'))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_('Attempts'))
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name=_('Max attempts'))
+    run_at = models.DateTimeField(default=timezone.now, verbose_name=_('Run at'))
+    locked_at = models.DateTimeField(blank=True, null=True, verbose_name=_('Locked at'))
+    last_error = models.TextField(blank=True, verbose_name=_('Last error'))
+
+    class Meta:
+        verbose_name = _('Task')
+        verbose_name_plural = _('Tasks')
+        ordering = ['run_at', 'id']
+        indexes = [
+            # Backs the lookup of the next due task
+            models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
@@ -0,0 +1,146 @@
+"""
+ZIP downloads of several coloring pages at once.
+
+``iter_zip()`` writes a ZIP archive as a generator for a
+``StreamingHttpResponse``: each image is read from storage in chunks and
+passed on as it goes, so neither a temporary file nor the whole archive is
+ever held. PNGs are already compressed, so they are stored as they are
+(``ZIP_STORED``), which costs no CPU; the sizes and CRCs follow each entry
+in a data descriptor, which every unzip tool reads.
+
+Packs hold at most ``PACK_MAX_PAGES`` pages. A pack of chosen pages
+(``?ids=``) is streamed on every request; the pack of a search (``?q=``) is
+the same for everyone, so it is built once into ``PACK_DIR`` and served
+like any stored file, with ETags, ranges and offloading
+(see ``coloring_pages.serving``). Both are named after the pages and their
+``updated_at``, so a changed page gives a new pack and a new ETag.
+"""
+import hashlib
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+from django.utils.text import slugify
+
+from .serving import CHUNK_SIZE
+
+PACK_DIR = 'coloring_pages/packs'
+
+
+class StreamBuffer:
+    """
+    Write-only file collecting what ``zipfile`` writes until it is drained.
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def get_max_pages():
+    return getattr(settings, 'PACK_MAX_PAGES', 24)
+
+
+def pack_entries(pages, language):
+    """
+    Name the images of pages inside a pack, after their titles.
+
+    Returns:
+        list: ``(file name in the archive, image, updated_at)`` tuples
+    """
+    entries, used = [], set()
+    for page in pages:
+        if not page.image:
+            continue
+        title = getattr(page, f'title_{language}', '') or page.title_en
+        base = slugify(title) or f'page-{page.pk}'
+        filename, number = f'{base}.png', 1
+        while filename in used:
+            number += 1
+            filename = f'{base}-{number}.png'
+        used.add(filename)
+        entries.append((filename, page.image, page.updated_at))
+    return entries
+
+
+def pack_key(pages, language):
+    """
+    Hash of the pages of a pack and their versions.
+    """
+    versions = '|'.join(f'{page.pk}:{page.updated_at.timestamp()}' for page in pages)
+    return hashlib.sha1(f'{language}|{versions}'.encode('utf-8')).hexdigest()[:12]
+
+
+def iter_zip(entries):
+    """
+    Yield a ZIP archive of stored files in chunks.
+
+    Args:
+        entries: ``(file name in the archive, FieldFile, modified datetime)`` tuples
+    """
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for filename, field_file, modified in entries:
+            info = zipfile.ZipInfo(filename, date_time=modified.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            # Lets zipfile pick ZIP64 up front for huge files
+            info.file_size = field_file.storage.size(field_file.name)
+            with archive.open(info, 'w') as target, field_file.storage.open(field_file.name, 'rb') as source:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+    # The central directory
+    yield buffer.drain()
+
+
+def get_search_pack(query, language, pages, storage):
+    """
+    Get the prebuilt pack of a search, building and storing it on first use.
+
+    Args:
+        query: The normalized query
+        language: Language of the file names
+        pages: The pages of the pack
+        storage: Storage to keep the pack in
+
+    Returns:
+        str: Name of the pack in ``storage``
+    """
+    prefix = f'{slugify(query)[:50] or "pack"}-{language}.'
+    name = f'{PACK_DIR}/{prefix}{pack_key(pages, language)}.zip'
+    if storage.exists(name):
+        return name
+    with tempfile.TemporaryFile() as file:
+        for chunk in iter_zip(pack_entries(pages, language)):
+            file.write(chunk)
+        file.seek(0)
+        saved = storage.save(name, File(file, name=name))
+    if saved != name:
+        # Built by another request meanwhile
+        storage.delete(saved)
+        return name
+
+    # Packs of the same search from before its results changed
+    try:
+        _directories, files = storage.listdir(PACK_DIR)
+    except (OSError, NotImplementedError):
+        files = []
+    for filename in files:
+        if filename.startswith(prefix) and f'{PACK_DIR}/{filename}' != name:
+            storage.delete(f'{PACK_DIR}/{filename}')
+    return name
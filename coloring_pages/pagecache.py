@@ -0,0 +1,193 @@
+"""
+Full-page cache for anonymous visitors, with conditional GET.
+
+The detail, home and legal pages only change when a ``ColoringPage`` changes,
+so anonymous GETs are served from the Django cache, keyed by host, language
+and full path. Logged-in users (the admins) and requests with pending
+messages always get a freshly rendered page, and nothing is stored for them.
+
+Views declare what a page was built from with ``set_page_validators()``:
+
+- the pages it shows, whose ``updated_at`` gives the ETag and Last-Modified,
+- or that it is a listing, validated by the newest ``updated_at`` and the
+  number of pages.
+
+Every cache entry records the generation counters of what it depends on: one
+per shown page and one for the listings. Saving or deleting a page bumps its
+own counter and the listing counter, so exactly the entries that showed it
+are invalidated; pages that merely share the cache are untouched. Rewriting
+the related pages of a page invalidates that page as well. A hit costs two
+cache reads and no query.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date, quote_etag
+from django.utils.translation import get_language
+
+PAGE_KEY = 'pagecache:page:%s'
+PAGE_GENERATION_KEY = 'pagecache:generation:page:%d'
+LISTING_GENERATION_KEY = 'pagecache:generation:listing'
+# Bumped when every cached page is stale, e.g. after rebuilding the related pages
+ALL_GENERATION_KEY = 'pagecache:generation:all'
+
+# Headers that belong to the response being served, not to the cached page
+UNCACHED_HEADERS = {'set-cookie', 'vary'}
+
+
+def is_cacheable(request):
+    """
+    Whether a request may be answered from, and stored in, the page cache.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    # Messages are rendered into the page once, for this visitor only
+    return not len(get_messages(request))
+
+
+def get_page_key(request):
+    raw = '|'.join((request.get_host(), get_language() or '', request.get_full_path()))
+    return PAGE_KEY % hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def get_generations(keys):
+    """
+    Get the current value of generation counters; unset counters are 0.
+    """
+    values = cache.get_many(keys)
+    return {key: values.get(key, 0) for key in keys}
+
+
+def bump_generation(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The dummy cache never stores the counter
+        pass
+
+
+def set_page_validators(response, pages=(), listing=False):
+    """
+    Set the ETag and Last-Modified of a page and record what it depends on.
+
+    Args:
+        response: The response of the page
+        pages: The ``ColoringPage`` objects shown on the page
+        listing: Whether the page lists the newest pages of the catalog
+    """
+    dependencies = [ALL_GENERATION_KEY]
+    dependencies.extend(PAGE_GENERATION_KEY % page.pk for page in pages)
+    versions = [f'{page.pk}:{page.updated_at.timestamp()}' for page in pages]
+    last_modified = max((page.updated_at for page in pages), default=None)
+    if listing:
+        from .models.coloring_page import ColoringPage
+
+        catalog = ColoringPage.objects.aggregate(updated_at=Max('updated_at'), count=Count('id'))
+        dependencies.append(LISTING_GENERATION_KEY)
+        # The count changes when a page is deleted, the newest change does not
+        versions.append(f'listing:{catalog["count"]}:{catalog["updated_at"] and catalog["updated_at"].timestamp()}')
+        if catalog['updated_at'] and (last_modified is None or catalog['updated_at'] > last_modified):
+            last_modified = catalog['updated_at']
+
+    raw = '|'.join((get_language() or '', *versions))
+    response['ETag'] = quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response.page_cache_dependencies = dependencies
+
+
+def revalidate(response):
+    # Browsers keep the page but ask again, which the validators make cheap
+    patch_cache_control(response, max_age=0, must_revalidate=True)
+    return response
+
+
+def conditional(request, response):
+    last_modified = response.get('Last-Modified')
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=last_modified and parse_http_date(last_modified),
+        response=response,
+    )
+
+
+def cache_anonymous_page(view):
+    """
+    Serve a view from the page cache for anonymous GETs.
+
+    Responses are only stored if the view called ``set_page_validators()`` or
+    is a static page, which is validated by the hash of its content.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable(request):
+            return view(request, *args, **kwargs)
+
+        key = get_page_key(request)
+        entry = cache.get(key)
+        if entry is not None and get_generations(list(entry['dependencies'])) == entry['dependencies']:
+            response = HttpResponse(entry['content'], status=entry['status'])
+            for header, value in entry['headers']:
+                response[header] = value
+            return conditional(request, revalidate(response))
+
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        if response.status_code != 200 or response.streaming:
+            return response
+
+        dependencies = getattr(response, 'page_cache_dependencies', None)
+        if dependencies is None:
+            # A static page: the content is the only validator
+            response['ETag'] = quote_etag(hashlib.md5(response.content).hexdigest())
+            dependencies = [ALL_GENERATION_KEY]
+        # A change while the page rendered may be missed; the timeout bounds it
+        entry = {
+            'content': response.content,
+            'status': response.status_code,
+            'headers': [
+                (header, value) for header, value in response.items()
+                if header.lower() not in UNCACHED_HEADERS
+            ],
+            'dependencies': get_generations(dependencies),
+        }
+        cache.set(key, entry, getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+        return conditional(request, revalidate(response))
+
+    return wrapper
+
+
+def invalidate_pages(page_ids):
+    """
+    Invalidate the cached pages that show any of the given pages.
+    """
+    for pk in page_ids:
+        bump_generation(PAGE_GENERATION_KEY % pk)
+
+
+def invalidate_all():
+    bump_generation(ALL_GENERATION_KEY)
+
+
+def page_changed(sender, instance, **kwargs):
+    """post_save and post_delete handler that invalidates the cached pages showing a page."""
+    pk = instance.pk
+
+    def invalidate():
+        invalidate_pages([pk])
+        bump_generation(LISTING_GENERATION_KEY)
+
+    transaction.on_commit(invalidate)
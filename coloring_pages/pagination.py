@@ -0,0 +1,220 @@
+"""
+Pagination for the public listings.
+
+``ListingPaginator`` counts its objects once per request (using the planner's
+row estimate on PostgreSQL when the listing is huge) and serves the first
+``numbered_pages`` pages with ``?page=N`` links, which search engines crawl.
+Past those, querysets are paginated with a keyset cursor on
+``(created_at, id)`` (``?after=`` / ``?before=``), so deep pages cost the same
+as the first one instead of scanning an ever larger OFFSET.
+"""
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+LAST_PAGE = 'last'
+
+
+def encode_cursor(obj):
+    """
+    Encode the keyset position of an object as ``<microseconds>-<id>``.
+    """
+    return f'{(obj.created_at - EPOCH) // timedelta(microseconds=1)}-{obj.pk}'
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor created by ``encode_cursor``.
+
+    Returns:
+        tuple: ``(created_at, id)``, or None if the cursor is invalid
+    """
+    try:
+        micros, pk = cursor.split('-', 1)
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def estimate_count(queryset):
+    """
+    Get the PostgreSQL planner's row estimate for a queryset.
+
+    Returns:
+        int: The estimated number of rows, or None on other databases
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class ListingPage(Page):
+    """
+    A numbered page that knows the query string of its neighbours.
+    """
+    @property
+    def previous_query(self):
+        return f'page={self.number - 1}'
+
+    @property
+    def next_query(self):
+        # Continue with a cursor once the numbered pages run out
+        if self.paginator.keyset and self.number >= self.paginator.numbered_pages:
+            return f'after={encode_cursor(self.object_list[len(self.object_list) - 1])}'
+        return f'page={self.number + 1}'
+
+    @property
+    def first_query(self):
+        return 'page=1'
+
+    @property
+    def last_query(self):
+        if self.paginator.keyset and self.paginator.num_pages > self.paginator.numbered_pages:
+            return f'before={LAST_PAGE}'
+        return f'page={self.paginator.num_pages}'
+
+
+class KeysetPage:
+    """
+    A page fetched relative to a cursor instead of an offset.
+
+    It has no page number; links to its neighbours use cursors.
+    """
+    number = None
+
+    def __init__(self, object_list, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    @property
+    def previous_query(self):
+        return f'before={encode_cursor(self.object_list[0])}'
+
+    @property
+    def next_query(self):
+        return f'after={encode_cursor(self.object_list[-1])}'
+
+    @property
+    def first_query(self):
+        return 'page=1'
+
+    @property
+    def last_query(self):
+        return f'before={LAST_PAGE}'
+
+
+class ListingPaginator(Paginator):
+    """
+    Paginator for listings ordered newest first.
+
+    Querysets must be ordered by ``('-created_at', '-id')`` to be paginated
+    with cursors; other object lists (e.g. search result ids) only use
+    numbered pages.
+    """
+    def __init__(self, object_list, per_page, numbered_pages=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.numbered_pages = numbered_pages or getattr(settings, 'LISTING_NUMBERED_PAGES', 10)
+        self.keyset = isinstance(object_list, QuerySet)
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        """
+        Count the objects once, estimating on PostgreSQL above
+        ``LISTING_ESTIMATE_COUNT_ABOVE`` rows.
+        """
+        if self.keyset:
+            threshold = getattr(settings, 'LISTING_ESTIMATE_COUNT_ABOVE', 100000)
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate > threshold:
+                self.count_is_estimate = True
+                return estimate
+        return super().count
+
+    @property
+    def page_range(self):
+        """
+        Only the numbered pages of cursor-paginated listings get page links.
+        """
+        if not self.keyset:
+            return super().page_range
+        return range(1, min(self.num_pages, self.numbered_pages) + 1)
+
+    def _get_page(self, *args, **kwargs):
+        return ListingPage(*args, **kwargs)
+
+    def get_listing_page(self, params):
+        """
+        Get the page requested by ``page``, ``after`` or ``before`` parameters.
+
+        Args:
+            params: The request's GET parameters
+
+        Returns:
+            ListingPage or KeysetPage: The requested page
+        """
+        if self.keyset:
+            if params.get('before') == LAST_PAGE:
+                return self.keyset_page(None, forward=False)
+            for name, forward in (('after', True), ('before', False)):
+                position = decode_cursor(params.get(name))
+                if position:
+                    return self.keyset_page(position, forward)
+        return self.get_page(params.get('page', 1))
+
+    def keyset_page(self, position, forward):
+        """
+        Fetch the page after (or before) a keyset position.
+
+        Args:
+            position: ``(created_at, id)`` tuple, or None for the last page
+            forward: Whether to fetch older (True) or newer (False) objects
+        """
+        queryset = self.object_list
+        if position:
+            created_at, pk = position
+            if forward:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+        if not forward:
+            queryset = queryset.reverse()
+
+        # One extra row tells whether there is another page in this direction
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            return KeysetPage(rows, self, has_previous=True, has_next=more)
+        rows.reverse()
+        return KeysetPage(rows, self, has_previous=more, has_next=position is not None)
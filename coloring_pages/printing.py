@@ -0,0 +1,152 @@
+"""
+Print-ready PDFs of the coloring pages.
+
+``render_print_pdf()`` draws the traced outlines of a page (see
+``coloring_pages.vectorize``) as vector paths, fitted into the printable area
+of an A4 or US Letter sheet and centered, so prints are sharp at any size
+and carry none of the website around them. The PDF is written directly: one
+page with one Flate-compressed content stream, and ``/PrintScaling /None``
+so print dialogs do not shrink it again.
+
+Each page and paper size is rendered once and kept next to the image
+derivatives, named after the image and ``updated_at``; editing the page
+gives a new name, and the stale file is deleted when the new one is made.
+"""
+import hashlib
+import os
+import zlib
+
+from django.core.files.base import ContentFile
+
+from .derivatives import DERIVATIVE_DIR
+from .vectorize import SCALE, trace_outlines
+
+# Sheet sizes in PostScript points
+PAPER_SIZES = {
+    'a4': (595.276, 841.89),
+    'letter': (612.0, 792.0),
+}
+# 15 mm, inside what any printer can reach
+MARGIN = 42.52
+
+
+def content_stream(width, height, paths, paper_width, paper_height, margin=MARGIN):
+    """
+    Draw outlines fitted and centered into the area inside the margins.
+
+    Returns:
+        bytes: PDF page content operators
+    """
+    scale = min((paper_width - 2 * margin) / width, (paper_height - 2 * margin) / height)
+    left = (paper_width - width * scale) / 2
+    top = (paper_height + height * scale) / 2
+
+    def point(x, y):
+        return f'{round(x * SCALE)} {round(y * SCALE)}'
+
+    # Paths are in 1 / SCALE pixels, y growing downwards
+    operators = ['q', f'{scale / SCALE:.6f} 0 0 {-scale / SCALE:.6f} {left:.3f} {top:.3f} cm', '0 g']
+    for segments in paths:
+        operators.append(f'{point(*segments[-1][-1])} m')
+        for command, *targets in segments:
+            if command == 'L':
+                operators.extend(f'{point(*target)} l' for target in targets)
+            else:
+                operators.append(' '.join(point(*target) for target in targets) + ' c')
+        operators.append('h')
+    if paths:
+        operators.append('f*')
+    operators.append('Q')
+    return '\n'.join(operators).encode('ascii')
+
+
+def write_pdf(paper_width, paper_height, content):
+    """
+    Write a single page PDF document.
+    """
+    stream = zlib.compress(content, 9)
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R /ViewerPreferences << /PrintScaling /None >> >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {paper_width} {paper_height}] '
+         f'/Resources << >> /Contents 4 0 R >>').encode('ascii'),
+        f'<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n'.encode('ascii') + stream + b'\nendstream',
+    ]
+    document = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(document))
+        document += f'{number} 0 obj\n'.encode('ascii') + body + b'\nendobj\n'
+    xref = len(document)
+    document += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii')
+    document += b''.join(f'{offset:010d} 00000 n \n'.encode('ascii') for offset in offsets)
+    document += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('ascii')
+    return bytes(document)
+
+
+def render_print_pdf(data, size='a4'):
+    """
+    Render an image as a print-ready PDF.
+
+    Args:
+        data: The encoded image
+        size: Key of ``PAPER_SIZES``
+
+    Returns:
+        bytes: The PDF document
+    """
+    paper_width, paper_height = PAPER_SIZES[size]
+    width, height, paths = trace_outlines(data)
+    return write_pdf(paper_width, paper_height, content_stream(width, height, paths, paper_width, paper_height))
+
+
+def print_pdf_prefix(image_name, size):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f'{stem}-print-{size}.'
+
+
+def print_pdf_name(page, size):
+    key = hashlib.sha1(f'{page.image.name}|{page.updated_at.isoformat()}'.encode('utf-8')).hexdigest()[:12]
+    return f'{DERIVATIVE_DIR}/{print_pdf_prefix(page.image.name, size)}{key}.pdf'
+
+
+def delete_print_pdfs(image_name, storage, sizes=PAPER_SIZES, keep=None):
+    """
+    Delete the print PDFs of an image, except ``keep``.
+    """
+    prefixes = tuple(print_pdf_prefix(image_name, size) for size in sizes)
+    try:
+        _directories, files = storage.listdir(DERIVATIVE_DIR)
+    except (OSError, NotImplementedError):
+        return
+    for filename in files:
+        name = f'{DERIVATIVE_DIR}/{filename}'
+        if filename.startswith(prefixes) and filename.endswith('.pdf') and name != keep:
+            storage.delete(name)
+
+
+def get_print_pdf(page, size):
+    """
+    Get the print PDF of a page, rendering and storing it on first use.
+
+    Args:
+        page: The coloring page, with ``image`` and ``updated_at``
+        size: Key of ``PAPER_SIZES``
+
+    Returns:
+        str: Name of the PDF in the image storage
+    """
+    storage = page.image.storage
+    name = print_pdf_name(page, size)
+    if storage.exists(name):
+        return name
+    with storage.open(page.image.name) as file:
+        pdf = render_print_pdf(file.read(), size)
+    saved = storage.save(name, ContentFile(pdf))
+    if saved != name:
+        # Rendered by another request meanwhile
+        storage.delete(saved)
+        return name
+    # The one made before the page was last changed
+    delete_print_pdfs(page.image.name, storage, sizes=[size], keep=name)
+    return name
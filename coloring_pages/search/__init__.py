@@ -0,0 +1,11 @@
+"""
+Search engine for the coloring_pages app.
+
+To run a search, use: `from coloring_pages.search import get_search_backend`
+"""
+from .backends import get_search_backend, hydrate_pages
+
+__all__ = [
+    'get_search_backend',
+    'hydrate_pages',
+]
@@ -0,0 +1,299 @@
+"""
+Pluggable full-text search backends for coloring pages.
+
+Every backend answers a query with a ranked list of ``ColoringPage`` ids,
+title matches first, then description matches, then prompt matches. Callers
+paginate the id list and only load the rows of the page they display.
+
+- ``PostgresSearchBackend`` uses the ``search_vector_en``/``search_vector_de``
+  tsvector columns (``english``/``german`` configs) and their GIN indexes.
+- ``SQLiteSearchBackend`` uses an FTS5 table kept in sync by triggers.
+- ``DatabaseSearchBackend`` falls back to ``icontains`` on other databases.
+
+Queries are expanded across languages first (stems, umlaut folding and the
+bilingual term map, see ``expansion``): every query term becomes a group of
+alternatives matched as prefixes, and a page has to match every group.
+
+When a query finds nothing, ``fuzzy_search_ids`` retries it with trigram
+similarity (pg_trgm on PostgreSQL, ``trigram.TrigramIndex`` elsewhere).
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+# Word characters without the underscore, which the FTS parsers treat as a
+# separator anyway.
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def tokenize(query):
+    """
+    Split a user query into lowercase search terms.
+
+    Args:
+        query: The raw query string
+
+    Returns:
+        list: The search terms in query order
+    """
+    return TOKEN_RE.findall((query or '').lower())
+
+
+def hydrate_pages(ids):
+    """
+    Load coloring pages for a list of ids, preserving the order of the ids.
+
+    Args:
+        ids: Ordered ``ColoringPage`` primary keys
+
+    Returns:
+        list: ``ColoringPage`` instances in the order of ``ids``
+    """
+    from ..models.coloring_page import ColoringPage
+
+    pages = ColoringPage.objects.in_bulk(list(ids))
+    return [pages[pk] for pk in ids if pk in pages]
+
+
+class BaseSearchBackend:
+    """
+    Interface shared by all search backends.
+    """
+    def __init__(self, max_results=None):
+        self.max_results = max_results or getattr(settings, 'SEARCH_MAX_RESULTS', 1000)
+
+    @property
+    def table(self):
+        from ..models.coloring_page import ColoringPage
+        return ColoringPage._meta.db_table
+
+    def search_ids(self, query):
+        """
+        Return the ids of matching coloring pages, best match first.
+        """
+        raise NotImplementedError
+
+    def expand(self, query):
+        """
+        Expand a query to groups of alternatives, one group per query term.
+        """
+        from .expansion import expand_query
+
+        return expand_query(query)
+
+    def fuzzy_search_ids(self, query):
+        """
+        Return the ids of pages matching the query with typos, best match first.
+
+        Used as a fallback when ``search_ids`` finds nothing. The default
+        implementation uses the in-process trigram index.
+        """
+        from .trigram import fuzzy_page_ids
+
+        return fuzzy_page_ids(query, max_results=self.max_results)
+
+    def ensure_schema(self, connection):
+        """
+        Create any index structures the backend needs. Called after migrate.
+        """
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Unindexed fallback that ORs ``icontains`` filters over all text columns.
+    """
+    fields = ('title_en', 'title_de', 'description_en', 'description_de', 'prompt')
+
+    def search_ids(self, query):
+        from ..models.coloring_page import ColoringPage
+
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        queryset = ColoringPage.objects.all()
+        for term, group in zip(terms, self.expand(query)):
+            # The columns are not folded, so keep the term as typed too
+            condition = Q()
+            for variant in dict.fromkeys([term, *group]):
+                for field in self.fields:
+                    condition |= Q(**{f'{field}__icontains': variant})
+            queryset = queryset.filter(condition)
+        return list(
+            queryset.order_by('-created_at').values_list('id', flat=True)[:self.max_results]
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Full-text search over the generated tsvector columns added in migration 0017.
+
+    Titles carry weight A, descriptions weight B and the prompt weight C, so
+    ``ts_rank`` puts title hits above description hits.
+    """
+    def build_tsquery(self, groups):
+        return ' & '.join(
+            '(' + ' | '.join(f'{variant}:*' for variant in group) + ')' for group in groups
+        )
+
+    def search_ids(self, query):
+        groups = self.expand(query)
+        if not groups:
+            return []
+
+        tsquery = self.build_tsquery(groups)
+        sql = f"""
+            SELECT id FROM {self.table},
+                to_tsquery('english', %s) AS query_en,
+                to_tsquery('german', %s) AS query_de
+            WHERE search_vector_en @@ query_en OR search_vector_de @@ query_de
+            ORDER BY GREATEST(
+                ts_rank(search_vector_en, query_en),
+                ts_rank(search_vector_de, query_de)
+            ) DESC, created_at DESC
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [tsquery, tsquery, self.max_results])
+            return [row[0] for row in cursor.fetchall()]
+
+    def fuzzy_search_ids(self, query):
+        """
+        Typo-tolerant matching with pg_trgm word similarity (migration 0018).
+        """
+        query = ' '.join(tokenize(query))
+        if not query:
+            return []
+
+        sql = f"""
+            SELECT id FROM {self.table}
+            WHERE %s <%% title_en OR %s <%% title_de OR %s <%% prompt
+            ORDER BY GREATEST(
+                word_similarity(%s, title_en),
+                word_similarity(%s, title_de),
+                word_similarity(%s, prompt) * 0.5
+            ) DESC, created_at DESC
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [query] * 6 + [self.max_results])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Full-text search over an external-content FTS5 table.
+
+    The FTS table and its sync triggers are (re)created after every migrate,
+    because SQLite drops a table's triggers whenever Django rebuilds it.
+    """
+    columns = ('title_en', 'title_de', 'description_en', 'description_de', 'prompt')
+    # bm25 column weights, in the order of ``columns``
+    weights = (10.0, 10.0, 3.0, 3.0, 1.0)
+
+    @property
+    def fts_table(self):
+        return f'{self.table}_fts'
+
+    def build_match(self, groups):
+        clauses = []
+        for group in groups:
+            variants = list(group)
+            # unicode61 folds umlauts but not ß
+            variants += [variant.replace('ss', 'ß') for variant in group if 'ss' in variant]
+            clauses.append('(' + ' OR '.join(f'"{variant}"*' for variant in variants) + ')')
+        return ' AND '.join(clauses)
+
+    def search_ids(self, query):
+        groups = self.expand(query)
+        if not groups:
+            return []
+
+        weights = ', '.join(str(weight) for weight in self.weights)
+        sql = f"""
+            SELECT rowid FROM {self.fts_table}
+            WHERE {self.fts_table} MATCH %s
+            ORDER BY bm25({self.fts_table}, {weights}), rowid DESC
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.build_match(groups), self.max_results])
+            return [row[0] for row in cursor.fetchall()]
+
+    def ensure_schema(self, connection):
+        table, fts = self.table, self.fts_table
+        columns = ', '.join(self.columns)
+        new_values = ', '.join(f'new.{column}' for column in self.columns)
+        old_values = ', '.join(f'old.{column}' for column in self.columns)
+
+        statements = {
+            fts: (
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, "
+                f"content='{table}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            ),
+            f'{fts}_ai': (
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            ),
+            f'{fts}_ad': (
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+                f"VALUES ('delete', old.id, {old_values}); END"
+            ),
+            f'{fts}_au': (
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+                f"VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            ),
+        }
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            if table not in existing:
+                return
+
+            missing = [name for name in statements if name not in existing]
+            for name in missing:
+                cursor.execute(statements[name])
+            if missing:
+                # Re-index everything written while the triggers were absent
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+VENDOR_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Get the configured search backend.
+
+    Uses ``settings.SEARCH_BACKEND`` (a dotted path) when set, otherwise
+    picks the backend matching the database vendor.
+
+    Returns:
+        BaseSearchBackend: The search backend instance
+    """
+    backend_path = getattr(settings, 'SEARCH_BACKEND', '')
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connection.vendor, DatabaseSearchBackend)()
+
+
+def ensure_search_schema(sender, using, **kwargs):
+    """
+    post_migrate handler that installs the search backend's index structures.
+    """
+    from django.db import connections
+
+    get_search_backend().ensure_schema(connections[using])
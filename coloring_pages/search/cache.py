@@ -0,0 +1,142 @@
+"""
+Search result cache.
+
+Results are cached per normalized query, language and page number as the
+list of page ids on that page plus the total count, so a hit only costs one
+cache read and the query that hydrates the displayed pages.
+
+Keys embed the catalog version (see ``coloring_pages.catalog``), which is
+bumped whenever a ``ColoringPage`` is saved or deleted. Entries written for an
+older catalog are never read again and simply expire.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+
+from ..catalog import get_catalog_version
+from .backends import get_search_backend, tokenize
+from .trigram import suggest_queries
+
+RESULT_KEY = 'search:results:%d:%s:%s:%d'
+HITS_KEY = 'search:results:hits'
+MISSES_KEY = 'search:results:misses'
+
+
+def normalize_query(query):
+    """
+    Normalize a query so equivalent spellings share a cache entry.
+
+    Args:
+        query: The raw query string
+
+    Returns:
+        str: The lowercase search terms separated by single spaces
+    """
+    return ' '.join(tokenize(query))
+
+
+def parse_page_number(page_number):
+    """
+    Parse a page number from the request, defaulting to the first page.
+    """
+    try:
+        return max(int(page_number), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def increment(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The dummy cache does not count
+        pass
+
+
+def run_search(query, language, page_number, per_page):
+    """
+    Run a search and build the cache entry for one page of its results.
+    """
+    backend = get_search_backend()
+    ids = backend.search_ids(query)
+    exact_count = len(ids)
+    is_fuzzy = False
+    suggestions = []
+
+    # Fall back to typo-tolerant matching and suggest similar queries
+    if not ids:
+        ids = backend.fuzzy_search_ids(query)
+        is_fuzzy = bool(ids)
+        suggestions = suggest_queries(query, language)
+
+    page = Paginator(ids, per_page).get_page(page_number)
+    return {
+        'ids': list(page.object_list),
+        'number': page.number,
+        'count': len(ids),
+        'exact_count': exact_count,
+        'is_fuzzy': is_fuzzy,
+        'suggestions': suggestions,
+    }
+
+
+def search_page(query, language, page_number, per_page):
+    """
+    Get one page of search results, from the cache when possible.
+
+    Args:
+        query: The raw query string
+        language: The language of the request
+        page_number: The requested page number (may be invalid)
+        per_page: Number of results per page
+
+    Returns:
+        dict: The page's ``ids``, its actual ``number``, the total ``count``,
+        the ``exact_count`` before the fuzzy fallback, ``is_fuzzy`` and
+        ``suggestions``
+    """
+    page_number = parse_page_number(page_number)
+    normalized = normalize_query(query)
+    timeout = getattr(settings, 'SEARCH_RESULT_CACHE_TIMEOUT', 60 * 60)
+    if not timeout:
+        return run_search(normalized, language, page_number, per_page)
+
+    digest = hashlib.md5(f'{normalized}:{per_page}'.encode()).hexdigest()
+    key = RESULT_KEY % (get_catalog_version(), language, digest, page_number)
+
+    entry = cache.get(key)
+    if entry is not None:
+        increment(HITS_KEY)
+        return entry
+
+    increment(MISSES_KEY)
+    entry = run_search(normalized, language, page_number, per_page)
+    cache.set(key, entry, timeout=timeout)
+    return entry
+
+
+def get_cache_stats():
+    """
+    Get the hit and miss counters of the result cache.
+
+    Returns:
+        dict: ``hits``, ``misses`` and ``hit_ratio`` (None before any lookup)
+    """
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / lookups if lookups else None,
+    }
+
+
+def reset_cache_stats():
+    """
+    Reset the hit and miss counters.
+    """
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,207 @@
+"""
+Cross-lingual query expansion.
+
+Every query term is expanded to a group of alternatives that the search
+backends OR together (groups are ANDed):
+
+- the term with umlauts folded to their base vowel and ß to ss, so
+  "Kätzchen" and "Katzchen" search alike,
+- its German and English stems, matched as prefixes, so "Katze" also finds
+  "Kätzchen" and "puppy" also finds "puppies",
+- translations of the stems from the bilingual term map, so "Katze" also
+  finds pages whose English text says "cat".
+
+The term map is precomputed from the aligned English and German titles and
+descriptions of the pages by ``python manage.py build_term_map`` and stored in
+``SearchTermTranslation``. Terms that appear together on many pages, one in
+each language, are taken as translations (Dice coefficient).
+"""
+from collections import Counter, defaultdict
+
+from .backends import tokenize
+from .trigram import LazyIndex
+
+# Shortest stems that are still specific enough to be matched as a prefix.
+# German suffix stripping is more aggressive, so its stems are kept longer.
+MIN_STEM_LENGTH = 3
+MIN_GERMAN_STEM_LENGTH = 4
+# Description terms used per page when building the term map
+MAX_DESCRIPTION_TERMS = 25
+
+UMLAUTS = str.maketrans({'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss'})
+
+STOP_WORDS = frozenset((
+    # English
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in',
+    'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'their', 'this', 'to',
+    'with', 'while', 'who', 'page', 'coloring', 'colouring',
+    # German
+    'am', 'auf', 'aus', 'bei', 'das', 'dem', 'den', 'der', 'des', 'die', 'ein',
+    'eine', 'einem', 'einen', 'einer', 'es', 'für', 'im', 'ist', 'mit', 'sich',
+    'und', 'von', 'vor', 'während', 'zum', 'zur', 'ausmalbild', 'malvorlage',
+))
+
+GERMAN_SUFFIXES = ('ern', 'em', 'er', 'en', 'es', 'e', 's')
+GERMAN_DIMINUTIVES = ('chen', 'lein')
+ENGLISH_SUFFIXES = ('ing', 'ed', 'ly')
+
+
+def fold(term):
+    """
+    Fold German spelling variants: umlauts to their base vowel, ß to ss.
+    """
+    return term.translate(UMLAUTS)
+
+
+def strip_suffix(term, suffixes, min_length=MIN_STEM_LENGTH):
+    for suffix in suffixes:
+        if term.endswith(suffix) and len(term) - len(suffix) >= min_length:
+            return term[:-len(suffix)]
+    return term
+
+
+def german_stem(term):
+    """
+    Light German stemmer: folds umlauts and strips diminutive and
+    inflection suffixes ("Kätzchen" and "Katzen" become "katz").
+    """
+    stem = strip_suffix(fold(term), GERMAN_DIMINUTIVES, MIN_GERMAN_STEM_LENGTH)
+    return strip_suffix(stem, GERMAN_SUFFIXES, MIN_GERMAN_STEM_LENGTH)
+
+
+def english_stem(term):
+    """
+    Light English stemmer that keeps stems a prefix of the word forms they
+    stand for ("puppy" and "puppies" become "pupp", "sleeping" becomes "sleep").
+    """
+    if len(term) <= MIN_STEM_LENGTH:
+        return term
+    if term.endswith('ies'):
+        return strip_suffix(term, ('ies',))
+    if term.endswith('y') and term[-2] not in 'aeiou':
+        return strip_suffix(term, ('y',))
+    if term.endswith(('sses', 'shes', 'ches', 'xes', 'zes')):
+        return term[:-2]
+    if term.endswith('s') and not term.endswith(('ss', 'us', 'is')):
+        return term[:-1]
+    stem = strip_suffix(term, ENGLISH_SUFFIXES)
+    if stem != term and len(stem) > MIN_STEM_LENGTH and stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+        # running -> runn -> run
+        stem = stem[:-1]
+    return stem
+
+
+def prune_prefixes(variants):
+    """
+    Drop variants that start with another variant, which already covers them
+    as a prefix match.
+    """
+    kept = []
+    for variant in sorted(set(variants), key=len):
+        if not any(variant.startswith(shorter) for shorter in kept):
+            kept.append(variant)
+    return kept
+
+
+def expand_term(term, translations=None):
+    """
+    Expand one query term to its alternatives.
+
+    Args:
+        term: A lowercase query term
+        translations: The term map, ``{language: {stem: [translations]}}``
+
+    Returns:
+        list: Alternatives to match as prefixes
+    """
+    folded = fold(term)
+    if term in STOP_WORDS:
+        return [folded]
+
+    stems = {'de': german_stem(term), 'en': english_stem(folded)}
+    variants = [folded, *stems.values()]
+    for language, stem in stems.items():
+        variants.extend((translations or {}).get(language, {}).get(stem, ()))
+    return prune_prefixes(variant for variant in variants if len(variant) >= min(len(folded), MIN_STEM_LENGTH))
+
+
+def expand_query(query):
+    """
+    Expand a query to groups of alternatives, one group per query term.
+
+    Returns:
+        list: Lists of alternatives; a page matches if it matches one
+        alternative of every group
+    """
+    translations = term_map.get()
+    return [expand_term(term, translations) for term in dict.fromkeys(tokenize(query))]
+
+
+def page_stems(text, stem, limit=None):
+    stems = []
+    for term in tokenize(text):
+        if term not in STOP_WORDS and len(term) >= MIN_STEM_LENGTH:
+            stems.append(stem(term))
+    return list(dict.fromkeys(stems))[:limit]
+
+
+def compute_term_map(rows, min_pages=2, min_score=0.3, max_translations=3):
+    """
+    Find translations from aligned English and German texts.
+
+    Args:
+        rows: ``(title_en, title_de, description_en, description_de)`` tuples
+        min_pages: Minimum number of pages a pair has to appear on
+        min_score: Minimum Dice coefficient of a pair
+        max_translations: Maximum number of translations per term
+
+    Returns:
+        list: ``(language, term, translation, score)`` tuples in both directions
+    """
+    counts = {'en': Counter(), 'de': Counter()}
+    pairs = Counter()
+    for title_en, title_de, description_en, description_de in rows:
+        page_pairs = set()
+        aligned = (
+            (page_stems(title_en, english_stem), page_stems(title_de, german_stem)),
+            (
+                page_stems(description_en, english_stem, MAX_DESCRIPTION_TERMS),
+                page_stems(description_de, german_stem, MAX_DESCRIPTION_TERMS),
+            ),
+        )
+        for english, german in aligned:
+            page_pairs.update((en, de) for en in english for de in german if en != de)
+        counts['en'].update({en for english, _german in aligned for en in english})
+        counts['de'].update({de for _english, german in aligned for de in german})
+        pairs.update(page_pairs)
+
+    candidates = defaultdict(list)
+    for (en, de), together in pairs.items():
+        if together < min_pages:
+            continue
+        score = 2 * together / (counts['en'][en] + counts['de'][de])
+        if score >= min_score:
+            candidates[('en', en)].append((score, de))
+            candidates[('de', de)].append((score, en))
+
+    term_map = []
+    for (language, term), found in candidates.items():
+        for score, translation in sorted(found, reverse=True)[:max_translations]:
+            term_map.append((language, term, translation, score))
+    return term_map
+
+
+def load_term_map():
+    """
+    Load the stored term map, best translations first.
+    """
+    from ..models.search import SearchTermTranslation
+
+    translations = defaultdict(lambda: defaultdict(list))
+    rows = SearchTermTranslation.objects.order_by('-score').values_list('language', 'term', 'translation')
+    for language, term, translation in rows.iterator():
+        translations[language][term].append(translation)
+    return {language: dict(terms) for language, terms in translations.items()}
+
+
+term_map = LazyIndex(load_term_map, 'SEARCH_TERM_MAP_TTL', 3600)
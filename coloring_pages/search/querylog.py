@@ -0,0 +1,141 @@
+"""
+Write-behind logging of search queries.
+
+Searches are recorded in an in-process buffer instead of being inserted one by
+one while the user waits. Repeated searches for the same query from the same
+session within ``SEARCH_LOG_DEDUPE_WINDOW`` seconds are dropped in memory, and
+the buffer is written with ``bulk_create`` by a background thread once it
+holds ``SEARCH_LOG_BATCH_SIZE`` searches or ``SEARCH_LOG_FLUSH_INTERVAL``
+seconds have passed, and when the worker exits. The same write adds the
+searches to their daily rollups.
+
+Under load only a fraction of the searches can be logged by lowering
+``SEARCH_LOG_SAMPLE_RATE``. Setting ``SEARCH_LOG_FLUSH_INTERVAL`` to 0 writes
+each search immediately, which the tests rely on.
+
+The de-duplication only sees the searches of its own worker, and a logged
+search gets its ``created_at`` when the buffer is written, i.e. at most one
+flush interval late.
+"""
+import atexit
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+from ..models.search import DailySearchRollup, SearchQuery
+
+logger = logging.getLogger(__name__)
+
+
+class SearchLogBuffer:
+    """
+    Buffer of search queries waiting to be written.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []
+        # (session key, lowercase query) -> monotonic time it was last logged
+        self.seen = {}
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'SEARCH_LOG_FLUSH_INTERVAL', 10)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'SEARCH_LOG_BATCH_SIZE', 200)
+
+    def log(self, request, query, result_count):
+        """
+        Record a search unless it repeats a recent one or is not sampled.
+
+        Args:
+            request: The search request
+            query: The search query
+            result_count: The number of results found
+
+        Returns:
+            bool: Whether the search was recorded
+        """
+        if not query or not query.strip():
+            return False
+        if random.random() >= getattr(settings, 'SEARCH_LOG_SAMPLE_RATE', 1.0):
+            return False
+
+        session_key = request.session.session_key
+        search = SearchQuery.from_request(request, query, result_count)
+        now = time.monotonic()
+        with self.lock:
+            if session_key:
+                key = (session_key, query.lower())
+                window = getattr(settings, 'SEARCH_LOG_DEDUPE_WINDOW', 5 * 60)
+                if now - self.seen.get(key, -window) < window:
+                    return False
+                self.seen[key] = now
+            self.pending.append(search)
+            full = len(self.pending) >= self.batch_size
+
+        if not self.flush_interval:
+            self.flush()
+        else:
+            self.start()
+            if full:
+                self.wakeup.set()
+        return True
+
+    def flush(self):
+        """
+        Write all buffered searches.
+
+        Returns:
+            int: The number of searches written
+        """
+        with self.lock:
+            batch, self.pending = self.pending, []
+            # Forget sessions that are outside the window again
+            window = getattr(settings, 'SEARCH_LOG_DEDUPE_WINDOW', 5 * 60)
+            horizon = time.monotonic() - window
+            self.seen = {key: seen for key, seen in self.seen.items() if seen > horizon}
+        if not batch:
+            return 0
+        try:
+            with transaction.atomic():
+                SearchQuery.objects.bulk_create(batch, batch_size=self.batch_size)
+                DailySearchRollup.add_searches(batch)
+        except DatabaseError:
+            logger.exception('Could not write %d search queries', len(batch))
+            return 0
+        return len(batch)
+
+    def start(self):
+        """
+        Start the background flush thread of this process if needed.
+        """
+        if self.thread and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self.run, name='search-log-flush', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # This thread's connection would otherwise stay open forever
+                connections.close_all()
+
+
+search_log = SearchLogBuffer()
+# Write what is left when the worker shuts down
+atexit.register(search_log.flush)
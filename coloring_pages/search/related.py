@@ -0,0 +1,282 @@
+"""
+"More like this": related pages from precomputed TF-IDF neighbours.
+
+Titles (both languages, weighted double) and prompts are turned into a sparse
+TF-IDF matrix (CSR, built with NumPy). Each page's most similar pages by
+cosine similarity are stored in ``RelatedPage``, so the detail view reads them
+with one indexed query.
+
+Neighbours are computed by scattering a row through the postings of its
+terms (the transposed matrix), so a page is only compared with pages that
+share a term. Terms on more than ``RELATED_PAGES_MAX_DF`` of the pages and
+terms on a single page carry no signal and are left out, and every page keeps
+only its ``RELATED_PAGES_MAX_TERMS`` heaviest terms.
+
+``python manage.py build_related_pages`` recomputes the whole table. When a
+page is added, its neighbours are computed in a background thread and the new
+page is offered to the lists of those neighbours.
+
+Measured with ``manage.py benchmark_related_pages`` (synthetic pages with
+4-word titles in both languages and 20-word prompts drawn from a 20k-word Zipf
+vocabulary, k=8, CPython 3.11, NumPy 2)::
+
+       pages     matrix   neighbours   per page     memory
+      10,000      0.3 s        1.7 s    0.17 ms     2.6 MB
+     100,000      3.4 s       40.9 s    0.41 ms    26.2 MB
+
+"""
+import logging
+import math
+import threading
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+
+from ..pagecache import invalidate_all, invalidate_pages
+from .backends import tokenize
+from .expansion import MIN_STEM_LENGTH, STOP_WORDS, fold
+
+logger = logging.getLogger(__name__)
+
+TITLE_WEIGHT = 2
+# Small catalogs keep their common terms: too few pages to be slow
+MIN_MAX_DF_PAGES = 100
+
+
+def page_terms(title_en, title_de, prompt):
+    """
+    Count the terms of a page, titles counting double.
+
+    Returns:
+        Counter: folded term -> weighted count
+    """
+    counts = Counter()
+    for text, weight in ((title_en, TITLE_WEIGHT), (title_de, TITLE_WEIGHT), (prompt, 1)):
+        for term in tokenize(text):
+            if term not in STOP_WORDS and len(term) >= MIN_STEM_LENGTH:
+                counts[fold(term)] += weight
+    return counts
+
+
+class TfidfMatrix:
+    """
+    L2-normalized TF-IDF rows in CSR layout plus the transposed postings.
+
+    Args:
+        ids: Page ids, one per document
+        documents: ``Counter`` of terms per page, see ``page_terms``
+        max_df: Ignore terms on more than this share of the pages
+        max_terms: Keep only this many of the heaviest terms per page
+    """
+    def __init__(self, ids, documents, max_df=0.05, max_terms=30):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.rows = {pk: row for row, pk in enumerate(ids)}
+        count = len(self.ids)
+
+        document_frequency = Counter()
+        for terms in documents:
+            document_frequency.update(terms.keys())
+        max_pages = max(MIN_MAX_DF_PAGES, max_df * count)
+        self.vocabulary = {}
+        idf = []
+        for term, pages in document_frequency.items():
+            if 2 <= pages <= max_pages:
+                self.vocabulary[term] = len(idf)
+                idf.append(math.log((1 + count) / (1 + pages)) + 1)
+
+        indptr = [0]
+        indices, data = [], []
+        for terms in documents:
+            weights = sorted(
+                (
+                    ((1 + math.log(frequency)) * idf[self.vocabulary[term]], self.vocabulary[term])
+                    for term, frequency in terms.items() if term in self.vocabulary
+                ),
+                reverse=True,
+            )[:max_terms]
+            norm = math.sqrt(sum(weight * weight for weight, _column in weights)) or 1.0
+            for weight, column in weights:
+                indices.append(column)
+                data.append(weight / norm)
+            indptr.append(len(indices))
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.data = np.asarray(data, dtype=np.float32)
+
+        # Transposed layout: the rows containing each term
+        order = np.argsort(self.indices, kind='stable')
+        row_of_entry = np.repeat(np.arange(count, dtype=np.int32), np.diff(self.indptr))
+        self.column_indptr = np.concatenate((
+            [0], np.cumsum(np.bincount(self.indices, minlength=len(idf)))
+        )).astype(np.int64)
+        self.column_rows = row_of_entry[order]
+        self.column_data = self.data[order]
+        self.scores = np.zeros(count, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def memory_usage(self):
+        arrays = (
+            self.ids, self.indptr, self.indices, self.data,
+            self.column_indptr, self.column_rows, self.column_data, self.scores,
+        )
+        return sum(array.nbytes for array in arrays)
+
+    def neighbours(self, pk, k, min_score=0.0):
+        """
+        Find the pages most similar to a page.
+
+        Args:
+            pk: The id of a page in the matrix
+            k: Number of neighbours
+            min_score: Minimum cosine similarity
+
+        Returns:
+            list: ``(page id, score)`` tuples, most similar first
+        """
+        row = self.rows[pk]
+        start, end = self.indptr[row], self.indptr[row + 1]
+        if start == end:
+            return []
+        scores = self.scores
+        for column, weight in zip(self.indices[start:end], self.data[start:end]):
+            first, last = self.column_indptr[column], self.column_indptr[column + 1]
+            # A row occurs once per column, so fancy-index addition is safe
+            scores[self.column_rows[first:last]] += weight * self.column_data[first:last]
+
+        # Scanning the dense accumulator beats deduplicating the touched rows
+        scores[row] = 0
+        candidates = np.flatnonzero(scores >= max(min_score, 1e-6))
+        candidate_scores = scores[candidates]
+        scores.fill(0)
+        if len(candidates) > k:
+            top = np.argpartition(-candidate_scores, k)[:k]
+            candidates, candidate_scores = candidates[top], candidate_scores[top]
+        # Best first, newer pages first on ties
+        order = np.lexsort((-self.ids[candidates], -candidate_scores))
+        return [(int(self.ids[candidates[i]]), float(candidate_scores[i])) for i in order]
+
+
+def build_matrix():
+    """
+    Build the TF-IDF matrix of the whole catalog.
+    """
+    from ..models.coloring_page import ColoringPage
+
+    ids, documents = [], []
+    rows = ColoringPage.objects.values_list('id', 'title_en', 'title_de', 'prompt')
+    for pk, *texts in rows.iterator(chunk_size=2000):
+        ids.append(pk)
+        documents.append(page_terms(*texts))
+    return TfidfMatrix(
+        ids, documents,
+        max_df=getattr(settings, 'RELATED_PAGES_MAX_DF', 0.05),
+        max_terms=getattr(settings, 'RELATED_PAGES_MAX_TERMS', 30),
+    )
+
+
+def neighbour_options():
+    return {
+        'k': getattr(settings, 'RELATED_PAGES_COUNT', 8),
+        'min_score': getattr(settings, 'RELATED_PAGES_MIN_SCORE', 0.05),
+    }
+
+
+def build_related_pages(batch_size=1000):
+    """
+    Recompute the related pages of every page.
+
+    Returns:
+        int: The number of pages processed
+    """
+    from ..models.related import RelatedPage
+
+    matrix = build_matrix()
+    options = neighbour_options()
+    with transaction.atomic():
+        RelatedPage.objects.all().delete()
+        batch = []
+        for pk in matrix.ids.tolist():
+            batch.extend(RelatedPage.for_neighbours(pk, matrix.neighbours(pk, **options)))
+            if len(batch) >= batch_size:
+                RelatedPage.objects.bulk_create(batch)
+                batch = []
+        RelatedPage.objects.bulk_create(batch)
+        transaction.on_commit(invalidate_all)
+    return len(matrix)
+
+
+def update_related_pages(page_ids):
+    """
+    Compute the related pages of new or changed pages and offer each of them
+    to the lists of its neighbours.
+
+    Args:
+        page_ids: Ids of the pages to update
+    """
+    from ..models.related import RelatedPage
+
+    matrix = build_matrix()
+    options = neighbour_options()
+    for pk in page_ids:
+        if pk not in matrix.rows:
+            continue
+        neighbours = matrix.neighbours(pk, **options)
+        with transaction.atomic():
+            changed = [pk]
+            RelatedPage.replace(pk, neighbours)
+            # Similarity is symmetric: merge the page into its neighbours' lists
+            current = RelatedPage.get_neighbours([neighbour for neighbour, _score in neighbours])
+            for neighbour, score in neighbours:
+                merged = [item for item in current.get(neighbour, []) if item[0] != pk]
+                merged.append((pk, score))
+                merged.sort(key=lambda item: (-item[1], -item[0]))
+                merged = merged[:options['k']]
+                if merged != current.get(neighbour, []):
+                    RelatedPage.replace(neighbour, merged)
+                    changed.append(neighbour)
+            transaction.on_commit(lambda changed=changed: invalidate_pages(changed))
+
+
+class RelatedPagesUpdater:
+    """
+    Runs ``update_related_pages`` for newly added pages in a background thread.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.thread = None
+
+    def schedule(self, pk):
+        with self.lock:
+            self.pending.add(pk)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='related-pages', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            with self.lock:
+                batch, self.pending = self.pending, set()
+                if not batch:
+                    return
+            try:
+                update_related_pages(sorted(batch))
+            except Exception:
+                logger.exception('Could not update the related pages of %s', sorted(batch))
+            finally:
+                connections.close_all()
+
+
+updater = RelatedPagesUpdater()
+
+
+def page_created(sender, instance, created, **kwargs):
+    """post_save handler that schedules the related pages of new pages."""
+    if not created or not getattr(settings, 'RELATED_PAGES_UPDATE_ON_SAVE', True):
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: updater.schedule(pk))
@@ -0,0 +1,244 @@
+"""
+Typo-tolerant matching with in-process trigram indexes.
+
+``TrigramIndex`` maps trigrams to the terms containing them, so a misspelled
+word such as "dinosour" only looks at terms that share trigrams with it
+instead of comparing against every row. Similarity is the trigram Jaccard
+score used by PostgreSQL's pg_trgm.
+
+Two indexes are kept per worker and rebuilt lazily:
+
+- ``page_index``: words of page titles and prompts, for the fuzzy fallback
+  on databases without pg_trgm.
+- ``suggestion_index``: queries that returned results, for "did you mean".
+"""
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F, Sum
+
+from .backends import tokenize
+
+# pg_trgm's default similarity threshold
+DEFAULT_THRESHOLD = 0.3
+
+
+def trigrams(term):
+    """
+    Get the set of trigrams of a term, padded like pg_trgm does.
+
+    Args:
+        term: A single lowercase word or phrase
+
+    Returns:
+        set: The trigrams of the term
+    """
+    grams = set()
+    for word in tokenize(term):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to interned terms.
+
+    Each term can carry a set of integer keys (e.g. page ids) and a weight
+    (e.g. how often a query was searched) used to break score ties.
+    """
+    def __init__(self):
+        self.terms = []
+        self.term_ids = {}
+        self.gram_counts = array('H')
+        self.weights = array('I')
+        self.keys = []
+        self.postings = defaultdict(lambda: array('I'))
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term, key=None, weight=1):
+        """
+        Add a term to the index, optionally linking it to a key.
+        """
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            grams = trigrams(term)
+            if not grams:
+                return
+            term_id = len(self.terms)
+            self.term_ids[term] = term_id
+            self.terms.append(term)
+            self.gram_counts.append(min(len(grams), 0xFFFF))
+            self.weights.append(0)
+            self.keys.append(array('q'))
+            for gram in grams:
+                self.postings[gram].append(term_id)
+        self.weights[term_id] += weight
+        if key is not None:
+            self.keys[term_id].append(key)
+
+    def lookup(self, term, limit=10, threshold=DEFAULT_THRESHOLD):
+        """
+        Find indexed terms similar to a term.
+
+        Args:
+            term: The term to look up
+            limit: Maximum number of matches
+            threshold: Minimum trigram similarity
+
+        Returns:
+            list: ``(term, similarity, keys)`` tuples, most similar first
+        """
+        grams = trigrams(term)
+        if not grams:
+            return []
+
+        shared = defaultdict(int)
+        for gram in grams:
+            for term_id in self.postings.get(gram, ()):
+                shared[term_id] += 1
+
+        matches = []
+        for term_id, count in shared.items():
+            similarity = count / (len(grams) + self.gram_counts[term_id] - count)
+            if similarity >= threshold:
+                matches.append((similarity, self.weights[term_id], term_id))
+        matches.sort(reverse=True)
+        return [
+            (self.terms[term_id], similarity, self.keys[term_id])
+            for similarity, _weight, term_id in matches[:limit]
+        ]
+
+
+class LazyIndex:
+    """
+    Holds an index built by ``builder`` and rebuilds it after ``ttl`` seconds
+    or after ``invalidate()`` is called.
+    """
+    def __init__(self, builder, ttl_setting, default_ttl):
+        self.builder = builder
+        self.ttl_setting = ttl_setting
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.index = None
+        self.built_at = 0.0
+
+    @property
+    def ttl(self):
+        return getattr(settings, self.ttl_setting, self.default_ttl)
+
+    def get(self):
+        if self.index is None or time.monotonic() - self.built_at > self.ttl:
+            with self.lock:
+                if self.index is None or time.monotonic() - self.built_at > self.ttl:
+                    self.index = self.builder()
+                    self.built_at = time.monotonic()
+        return self.index
+
+    def invalidate(self, **kwargs):
+        self.index = None
+
+
+def build_page_index():
+    """
+    Index every word of the page titles and prompts.
+    """
+    from ..models.coloring_page import ColoringPage
+
+    index = TrigramIndex()
+    rows = ColoringPage.objects.values_list('id', 'title_en', 'title_de', 'prompt')
+    for pk, *texts in rows.iterator():
+        for word in set(tokenize(' '.join(filter(None, texts)))):
+            index.add(word, key=pk)
+    return index
+
+
+def get_successful_queries():
+    """
+    Get the most searched queries that returned results recently.
+
+    Returns:
+        list: ``(language, query, count)`` tuples, most searched first
+    """
+    from ..models.search import DailySearchRollup
+
+    rows = (
+        DailySearchRollup.in_period(getattr(settings, 'SEARCH_SUGGESTION_DAYS', 90))
+        .values('language', 'query')
+        .annotate(count=Sum(F('search_count') - F('zero_result_count')))
+        .filter(count__gt=0)
+        .order_by('-count')[:getattr(settings, 'SEARCH_SUGGESTION_LIMIT', 5000)]
+    )
+    return [(row['language'], row['query'], row['count']) for row in rows]
+
+
+def build_suggestion_indexes():
+    """
+    Index the queries that returned results, one index per language.
+    """
+    indexes = defaultdict(TrigramIndex)
+    for language, query, count in get_successful_queries():
+        indexes[language].add(query, weight=count)
+    return dict(indexes)
+
+
+page_index = LazyIndex(build_page_index, 'SEARCH_TRIGRAM_INDEX_TTL', 300)
+suggestion_index = LazyIndex(build_suggestion_indexes, 'SEARCH_TRIGRAM_INDEX_TTL', 300)
+
+
+def fuzzy_page_ids(query, max_results=1000):
+    """
+    Find pages whose title or prompt words are similar to the query words.
+
+    Every query word must match some similar word on the page. Pages are
+    ranked by the summed similarity of their best matches.
+
+    Args:
+        query: The raw query string
+        max_results: Maximum number of ids to return
+
+    Returns:
+        list: Matching ``ColoringPage`` ids, best match first
+    """
+    index = page_index.get()
+    scores = None
+    for word in set(tokenize(query)):
+        word_scores = defaultdict(float)
+        for _term, similarity, keys in index.lookup(word, limit=20):
+            for pk in keys:
+                word_scores[pk] = max(word_scores[pk], similarity)
+        if scores is None:
+            scores = word_scores
+        else:
+            scores = {pk: score + word_scores[pk] for pk, score in scores.items() if pk in word_scores}
+    if not scores:
+        return []
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    return [pk for pk, _score in ranked[:max_results]]
+
+
+def suggest_queries(query, language, limit=3):
+    """
+    Suggest popular successful queries that look like a misspelled query.
+
+    Args:
+        query: The query that returned no results
+        language: The language the query was made in
+        limit: Maximum number of suggestions
+
+    Returns:
+        list: Suggested query strings, best first
+    """
+    index = suggestion_index.get().get(language)
+    if not index:
+        return []
+    normalized = query.strip().lower()
+    return [
+        term for term, _similarity, _keys in index.lookup(normalized, limit=limit + 1)
+        if term != normalized
+    ][:limit]
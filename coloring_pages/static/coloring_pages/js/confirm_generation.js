@@ -102,6 +102,12 @@ document.addEventListener('DOMContentLoaded', function() {
                         }
                     }
                     
+                    // Show the near-duplicates of the new image
+                    const duplicateWarning = document.getElementById('duplicate-warning');
+                    if (duplicateWarning && data.duplicates_html !== undefined) {
+                        duplicateWarning.innerHTML = data.duplicates_html;
+                    }
+                    
                     // Update the title and description fields
                     if (data.title_en) {
                         const titleEnField = document.querySelector('.preview-field:nth-child(1) .value');
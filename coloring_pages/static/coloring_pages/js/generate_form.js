@@ -22,6 +22,62 @@ function showError(message) {
     }
 }
 
+function renderSimilarPages(pages, notice) {
+    const container = document.getElementById('similar-pages');
+    if (!container) {
+        return;
+    }
+    container.innerHTML = '';
+    if (!pages.length) {
+        return;
+    }
+    
+    if (notice) {
+        const message = document.createElement('p');
+        message.className = 'similar-pages-notice';
+        message.textContent = notice;
+        container.appendChild(message);
+    }
+    
+    const list = document.createElement('ul');
+    list.className = 'similar-pages-list';
+    pages.forEach(page => {
+        const item = document.createElement('li');
+        const link = document.createElement('a');
+        link.href = page.admin_url;
+        link.target = '_blank';
+        if (page.thumbnail) {
+            const img = document.createElement('img');
+            img.src = page.thumbnail;
+            img.alt = page.title;
+            link.appendChild(img);
+        }
+        const title = document.createElement('span');
+        title.textContent = page.title;
+        link.appendChild(title);
+        item.appendChild(link);
+        const similarity = document.createElement('small');
+        similarity.textContent = 'Similarity ' + page.similarity.toFixed(2);
+        item.appendChild(similarity);
+        list.appendChild(item);
+    });
+    container.appendChild(list);
+}
+
+function lookupSimilarPages(prompt) {
+    const container = document.getElementById('similar-pages');
+    if (!container || !prompt.trim()) {
+        renderSimilarPages([]);
+        return;
+    }
+    fetch(container.dataset.url + '?' + new URLSearchParams({prompt: prompt}), {
+        headers: {'X-Requested-With': 'XMLHttpRequest'},
+    })
+    .then(response => response.ok ? response.json() : {similar: []})
+    .then(data => renderSimilarPages(data.similar, 'Pages with a similar prompt already exist:'))
+    .catch(() => {});
+}
+
 function handleFormSubmit(event) {
     event.preventDefault();
     
@@ -67,7 +123,21 @@ function handleFormSubmit(event) {
         return response.json();
     })
     .then(data => {
-        if (data.redirect) {
+        if (data.similar) {
+            // Let the admin reuse a page; submitting again generates anyway
+            renderSimilarPages(
+                data.similar,
+                'Pages with a similar prompt already exist. Reuse one of them, or submit again to generate a new image anyway.'
+            );
+            document.getElementById('id_generate_anyway').value = '1';
+            const statusMessage = document.getElementById('statusMessage');
+            if (statusMessage) {
+                statusMessage.style.display = 'none';
+            }
+            if (loadingOverlay) {
+                loadingOverlay.style.display = 'none';
+            }
+        } else if (data.redirect) {
             // If we got a redirect URL, navigate to it
             updateProgress(100, 'Image generated successfully! Redirecting...');
             setTimeout(() => {
@@ -98,4 +168,15 @@ document.addEventListener('DOMContentLoaded', function() {
     if (form) {
         form.onsubmit = handleFormSubmit;
     }
+    
+    // Show pages with similar prompts while typing
+    const promptField = document.getElementById('id_prompt');
+    if (promptField) {
+        let timer = null;
+        promptField.addEventListener('input', function() {
+            clearTimeout(timer);
+            document.getElementById('id_generate_anyway').value = '';
+            timer = setTimeout(() => lookupSimilarPages(promptField.value), 300);
+        });
+    }
 });
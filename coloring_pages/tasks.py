@@ -0,0 +1,209 @@
+"""
+A small task queue kept in the database.
+
+Work that should not hold up a request, such as resizing and uploading the
+images of a page, is stored as a ``Task`` row by ``enqueue()`` and run by
+``python manage.py run_worker``. Rows are written in the transaction of the
+change that needs them, so a task is queued exactly when the change commits.
+
+- Idempotency: every task has a unique ``key``; enqueueing an existing key
+  returns the task already queued (or run) instead of adding another.
+- Claiming: a worker takes the oldest due task with
+  ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it
+  (PostgreSQL, MySQL 8), so workers never wait for each other; elsewhere a
+  conditional ``UPDATE`` of the status decides which worker gets it.
+- Retries: a task that raises is tried again after ``TASK_RETRY_DELAY``
+  seconds, doubling each time, up to ``max_attempts``; then it is marked
+  failed with its last traceback. A task whose worker stopped mid-run is
+  taken again once its lock is ``TASK_LOCK_TIMEOUT`` seconds old.
+
+Handlers are registered with ``@task(name)`` and must be safe to run twice.
+"""
+import hashlib
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .derivatives import delete_derivatives
+from .models import ColoringPage, Task
+
+logger = logging.getLogger(__name__)
+
+# Task name -> (handler, called with the payload when the task gives up)
+TASKS = {}
+
+
+def task(name, on_failure=None):
+    """
+    Register a function as the handler of the tasks named ``name``.
+    """
+    def decorator(func):
+        TASKS[name] = (func, on_failure)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, key=None, delay=0, max_attempts=None):
+    """
+    Queue a task unless one with the same key exists.
+
+    Args:
+        name: Name of a registered handler
+        payload: JSON keyword arguments of the handler
+        key: Idempotency key; a hash of the name and payload by default
+        delay: Seconds before the task is due
+        max_attempts: Tries before the task is marked failed
+
+    Returns:
+        Task: The new or existing task
+    """
+    payload = payload or {}
+    if key is None:
+        key = f'{name}:' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+    queued, _created = Task.objects.get_or_create(key=key, defaults={
+        'name': name,
+        'payload': payload,
+        'run_at': timezone.now() + timedelta(seconds=delay),
+        'max_attempts': max_attempts or getattr(settings, 'TASK_MAX_ATTEMPTS', 5),
+    })
+    return queued
+
+
+def retry_delay(attempts):
+    delay = getattr(settings, 'TASK_RETRY_DELAY', 30) * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, getattr(settings, 'TASK_RETRY_MAX_DELAY', 3600)))
+
+
+def due_tasks(now):
+    stale = now - timedelta(seconds=getattr(settings, 'TASK_LOCK_TIMEOUT', 600))
+    return Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now) | Q(status=Task.RUNNING, locked_at__lt=stale)
+    ).order_by('run_at', 'id')
+
+
+def claim_task():
+    """
+    Lock the next due task for this worker.
+
+    Returns:
+        Task: The task, marked running, or None when nothing is due
+    """
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            tasks = due_tasks(now)
+            if connection.features.has_select_for_update_skip_locked:
+                # Rows locked by other workers are passed over instead of waited for
+                tasks = tasks.select_for_update(skip_locked=True)
+            claimed = tasks.first()
+            if claimed is None:
+                return None
+            # Without row locks, only one worker changes the row from the state it read
+            won = Task.objects.filter(
+                pk=claimed.pk, status=claimed.status, attempts=claimed.attempts
+            ).update(status=Task.RUNNING, locked_at=now, attempts=F('attempts') + 1)
+        if won:
+            claimed.status, claimed.locked_at, claimed.attempts = Task.RUNNING, now, claimed.attempts + 1
+            return claimed
+
+
+def run_task(claimed):
+    """
+    Run a claimed task and record the outcome.
+
+    Returns:
+        bool: Whether the task succeeded
+    """
+    handler, on_failure = TASKS.get(claimed.name, (None, None))
+    # Left alone if the lock went stale and another worker took the task
+    row = Task.objects.filter(pk=claimed.pk, locked_at=claimed.locked_at)
+    try:
+        if handler is None:
+            raise LookupError(f'No handler for task {claimed.name!r}')
+        if claimed.attempts > claimed.max_attempts:
+            raise RuntimeError('The worker stopped while running the task on its last attempt')
+        handler(**claimed.payload)
+    except Exception:
+        final = handler is None or claimed.attempts >= claimed.max_attempts
+        logger.exception('Task %s (%s) failed on attempt %s', claimed.pk, claimed.name, claimed.attempts)
+        row.update(
+            status=Task.FAILED if final else Task.PENDING,
+            run_at=timezone.now() + retry_delay(claimed.attempts),
+            locked_at=None,
+            last_error=traceback.format_exc(),
+        )
+        if final and on_failure is not None:
+            try:
+                on_failure(**claimed.payload)
+            except Exception:
+                logger.exception('Failure handler of task %s failed', claimed.pk)
+        return False
+    row.update(status=Task.DONE, locked_at=None, last_error='')
+    return True
+
+
+def run_pending(limit=None):
+    """
+    Run due tasks until none are left or ``limit`` were run.
+
+    Returns:
+        tuple: Numbers of tasks that succeeded and failed
+    """
+    succeeded = failed = 0
+    while limit is None or succeeded + failed < limit:
+        claimed = claim_task()
+        if claimed is None:
+            break
+        if run_task(claimed):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+def enqueue_image_processing(page):
+    """
+    Queue the thumbnail and derivatives of a page's current image.
+    """
+    return enqueue(
+        'process_page_image',
+        {'page_id': page.pk, 'image': page.image.name},
+        key=f'process_page_image:{page.pk}:{page.image.name}',
+    )
+
+
+def mark_image_failed(page_id, image):
+    ColoringPage.objects.filter(pk=page_id, image=image).update(image_status=ColoringPage.IMAGE_FAILED)
+
+
+@task('process_page_image', on_failure=mark_image_failed)
+def process_page_image(page_id, image):
+    """
+    Build the thumbnail, placeholder, hash and derivatives of a page's image.
+    """
+    page = ColoringPage.objects.filter(pk=page_id, image=image).first()
+    if page is None:
+        # Deleted, or given another image with a task of its own
+        return
+    ColoringPage.objects.filter(pk=page_id).update(image_status=ColoringPage.IMAGE_PROCESSING)
+    page.process_image()
+    page.image_status = ColoringPage.IMAGE_READY
+
+    with transaction.atomic():
+        current = ColoringPage.objects.select_for_update().filter(pk=page_id).values_list('image', flat=True).first()
+        if current == image:
+            # Writes only the fields processing changed
+            page.save()
+            return
+    # Replaced while it was processed; the files made for the old image go
+    if page.thumbnail:
+        page.thumbnail.delete(save=False)
+    stored = ColoringPage.objects.filter(pk=page_id).values_list('derivatives', flat=True).first()
+    if page.derivatives and (stored or {}).get('k') != page.derivatives.get('k'):
+        delete_derivatives(page.derivatives, page.image.storage)
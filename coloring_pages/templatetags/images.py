@@ -0,0 +1,59 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+
+from ..derivatives import derivative_height, derivative_name, get_sources
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(page, sizes='100vw', css_class='', alt='', fallback='image', lazy=True, style=''):
+    """
+    Render the image of a page as a ``<picture>`` with a ``srcset`` per format.
+    Pages without derivatives get a plain ``<img>`` of the ``fallback`` field.
+    The stored placeholder, if any, is the inline background until the image loads.
+    Usage: {% responsive_image page sizes="(max-width: 576px) 100vw, 25vw" css_class="img-fluid" alt=page.title %}
+    """
+    loading = 'lazy' if lazy else 'eager'
+    placeholder = (page.metadata or {}).get('placeholder')
+    if placeholder:
+        # Shown until the image has loaded; opaque images then cover it
+        background = f"background: url({placeholder['uri']}) center / contain no-repeat"
+        style = f'{style.rstrip("; ")}; {background}' if style else background
+    manifest = page.derivatives
+    if not manifest or not manifest.get('w'):
+        field = getattr(page, fallback) or page.image
+        if not placeholder:
+            return format_html(
+                '<img src="{}" class="{}" style="{}" alt="{}" loading="{}" decoding="async">',
+                field.url, css_class, style, alt, loading,
+            )
+        return format_html(
+            '<img src="{}" width="{}" height="{}" class="{}" style="{}" alt="{}" loading="{}" decoding="async">',
+            field.url, placeholder['width'], placeholder['height'], css_class, style, alt, loading,
+        )
+
+    storage = page.image.storage
+    sources = get_sources(manifest, storage)
+    # The last format is the one every browser can show
+    *preferred, (fmt, _content_type, srcset) = sources
+    width = manifest['w'][-1]
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" class="{}" style="{}" '
+        'alt="{}" loading="{}" decoding="async"></picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', (
+            (content_type, source_srcset, sizes) for _fmt, content_type, source_srcset in preferred
+        )),
+        storage.url(derivative_name(manifest, width, fmt)), srcset, sizes,
+        width, derivative_height(manifest, width), css_class, style, alt, loading,
+    )
+
+
+@register.simple_tag
+def image_transform_url(field, width, height, fmt='webp'):
+    """
+    URL of an image resized to fit a box on ``TRANSFORM_SIZES``, rendered on first request.
+    Usage: <img src="{% image_transform_url page.image 400 400 'webp' %}">
+    """
+    return reverse('media_transform', kwargs={'width': width, 'height': height, 'fmt': fmt, 'path': field.name})
@@ -0,0 +1,73 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from coloring_pages.models import ColoringPage
+
+
+class DirtyFieldsTests(TestCase):
+    """Test the tracking of changed fields and saving only those."""
+
+    def setUp(self):
+        page = ColoringPage(
+            title_en='Happy Dog', title_de='Fröhlicher Hund', description_en='A dog',
+            description_de='Ein Hund', prompt='dog', metadata={'tags': ['dog']},
+        )
+        page.save()
+        self.page = ColoringPage.objects.get(pk=page.pk)
+
+    def test_changed_fields_without_queries(self):
+        """Test that changes are found by comparing with the loaded values."""
+        with self.assertNumQueries(0):
+            self.assertEqual(self.page.get_changed_fields(), [])
+            self.page.description_en = 'A happy dog'
+            self.page.metadata['tags'].append('happy')
+            self.assertEqual(self.page.get_changed_fields(), ['description_en', 'metadata'])
+        self.assertEqual(ColoringPage(title_en='New').get_changed_fields(), [])
+
+    def test_save_writes_changed_columns(self):
+        """Test that save() updates only what changed, keeping concurrent edits."""
+        ColoringPage.objects.filter(pk=self.page.pk).update(prompt='a dog in a park')
+        self.page.description_en = 'A happy dog'
+        with CaptureQueriesContext(connection) as queries:
+            self.page.save()
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertFalse([sql for sql in statements if sql.startswith('SELECT') and 'coloringpage' in sql])
+        update, = [sql for sql in statements if sql.startswith('UPDATE')]
+        self.assertIn('"description_en"', update)
+        self.assertIn('"updated_at"', update)
+        self.assertNotIn('"prompt"', update)
+
+        page = ColoringPage.objects.get(pk=self.page.pk)
+        self.assertEqual(page.prompt, 'a dog in a park')
+        self.assertEqual(page.description_en, 'A happy dog')
+        self.assertEqual(self.page.get_changed_fields(), [])
+
+    def test_title_change_updates_slug(self):
+        """Test that a new title still gets a new SEO URL."""
+        self.page.title_en = 'Sleepy Dog'
+        self.page.save()
+        self.assertEqual(ColoringPage.objects.get(pk=self.page.pk).seo_url_en, 'sleepy-dog')
+
+    def test_refresh_and_deferred_fields(self):
+        """Test that refreshed and lazily loaded fields count as unchanged."""
+        self.page.description_en = 'Changed'
+        self.page.refresh_from_db(fields=['description_en'])
+        self.assertEqual(self.page.get_changed_fields(), [])
+
+        page = ColoringPage.objects.only('title_en').get(pk=self.page.pk)
+        self.assertEqual(page.prompt, 'dog')
+        self.assertEqual(page.get_changed_fields(), [])
+        page.prompt = 'cat'
+        self.assertEqual(page.get_changed_fields(), ['prompt'])
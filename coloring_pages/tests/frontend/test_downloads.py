@@ -0,0 +1,111 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from coloring_pages.models import ColoringPage
+from coloring_pages.serving import parse_range
+
+IMAGE = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 600
+
+
+class ParseRangeTests(SimpleTestCase):
+    """Test the parsing of Range headers."""
+
+    def test_ranges(self):
+        """Test single ranges, suffix ranges and unsatisfiable ranges."""
+        self.assertIsNone(parse_range('', 100))
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=50-500', 100), (50, 99))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 100))
+        self.assertIs(parse_range('bytes=100-', 100), False)
+        self.assertIs(parse_range('bytes=-0', 100), False)
+
+
+@override_settings(ROOT_URLCONF='ausmalbar.urls', MEDIA_DOWNLOAD_OFFLOAD='')
+class DownloadImageTests(TestCase):
+    """Test streaming, ranges and offloading of image downloads."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.page = ColoringPage(
+            title_en='Happy Dog', title_de='Fröhlicher Hund', description_en='', description_de='', prompt='dog'
+        )
+        # Store the bytes as they are, without the thumbnail processing of save()
+        self.page.image.save('dog.png', SimpleUploadedFile('dog.png', IMAGE), save=False)
+        ColoringPage.objects.bulk_create([self.page])
+        self.page = ColoringPage.objects.get(title_en='Happy Dog')
+        with translation.override('de'):
+            self.url = reverse('coloring_pages:download_image', args=[self.page.pk])
+
+    def test_streams_whole_file(self):
+        """Test that the image is streamed with a localized filename."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), IMAGE)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Content-Length'], str(len(IMAGE)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn("filename*=utf-8''Fr%C3%B6hlicher_Hund.png", response['Content-Disposition'])
+
+    def test_range_and_if_range(self):
+        """Test that ranges are served partially unless the file changed."""
+        etag = self.client.head(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(IMAGE)}')
+        self.assertEqual(b''.join(response.streaming_content), IMAGE[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b''.join(response.streaming_content)), len(IMAGE))
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(IMAGE)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_head_and_not_modified(self):
+        """Test HEAD requests and revalidation with If-None-Match."""
+        response = self.client.head(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], str(len(IMAGE)))
+        self.assertEqual(response.content, b'')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(MEDIA_DOWNLOAD_OFFLOAD='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_x_accel_redirect(self):
+        """Test that nginx is asked to send the file."""
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.page.image.name}')
+        self.assertEqual(response.content, b'')
+        self.assertIn('attachment', response['Content-Disposition'])
+
+    @override_settings(MEDIA_DOWNLOAD_OFFLOAD='redirect')
+    def test_redirect(self):
+        """Test that the download can redirect to the storage URL."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], self.page.image.url)
+
+    def test_post_not_allowed(self):
+        """Test that only GET and HEAD are allowed."""
+        self.assertEqual(self.client.post(self.url).status_code, 405)
@@ -0,0 +1,110 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import io
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image, ImageDraw
+
+from coloring_pages.derivatives import derivative_names
+from coloring_pages.models import ColoringPage
+from coloring_pages.serving import HASHED_NAME_RE
+
+
+def line_art_png(size=1024):
+    image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse([size // 8, size // 8, size * 7 // 8, size * 7 // 8], outline='black', width=size // 64)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@override_settings(DERIVATIVE_WIDTHS=(256, 512, 1024), DERIVATIVE_FORMATS=('webp', 'png'))
+class ImageDerivativeTests(TestCase):
+    """Test the responsive image derivatives and their template tag."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+
+    def create_page(self, size=1024):
+        return ColoringPage.objects.create(
+            title_en='Circle', title_de='Kreis', description_en='', description_de='', prompt='circle',
+            image=SimpleUploadedFile('circle.png', line_art_png(size)),
+        )
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media_root, name))
+
+    def test_derivatives_are_built_on_save(self):
+        """Test that every width and format is written with a hashed name."""
+        page = self.create_page()
+        manifest = page.derivatives
+        self.assertEqual(manifest['w'], [256, 512, 1024])
+        self.assertEqual(manifest['f'], ['webp', 'png'])
+        self.assertEqual(manifest['s'], [1024, 1024])
+        names = derivative_names(manifest)
+        self.assertEqual(len(names), 6)
+        for name in names:
+            self.assertTrue(self.exists(name), name)
+            self.assertRegex(name, HASHED_NAME_RE)
+
+        small = os.path.getsize(os.path.join(self.media_root, names[0]))
+        self.assertLess(small, page.image.size / 4)
+        with Image.open(os.path.join(self.media_root, names[0])) as img:
+            self.assertEqual(img.size, (256, 256))
+
+    def test_small_images_are_not_upscaled(self):
+        """Test that no derivative is wider than the original."""
+        self.assertEqual(self.create_page(400).derivatives['w'], [256, 400])
+
+    def test_tag_renders_picture(self):
+        """Test that the tag emits a source per preferred format and a PNG fallback."""
+        page = self.create_page()
+        html = Template(
+            '{% load images %}{% responsive_image page sizes="200px" css_class="card-img" alt="Circle" %}'
+        ).render(Context({'page': page}))
+        self.assertTrue(html.startswith('<picture><source type="image/webp" srcset="'))
+        self.assertIn(f'{page.derivatives["k"]}.webp 512w', html)
+        self.assertIn('width="1024" height="1024"', html)
+        self.assertIn('sizes="200px"', html)
+        self.assertIn('loading="lazy"', html)
+
+        page.derivatives = {}
+        html = Template('{% load images %}{% responsive_image page fallback="thumbnail" %}').render(Context({'page': page}))
+        self.assertIn(f'src="{page.thumbnail.url}"', html)
+
+    def test_delete_removes_derivatives(self):
+        """Test that deleting a page deletes its derivative files."""
+        page = self.create_page()
+        names = derivative_names(page.derivatives)
+        page.delete()
+        self.assertFalse(any(self.exists(name) for name in names))
+
+    def test_backfill_command(self):
+        """Test that the command builds derivatives for pages without them."""
+        page = self.create_page()
+        expected = page.derivatives
+        ColoringPage.objects.update(derivatives={})
+
+        out = StringIO()
+        call_command('build_image_derivatives', '--workers', '2', stdout=out)
+        page.refresh_from_db()
+        self.assertEqual(page.derivatives, expected)
+        self.assertIn('Built derivatives of 1 images', out.getvalue())
@@ -0,0 +1,114 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import io
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from PIL import Image, ImageDraw
+
+from coloring_pages.transforms import TransformCache, render_transform, transform_image
+
+
+@override_settings(
+    ROOT_URLCONF='ausmalbar.urls', TRANSFORM_SIZES=((256, 256),), TRANSFORM_FORMATS=('webp', 'png'),
+    TRANSFORM_CACHE_MAX_BYTES=10 * 1024 * 1024,
+)
+class TransformEndpointTests(SimpleTestCase):
+    """Test the on-demand transform endpoint."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(
+            MEDIA_ROOT=self.media_root, TRANSFORM_CACHE_ROOT=os.path.join(self.media_root, 'cache'),
+        ))
+        os.makedirs(os.path.join(self.media_root, 'coloring_pages'))
+        image = Image.new('RGBA', (1024, 768), (0, 0, 0, 0))
+        ImageDraw.Draw(image).ellipse([100, 100, 900, 700], outline='black', width=16)
+        image.save(os.path.join(self.media_root, 'coloring_pages/oval.png'))
+        self.url = '/media/t/256x256/webp/coloring_pages/oval.png'
+
+    def test_renders_and_caches(self):
+        """Test that the first request renders and later ones are served from disk."""
+        with mock.patch('coloring_pages.transforms.render_transform', wraps=render_transform) as render:
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'image/webp')
+            with Image.open(io.BytesIO(b''.join(response.streaming_content))) as img:
+                self.assertEqual(img.size, (256, 192))
+            response.close()
+
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            response.close()
+            self.assertEqual(render.call_count, 1)
+
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_allowlist(self):
+        """Test that sizes, formats and paths off the allowlist are refused."""
+        request = RequestFactory().get('/')
+        for args in (
+            (300, 300, 'webp', 'coloring_pages/oval.png'),
+            (256, 256, 'gif', 'coloring_pages/oval.png'),
+            (256, 256, 'webp', '../secret.png'),
+            (256, 256, 'webp', 'coloring_pages/missing.png'),
+        ):
+            with self.assertRaises(Http404, msg=args):
+                transform_image(request, *args)
+
+
+class TransformCacheTests(SimpleTestCase):
+    """Test the LRU eviction and single flight of the transform cache."""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.enterContext(override_settings(TRANSFORM_CACHE_ROOT=root, TRANSFORM_CACHE_MAX_BYTES=250))
+        self.root = root
+        self.cache = TransformCache()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the cache stays under its size by dropping the least recently used file."""
+        for key in ('aa1', 'bb2'):
+            self.cache.get(key, self.path(key), lambda: b'x' * 100)
+        # Using aa1 makes bb2 the oldest
+        self.cache.get('aa1', self.path('aa1'), lambda: b'')
+        self.cache.get('cc3', self.path('cc3'), lambda: b'x' * 100)
+        self.assertTrue(os.path.exists(self.path('aa1')))
+        self.assertFalse(os.path.exists(self.path('bb2')))
+        self.assertTrue(os.path.exists(self.path('cc3')))
+        self.assertEqual(self.cache.total, 200)
+
+    def test_concurrent_requests_render_once(self):
+        """Test that concurrent requests for one transform wait for a single render."""
+        calls = []
+
+        def render():
+            calls.append(1)
+            time.sleep(0.05)
+            return b'x' * 10
+
+        threads = [threading.Thread(target=self.cache.get, args=('dd4', self.path('dd4'), render)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
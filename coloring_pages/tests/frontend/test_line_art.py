@@ -0,0 +1,119 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import io
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image, ImageDraw
+
+from coloring_pages.lineart import optimize_line_art
+from coloring_pages.models import ColoringPage
+
+
+def drawing(size=400, mode='RGBA'):
+    """An anti-aliased black circle, on a transparent background for RGBA, saved as PNG."""
+    img = Image.new('L', (size * 2, size * 2), 255)
+    ImageDraw.Draw(img).ellipse((40, 40, size * 2 - 40, size * 2 - 40), outline=0, width=9)
+    img = img.resize((size, size), Image.Resampling.LANCZOS)
+    if mode == 'RGBA':
+        img = Image.merge('RGBA', [Image.new('L', img.size, 0)] * 3 + [img.point(lambda value: 255 - value)])
+    buffer = io.BytesIO()
+    img.convert(mode).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def colourful(size=200):
+    """A noisy colour image."""
+    buffer = io.BytesIO()
+    Image.merge('RGB', [Image.effect_noise((size, size), 80) for _ in range(3)]).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class OptimizeLineArtTests(SimpleTestCase):
+    """Test the recompression of line art."""
+
+    def test_line_art_becomes_gray_palette(self):
+        """Test that a drawing is flattened onto white and reduced to few grays."""
+        data = drawing()
+        optimized = optimize_line_art(data, levels=16)
+        self.assertLess(len(optimized), len(data))
+        with Image.open(io.BytesIO(optimized)) as img:
+            self.assertEqual(img.mode, 'P')
+            self.assertEqual(img.size, (400, 400))
+            colours = img.convert('RGB').getcolors()
+            self.assertLessEqual(len(colours), 16)
+            # The transparent corners are white paper now
+            self.assertEqual(img.convert('RGB').getpixel((0, 0)), (255, 255, 255))
+            self.assertEqual(img.convert('RGB').getpixel((200, 22)), (0, 0, 0))
+
+    def test_two_levels(self):
+        """Test that two levels give a black-and-white image."""
+        with Image.open(io.BytesIO(optimize_line_art(drawing(mode='RGB'), levels=2))) as img:
+            self.assertEqual({value for _count, value in img.convert('L').getcolors()}, {0, 255})
+
+    def test_colour_image_unchanged(self):
+        """Test that images with real colour are returned as they are."""
+        data = colourful()
+        self.assertIs(optimize_line_art(data), data)
+
+
+class RecompressMediaCommandTests(TestCase):
+    """Test the recompress_media command."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        pages = []
+        for title, data in (('Circle', drawing()), ('Noise', colourful())):
+            page = ColoringPage(title_en=title, title_de=title, description_en='', description_de='', prompt=title)
+            # Store the bytes as they are, without the processing of save()
+            page.image.save(f'{title.lower()}.png', SimpleUploadedFile('image.png', data), save=False)
+            pages.append(page)
+        ColoringPage.objects.bulk_create(pages)
+
+    def test_recompresses_and_resumes(self):
+        """Test that line art is replaced, colour images are kept and a second run skips both."""
+        circle = ColoringPage.objects.get(title_en='Circle')
+        noise = ColoringPage.objects.get(title_en='Noise')
+        old_name, old_size = circle.image.name, circle.image.size
+        storage = circle.image.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('recompress_media', workers=2, stdout=io.StringIO())
+
+        circle.refresh_from_db()
+        self.assertNotEqual(circle.image.name, old_name)
+        self.assertFalse(storage.exists(old_name))
+        self.assertLess(circle.image.size, old_size)
+        self.assertEqual(circle.metadata['line_art']['before'], old_size)
+        self.assertEqual(circle.metadata['line_art']['after'], circle.image.size)
+        noise_name = noise.image.name
+        noise.refresh_from_db()
+        self.assertEqual(noise.image.name, noise_name)
+        self.assertEqual(noise.metadata['line_art']['before'], noise.metadata['line_art']['after'])
+
+        out = io.StringIO()
+        call_command('recompress_media', stdout=out)
+        self.assertIn('Recompressed 0 images', out.getvalue())
+
+    def test_dry_run(self):
+        """Test that a dry run reports the savings without writing."""
+        out = io.StringIO()
+        call_command('recompress_media', dry_run=True, stdout=out)
+        self.assertIn('Recompressed 2 images', out.getvalue())
+        circle = ColoringPage.objects.get(title_en='Circle')
+        self.assertEqual(circle.image.name, 'coloring_pages/circle.png')
+        self.assertFalse(circle.metadata)
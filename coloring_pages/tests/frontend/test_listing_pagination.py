@@ -0,0 +1,95 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from datetime import timedelta
+from urllib.parse import parse_qsl
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from coloring_pages.models import ColoringPage
+from coloring_pages.pagination import KeysetPage, ListingPaginator, decode_cursor, encode_cursor
+
+
+class ListingPaginationTests(TestCase):
+    """Test numbered and keyset pagination of the browse listing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for number in range(23):
+            page = ColoringPage.objects.create(
+                title_en=f'Page {number}', title_de=f'Seite {number}',
+                description_en='', description_de='', prompt=''
+            )
+            # Pairs of pages share a timestamp to exercise the id tie-breaker
+            ColoringPage.objects.filter(pk=page.pk).update(created_at=now - timedelta(minutes=number // 2))
+        cls.expected = list(ColoringPage.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def paginator(self):
+        return ListingPaginator(ColoringPage.objects.order_by('-created_at', '-id'), 5, numbered_pages=2)
+
+    def follow(self, page, direction):
+        query = getattr(page, f'{direction}_query')
+        return self.paginator().get_listing_page(dict(parse_qsl(query)))
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the object's position."""
+        page = ColoringPage.objects.first()
+        self.assertEqual(decode_cursor(encode_cursor(page)), (page.created_at, page.pk))
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        self.assertIsNone(decode_cursor(None))
+
+    def test_walk_forward_and_back(self):
+        """Test that following next links visits every page once, in order."""
+        page = self.paginator().get_listing_page({})
+        pages = [page]
+        while page.has_next():
+            page = self.follow(page, 'next')
+            pages.append(page)
+        self.assertEqual([p.pk for page in pages for p in page], self.expected)
+        # Numbered links are only used for the first pages
+        self.assertEqual([page.number for page in pages], [1, 2, None, None, None])
+        self.assertIsInstance(pages[2], KeysetPage)
+
+        # And back again from the last page
+        page = pages[-1]
+        for expected in reversed(pages[1:-1]):
+            page = self.follow(page, 'previous')
+            self.assertEqual([p.pk for p in page], [p.pk for p in expected])
+        self.assertTrue(page.has_previous())
+
+    def test_last_page(self):
+        """Test that the last page is fetched from the end of the listing."""
+        page = self.paginator().get_listing_page({'before': 'last'})
+        self.assertEqual([p.pk for p in page], self.expected[-5:])
+        self.assertTrue(page.has_previous())
+        self.assertFalse(page.has_next())
+
+    def test_counts_once(self):
+        """Test that the listing is counted once however often it is asked."""
+        paginator = self.paginator()
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 23)
+            self.assertEqual(paginator.num_pages, 5)
+        self.assertEqual(list(paginator.page_range), [1, 2])
+
+    def test_search_view_uses_cursors(self):
+        """Test that the browse view renders keyset pages."""
+        url = reverse('coloring_pages:search')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        first = ColoringPage.objects.get(pk=self.expected[0])
+        response = self.client.get(url, {'after': encode_cursor(first)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p.pk for p in response.context['page_obj']], self.expected[1:9])
+        self.assertContains(response, '?before=')
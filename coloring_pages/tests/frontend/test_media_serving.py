@@ -0,0 +1,106 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import gzip
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from coloring_pages.serving import serve_media
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg">' + b'<path d="M0 0L10 10"/>' * 200 + b'</svg>'
+
+
+@override_settings(ROOT_URLCONF='ausmalbar.urls', MEDIA_DOWNLOAD_OFFLOAD='', MEDIA_MAX_AGE=3600)
+class MediaServingTests(SimpleTestCase):
+    """Test the media view that replaces django.views.static.serve."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        os.makedirs(os.path.join(self.media_root, 'coloring_pages'))
+        self.write('coloring_pages/dog.png', b'\x89PNG' + b'\0' * 1000)
+        self.write('coloring_pages/dog.0123456789abcdef.webp', b'RIFF' + b'\0' * 100)
+        self.write('coloring_pages/dog.svg', SVG)
+
+    def write(self, name, data):
+        with open(os.path.join(self.media_root, name), 'wb') as file:
+            file.write(data)
+
+    def test_serves_file_with_validators(self):
+        """Test that files carry an ETag and Last-Modified that give 304."""
+        response = self.client.get('/media/coloring_pages/dog.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(b''.join(response.streaming_content), b'\x89PNG' + b'\0' * 1000)
+
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get('/media/coloring_pages/dog.png', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get('/media/coloring_pages/dog.png', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changed_file_gets_new_etag(self):
+        """Test that a replaced file is not served with its old headers."""
+        etag = self.client.get('/media/coloring_pages/dog.png')['ETag']
+        self.write('coloring_pages/dog.png', b'\x89PNG' + b'\1' * 2000)
+        response = self.client.get('/media/coloring_pages/dog.png', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], '2004')
+
+    def test_hashed_names_are_immutable(self):
+        """Test that names with a content hash are cached for good."""
+        response = self.client.get('/media/coloring_pages/dog.0123456789abcdef.webp')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_range(self):
+        """Test that a byte range is served partially."""
+        response = self.client.get('/media/coloring_pages/dog.png', HTTP_RANGE='bytes=0-3')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'\x89PNG')
+
+    def test_precompressed_variant(self):
+        """Test that gzip variants are written for SVGs and served to clients that accept them."""
+        out = StringIO()
+        call_command('compress_media', stdout=out)
+        self.assertIn('Wrote 1 variants', out.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'coloring_pages/dog.png.gz')))
+
+        response = self.client.get('/media/coloring_pages/dog.svg', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), SVG)
+
+        response = self.client.get('/media/coloring_pages/dog.svg')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), SVG)
+
+    def test_rejects_traversal_and_hidden_files(self):
+        """Test that paths outside MEDIA_ROOT, hidden files and directories are not found."""
+        self.write('.env', b'SECRET=1')
+        for path in ('../.env', 'coloring_pages/../../.env', '.env', 'coloring_pages/missing.png', 'coloring_pages'):
+            with self.assertRaises(Http404, msg=path):
+                serve_media(RequestFactory().get('/media/'), path)
+
+    @override_settings(MEDIA_DOWNLOAD_OFFLOAD='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_x_accel_redirect(self):
+        """Test that nginx is asked to send the file."""
+        response = self.client.get('/media/coloring_pages/dog.png')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/coloring_pages/dog.png')
+        self.assertTrue(response.has_header('ETag'))
@@ -0,0 +1,103 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from coloring_pages import packs
+from coloring_pages.models import ColoringPage
+
+
+@override_settings(ROOT_URLCONF='ausmalbar.urls', MEDIA_DOWNLOAD_OFFLOAD='', PACK_MAX_PAGES=3)
+class DownloadPackTests(TestCase):
+    """Test the streamed and prebuilt ZIP packs."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.images = {}
+        pages = []
+        for number, (title_en, title_de) in enumerate((('Dog', 'Hund'), ('Cat', 'Katze'), ('Dog', 'Hund'))):
+            data = b'\x89PNG\r\n\x1a\n' + bytes([number]) * (200 * 1024)
+            page = ColoringPage(
+                title_en=title_en, title_de=title_de, description_en='', description_de='', prompt=title_en
+            )
+            # Store the bytes as they are, without the processing of save()
+            page.image.save(f'{title_en.lower()}.png', SimpleUploadedFile('image.png', data), save=False)
+            pages.append(page)
+            self.images[page.image.name] = data
+        ColoringPage.objects.bulk_create(pages)
+        self.pages = list(ColoringPage.objects.order_by('id'))
+        with translation.override('de'):
+            self.url = reverse('coloring_pages:download_pack')
+
+    def ids(self, pages):
+        return ','.join(str(page.pk) for page in pages)
+
+    def test_streamed_pack(self):
+        """Test that chosen pages are streamed as a ZIP of stored entries."""
+        response = self.client.get(self.url, {'ids': self.ids(self.pages)})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('coloring-pages.zip', response['Content-Disposition'])
+        chunks = list(response.streaming_content)
+        # Written as the images are read, not at once
+        self.assertGreater(len(chunks), 3)
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), ['hund.png', 'katze.png', 'hund-2.png'])
+            for info, page in zip(archive.infolist(), self.pages):
+                self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+                self.assertEqual(archive.read(info), self.images[page.image.name])
+
+    def test_not_modified(self):
+        """Test revalidation of a pack, and a new ETag once a page changes."""
+        etag = self.client.head(self.url, {'ids': self.ids(self.pages[:2])})['ETag']
+        response = self.client.get(self.url, {'ids': self.ids(self.pages[:2])}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.pages[0].title_de = 'Hündchen'
+        self.pages[0].save()
+        response = self.client.get(self.url, {'ids': self.ids(self.pages[:2])}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_bounded(self):
+        """Test that packs are limited to PACK_MAX_PAGES pages."""
+        self.assertEqual(self.client.get(self.url, {'ids': '1,2,3,4'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'ids': 'a,b'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_search_pack_built_once(self):
+        """Test that the pack of a search is built once and then served from storage."""
+        results = {'ids': [self.pages[0].pk, self.pages[2].pk]}
+        with mock.patch('coloring_pages.views.packs.search_page', return_value=results):
+            response = self.client.get(self.url, {'q': 'Dog'})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('dog.zip', response['Content-Disposition'])
+            data = b''.join(response.streaming_content)
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                self.assertEqual(archive.namelist(), ['hund.png', 'hund-2.png'])
+
+            with mock.patch.object(packs, 'iter_zip') as build:
+                response = self.client.get(self.url, {'q': 'dog'}, HTTP_RANGE='bytes=0-9')
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(b''.join(response.streaming_content), data[:10])
+            build.assert_not_called()
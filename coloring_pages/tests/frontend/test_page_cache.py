@@ -0,0 +1,125 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage import default_storage
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+
+from coloring_pages.models import ColoringPage, RelatedPage
+from coloring_pages.pagecache import is_cacheable
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ROOT_URLCONF='ausmalbar.urls', PAGE_CACHE_TIMEOUT=600)
+class PageCacheTests(TestCase):
+    """Test the anonymous page cache and conditional GETs."""
+
+    def setUp(self):
+        cache.clear()
+        self.cat = self.create_page('Sleeping Cat')
+        self.dog = self.create_page('Happy Dog')
+        with translation.override('en'):
+            self.url = self.cat.get_absolute_url()
+
+    def create_page(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ColoringPage.objects.create(
+                title_en=title, title_de=title, description_en='', description_de='', prompt=title
+            )
+
+    def save(self, page, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            for name, value in fields.items():
+                setattr(page, name, value)
+            page.save()
+
+    def test_detail_is_served_from_cache(self):
+        """Test that a repeated anonymous GET runs no query."""
+        first = self.client.get(self.url)
+        self.assertContains(first, 'Sleeping Cat')
+        self.assertTrue(first.has_header('ETag'))
+        self.assertTrue(first.has_header('Last-Modified'))
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_conditional_get(self):
+        """Test that a matching ETag or Last-Modified gives 304."""
+        response = self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_save_invalidates_only_affected_pages(self):
+        """Test that saving a page invalidates its detail page and the home page only."""
+        detail = self.client.get(self.url)
+        home = self.client.get('/en/')
+        with translation.override('en'):
+            dog_url = self.dog.get_absolute_url()
+        self.client.get(dog_url)
+
+        # A new title would move the page to a new URL
+        self.save(self.cat, description_en='A cat asleep on a cushion')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'A cat asleep on a cushion')
+        self.assertNotEqual(response['ETag'], detail['ETag'])
+        self.assertNotEqual(self.client.get('/en/')['ETag'], home['ETag'])
+        with self.assertNumQueries(0):
+            self.client.get(dog_url)
+
+    def test_related_pages_invalidate_detail(self):
+        """Test that a retitled related page is not shown with its old title."""
+        RelatedPage.replace(self.cat.pk, [(self.dog.pk, 0.5)])
+        self.assertContains(self.client.get(self.url), 'Happy Dog')
+        self.save(self.dog, title_en='Grumpy Dog')
+        self.assertContains(self.client.get(self.url), 'Grumpy Dog')
+
+    def test_delete_changes_home_etag(self):
+        """Test that deleting a page changes the validators of the listing."""
+        home = self.client.get('/en/')
+        with self.captureOnCommitCallbacks(execute=True):
+            ColoringPage.objects.filter(pk=self.dog.pk).delete()
+        self.assertNotEqual(self.client.get('/en/', HTTP_IF_NONE_MATCH=home['ETag']).status_code, 304)
+
+    def test_languages_are_cached_separately(self):
+        """Test that the language is part of the cache key."""
+        self.assertContains(self.client.get('/en/imprint/'), 'lang="en"')
+        self.assertContains(self.client.get('/de/impressum/'), 'lang="de"')
+
+    def test_staff_bypasses_cache(self):
+        """Test that logged-in admins always get a fresh page and nothing is stored."""
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        self.client.get(self.url)
+        self.client.logout()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertGreater(len(queries), 0)
+
+    def test_pending_messages_bypass_cache(self):
+        """Test that a page showing messages is neither served from nor stored in the cache."""
+        request = RequestFactory().get(self.url)
+        request.user = AnonymousUser()
+        request.session = {}
+        request._messages = default_storage(request)
+        self.assertTrue(is_cacheable(request))
+        messages.info(request, 'Saved')
+        self.assertFalse(is_cacheable(request))
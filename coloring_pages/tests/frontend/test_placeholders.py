@@ -0,0 +1,107 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import base64
+import io
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image, ImageDraw
+
+from coloring_pages.derivatives import build_placeholder
+from coloring_pages.models import ColoringPage
+
+
+def drawing(width=400, height=300):
+    """A black circle on a transparent background, saved as PNG."""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    ImageDraw.Draw(img).ellipse((20, 20, width - 20, height - 20), outline=(0, 0, 0, 255), width=8)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class BuildPlaceholderTests(SimpleTestCase):
+    """Test the tiny previews."""
+
+    def test_placeholder(self):
+        """Test that the size is kept and the preview is a tiny data URI."""
+        with Image.open(io.BytesIO(drawing())) as img:
+            placeholder = build_placeholder(img)
+        self.assertEqual((placeholder['width'], placeholder['height']), (400, 300))
+        header, encoded = placeholder['uri'].split(',', 1)
+        self.assertEqual(header, 'data:image/webp;base64')
+        self.assertLess(len(placeholder['uri']), 400)
+        with Image.open(io.BytesIO(base64.b64decode(encoded))) as preview:
+            self.assertEqual(preview.size, (16, 12))
+            # Transparency is white paper
+            self.assertGreater(preview.convert('L').getpixel((0, 0)), 200)
+
+
+class PlaceholderPageTests(TestCase):
+    """Test storing, rendering and backfilling the placeholders."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, DERIVATIVE_WIDTHS=[128]))
+
+    def create_page(self, title, save=True):
+        page = ColoringPage(title_en=title, title_de=title, description_en='', description_de='', prompt=title)
+        page.image = SimpleUploadedFile(f'{title.lower()}.png', drawing())
+        if save:
+            page.save()
+        else:
+            # Store the image as it is, without the processing of save()
+            page.image.save(page.image.name, page.image, save=False)
+            ColoringPage.objects.bulk_create([page])
+        return ColoringPage.objects.get(title_en=title)
+
+    def render(self, page, **options):
+        template = Template(
+            '{% load images %}{% responsive_image page sizes="200px" css_class="img-fluid" '
+            'style="object-fit: contain;" fallback=fallback %}'
+        )
+        return template.render(Context({'page': page, 'fallback': 'image', **options}))
+
+    def test_saved_and_rendered(self):
+        """Test that save() stores the placeholder and the tag sets it as the background."""
+        page = self.create_page('Circle')
+        placeholder = page.metadata['placeholder']
+        self.assertEqual((placeholder['width'], placeholder['height']), (400, 300))
+        html = self.render(page)
+        self.assertIn(f'style="object-fit: contain; background: url({placeholder["uri"]}) center', html)
+
+        page.derivatives = {}
+        html = self.render(page)
+        self.assertIn('width="400" height="300"', html)
+        self.assertIn('background: url(data:image/webp;base64,', html)
+
+    def test_backfill(self):
+        """Test that the command fills in missing placeholders and keeps other metadata."""
+        page = self.create_page('Old', save=False)
+        ColoringPage.objects.filter(pk=page.pk).update(metadata={'system_prompt_id': 3})
+        self.assertNotIn('background', self.render(page))
+
+        out = io.StringIO()
+        call_command('build_placeholders', workers=2, stdout=out)
+        self.assertIn('Built placeholders of 1 images, 0 failed', out.getvalue())
+        page.refresh_from_db()
+        self.assertEqual(page.metadata['system_prompt_id'], 3)
+        self.assertEqual(page.metadata['placeholder']['width'], 400)
+
+        out = io.StringIO()
+        call_command('build_placeholders', stdout=out)
+        self.assertIn('Built placeholders of 0 images', out.getvalue())
@@ -0,0 +1,120 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import io
+import re
+import shutil
+import tempfile
+import zlib
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image, ImageDraw
+
+from coloring_pages import printing
+from coloring_pages.models import ColoringPage
+from coloring_pages.printing import render_print_pdf
+from coloring_pages.views.detail import print_pdf
+
+
+def drawing(width=300, height=200):
+    """A black frame on white, saved as PNG."""
+    img = Image.new('L', (width, height), 255)
+    ImageDraw.Draw(img).rectangle((10, 10, width - 11, height - 11), outline=0, width=6)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class RenderPrintPdfTests(SimpleTestCase):
+    """Test the PDF writer."""
+
+    def test_structure(self):
+        """Test that the cross-reference table points at the objects."""
+        pdf = render_print_pdf(drawing(), 'letter')
+        self.assertTrue(pdf.startswith(b'%PDF-1.4'))
+        self.assertIn(b'/MediaBox [0 0 612.0 792.0]', pdf)
+        self.assertIn(b'/PrintScaling /None', pdf)
+        xref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+        self.assertTrue(pdf[xref:].startswith(b'xref\n0 5\n'))
+        offsets = re.findall(rb'(\d{10}) 00000 n', pdf[xref:])
+        for number, offset in enumerate(offsets, 1):
+            self.assertTrue(pdf[int(offset):].startswith(f'{number} 0 obj'.encode('ascii')))
+
+    def test_fitted_and_centered(self):
+        """Test that the drawing fills the width inside the margins, centered vertically."""
+        pdf = render_print_pdf(drawing(), 'a4')
+        stream = re.search(rb'stream\n(.*)\nendstream', pdf, re.S).group(1)
+        content = zlib.decompress(stream).decode('ascii')
+        scale, _b, _c, flipped, left, top = map(float, content.split('\n')[1].split()[:6])
+        self.assertAlmostEqual(left, printing.MARGIN, places=2)
+        # 300 x 200 pixels in quarter pixels, scaled to the 510 pt wide printable area
+        self.assertAlmostEqual(scale * 4 * 300, 595.276 - 2 * printing.MARGIN, places=2)
+        self.assertAlmostEqual(flipped, -scale)
+        self.assertAlmostEqual(top, (841.89 + 200 * scale * 4) / 2, places=2)
+        self.assertEqual(content.count(' m\n'), 2)
+        self.assertTrue(content.endswith('f*\nQ'))
+
+
+@override_settings(ROOT_URLCONF='ausmalbar.urls', MEDIA_DOWNLOAD_OFFLOAD='')
+class PrintPdfViewTests(TestCase):
+    """Test the cached print PDF endpoint."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        page = ColoringPage(title_en='Frame', title_de='Rahmen', description_en='', description_de='', prompt='frame')
+        # Store the image as it is, without the processing of save()
+        page.image.save('frame.png', SimpleUploadedFile('frame.png', drawing()), save=False)
+        ColoringPage.objects.bulk_create([page])
+        self.page = ColoringPage.objects.get(title_en='Frame')
+        self.url = reverse('coloring_pages:print_pdf', args=[self.page.pk])
+
+    def test_rendered_once(self):
+        """Test that the PDF is rendered on the first request and revalidated later."""
+        response = self.client.get(self.url, {'size': 'letter'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertFalse(response.has_header('Content-Disposition'))
+        pdf = b''.join(response.streaming_content)
+        self.assertIn(b'612.0 792.0', pdf)
+
+        with mock.patch.object(printing, 'render_print_pdf') as render:
+            again = self.client.get(self.url, {'size': 'letter'})
+            self.assertEqual(b''.join(again.streaming_content), pdf)
+            response = self.client.get(self.url, {'size': 'letter'}, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+        render.assert_not_called()
+
+    def test_changed_page_rendered_again(self):
+        """Test that a newer updated_at gives a new file and removes the old one."""
+        storage = self.page.image.storage
+        old_name = printing.get_print_pdf(self.page, 'a4')
+        ColoringPage.objects.filter(pk=self.page.pk).update(updated_at=self.page.updated_at + timedelta(seconds=1))
+        self.page.refresh_from_db()
+        new_name = printing.get_print_pdf(self.page, 'a4')
+        self.assertNotEqual(new_name, old_name)
+        self.assertTrue(storage.exists(new_name))
+        self.assertFalse(storage.exists(old_name))
+
+        self.page.delete()
+        self.assertFalse(storage.exists(new_name))
+
+    def test_unknown_size(self):
+        """Test that only the known paper sizes are served."""
+        request = RequestFactory().get(self.url, {'size': 'a3'})
+        with self.assertRaises(Http404):
+            print_pdf(request, self.page.pk)
@@ -99,3 +99,12 @@ CACHES = {
 
 # Disable email sending for testing
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Write search queries immediately instead of from a background thread
+SEARCH_LOG_FLUSH_INTERVAL = 0
+
+# Tests compute related pages explicitly instead of from a background thread
+RELATED_PAGES_UPDATE_ON_SAVE = False
+
+# Tests process images in save() instead of through the task queue
+IMAGE_PROCESSING_ASYNC = False
@@ -0,0 +1,85 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+
+from coloring_pages.models import ColoringPage
+from coloring_pages.models import coloring_page
+from coloring_pages.models.base import create_unique_slug
+
+
+class SlugAllocationTests(TestCase):
+    """Test allocating unique SEO URLs in one query."""
+
+    def create_pages(self, *slugs):
+        ColoringPage.objects.bulk_create([
+            ColoringPage(title_en=slug, title_de=slug, description_en='', description_de='', prompt='',
+                         seo_url_en=slug, seo_url_de=f'de-{slug}')
+            for slug in slugs
+        ])
+
+    def allocate(self, title, **kwargs):
+        return create_unique_slug(ColoringPage, title, 'title_en', 'seo_url_en', **kwargs)
+
+    def test_one_query(self):
+        """Test that the next suffix is found with a single query."""
+        self.create_pages('cute-cat', *[f'cute-cat-{num}' for num in range(1, 50)])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.allocate('Cute Cat'), 'cute-cat-50')
+        self.assertEqual(self.allocate('Cute Dog'), 'cute-dog')
+
+    def test_first_free_suffix(self):
+        """Test that gaps are filled and similar slugs do not count."""
+        self.create_pages('cute-cat', 'cute-cat-1', 'cute-cat-3', 'cute-cat-and-dog', 'cute-cat-2b', 'cute-cats')
+        self.assertEqual(self.allocate('Cute Cat'), 'cute-cat-2')
+        self.create_pages('cute-cat-2')
+        self.assertEqual(self.allocate('Cute Cat'), 'cute-cat-4')
+
+    def test_own_slug_is_free(self):
+        """Test that a page keeps its slug when its title changes to the same slug."""
+        self.create_pages('cute-cat')
+        page = ColoringPage.objects.get()
+        self.assertEqual(self.allocate('Cute Cat', exclude_pk=page.pk), 'cute-cat')
+        page.title_en = 'Cute cat!'
+        page.save()
+        self.assertEqual(ColoringPage.objects.get().seo_url_en, 'cute-cat')
+
+    def test_retry_after_integrity_error(self):
+        """Test that save() allocates again when another page took the slug meanwhile."""
+        self.create_pages('cute-cat')
+        real = coloring_page.create_unique_slug
+        calls = []
+
+        def stale(model, value, field_name, slug_field_name, **kwargs):
+            calls.append(slug_field_name)
+            if calls == ['seo_url_en']:
+                # As if 'cute-cat' was saved by another request after the lookup
+                return 'cute-cat'
+            return real(model, value, field_name, slug_field_name, **kwargs)
+
+        page = ColoringPage(title_en='Cute Cat', title_de='Süße Katze', description_en='', description_de='',
+                            prompt='')
+        with mock.patch.object(coloring_page, 'create_unique_slug', side_effect=stale):
+            page.save()
+        self.assertEqual(page.seo_url_en, 'cute-cat-1')
+        self.assertEqual(ColoringPage.objects.get(pk=page.pk).seo_url_de, 'sue-katze')
+        self.assertEqual(calls, ['seo_url_en', 'seo_url_de', 'seo_url_en', 'seo_url_de'])
+
+    def test_retries_are_bounded(self):
+        """Test that save() gives up when the slug stays taken."""
+        self.create_pages('cute-cat')
+        page = ColoringPage(title_en='Cute Cat', title_de='Katze', description_en='', description_de='', prompt='')
+        with mock.patch.object(coloring_page, 'create_unique_slug', return_value='cute-cat'):
+            with self.assertRaises(IntegrityError):
+                page.save()
@@ -0,0 +1,185 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from coloring_pages import tasks
+from coloring_pages.models import ColoringPage, Task
+
+
+def drawing(width=400, height=300):
+    """A black circle on white paper, saved as PNG."""
+    img = Image.new('RGB', (width, height), (255, 255, 255))
+    ImageDraw.Draw(img).ellipse((20, 20, width - 20, height - 20), outline=(0, 0, 0), width=8)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class TaskQueueTests(TestCase):
+    """Test queueing, claiming and retrying tasks."""
+
+    def setUp(self):
+        self.calls = []
+        self.enterContext(mock.patch.dict(tasks.TASKS))
+        tasks.task('test.record')(lambda **payload: self.calls.append(payload))
+
+        def flaky(**payload):
+            raise ValueError('storage unavailable')
+        tasks.task('test.flaky', on_failure=lambda **payload: self.calls.append(('gave up', payload)))(flaky)
+
+    def test_idempotency_key(self):
+        """Test that a key is queued and run only once."""
+        first = tasks.enqueue('test.record', {'n': 1}, key='record:1')
+        second = tasks.enqueue('test.record', {'n': 2}, key='record:1')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(tasks.run_pending(), (1, 0))
+        self.assertEqual(self.calls, [{'n': 1}])
+        tasks.enqueue('test.record', {'n': 1}, key='record:1')
+        self.assertEqual(tasks.run_pending(), (0, 0))
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_default_key(self):
+        """Test that the same name and payload make the same task."""
+        self.assertEqual(tasks.enqueue('test.record', {'a': 1, 'b': 2}).pk,
+                         tasks.enqueue('test.record', {'b': 2, 'a': 1}).pk)
+        self.assertNotEqual(tasks.enqueue('test.record', {'a': 1}).pk,
+                            tasks.enqueue('test.record', {'a': 2}).pk)
+
+    def test_claim_order_and_delay(self):
+        """Test that due tasks are claimed oldest first and delayed ones wait."""
+        tasks.enqueue('test.record', {'n': 'later'}, delay=60)
+        older = tasks.enqueue('test.record', {'n': 1})
+        newer = tasks.enqueue('test.record', {'n': 2})
+        Task.objects.filter(pk=older.pk).update(run_at=timezone.now() - timedelta(seconds=5))
+
+        claimed = tasks.claim_task()
+        self.assertEqual(claimed.pk, older.pk)
+        self.assertEqual((claimed.status, claimed.attempts), (Task.RUNNING, 1))
+        self.assertEqual(tasks.claim_task().pk, newer.pk)
+        # The running ones and the delayed one are not due
+        self.assertIsNone(tasks.claim_task())
+
+    def test_retry_with_backoff(self):
+        """Test that failures are retried later and finally marked failed."""
+        queued = tasks.enqueue('test.flaky', {'n': 1}, max_attempts=2)
+        with self.settings(TASK_RETRY_DELAY=30):
+            self.assertEqual(tasks.run_pending(), (0, 1))
+            queued.refresh_from_db()
+            self.assertEqual((queued.status, queued.attempts), (Task.PENDING, 1))
+            self.assertIn('storage unavailable', queued.last_error)
+            self.assertGreater(queued.run_at, timezone.now() + timedelta(seconds=25))
+            self.assertEqual(self.calls, [])
+
+            Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+            self.assertEqual(tasks.run_pending(), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.FAILED, 2))
+        self.assertEqual(self.calls, [('gave up', {'n': 1})])
+        self.assertEqual(tasks.run_pending(), (0, 0))
+
+    def test_abandoned_task_taken_again(self):
+        """Test that a task whose worker stopped is run again after the lock timeout."""
+        queued = tasks.enqueue('test.record', {'n': 1})
+        tasks.claim_task()
+        self.assertIsNone(tasks.claim_task())
+        Task.objects.filter(pk=queued.pk).update(locked_at=timezone.now() - timedelta(seconds=700))
+        with self.settings(TASK_LOCK_TIMEOUT=600):
+            claimed = tasks.claim_task()
+        self.assertEqual((claimed.pk, claimed.attempts), (queued.pk, 2))
+
+    def test_unknown_task_fails(self):
+        """Test that a task without a handler fails at once."""
+        queued = tasks.enqueue('test.missing', {})
+        self.assertEqual(tasks.run_pending(), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+
+
+@override_settings(IMAGE_PROCESSING_ASYNC=True)
+class ImageProcessingTaskTests(TestCase):
+    """Test building the images of pages in the worker."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, DERIVATIVE_WIDTHS=[128]))
+
+    def create_page(self, title):
+        page = ColoringPage(title_en=title, title_de=title, description_en='', description_de='', prompt=title)
+        page.image = SimpleUploadedFile(f'{title.lower()}.png', drawing())
+        page.save()
+        return page
+
+    def test_save_queues_processing(self):
+        """Test that saving a new image queues its processing instead of doing it."""
+        page = self.create_page('Cat')
+        page.refresh_from_db()
+        self.assertEqual(page.image_status, ColoringPage.IMAGE_PENDING)
+        self.assertFalse(page.thumbnail)
+        self.assertEqual(page.derivatives, {})
+        queued = Task.objects.get()
+        self.assertEqual(queued.name, 'process_page_image')
+        self.assertEqual(queued.payload, {'page_id': page.pk, 'image': page.image.name})
+
+        # Saving other changes queues nothing more
+        page.title_en = 'Black cat'
+        page.save()
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_worker_builds_images(self):
+        """Test that run_worker builds the thumbnail, derivatives and placeholder."""
+        page = self.create_page('Dog')
+        out = io.StringIO()
+        call_command('run_worker', '--once', stdout=out)
+        self.assertIn('Ran 1 tasks, 0 failed', out.getvalue())
+
+        page.refresh_from_db()
+        self.assertEqual(page.image_status, ColoringPage.IMAGE_READY)
+        self.assertTrue(page.thumbnail.name.endswith('_thumb.webp'))
+        self.assertEqual(page.derivatives['w'], [128])
+        self.assertEqual(page.metadata['placeholder']['width'], 400)
+        self.assertIsNotNone(page.image_hash)
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_replaced_image_skipped(self):
+        """Test that the task of an image replaced before it ran does nothing."""
+        page = self.create_page('Bird')
+        page.image = SimpleUploadedFile('bird-2.png', drawing(300, 300))
+        page.save()
+        self.assertEqual(Task.objects.count(), 2)
+
+        self.assertEqual(tasks.run_pending(), (2, 0))
+        page.refresh_from_db()
+        self.assertEqual(page.image_status, ColoringPage.IMAGE_READY)
+        self.assertEqual(page.metadata['placeholder']['width'], 300)
+        self.assertEqual(len(os.listdir(os.path.dirname(page.thumbnail.path))), 1)
+
+    def test_unreadable_image_marked_failed(self):
+        """Test that a page whose image cannot be processed ends up failed."""
+        page = ColoringPage(title_en='Fox', title_de='Fuchs', description_en='', description_de='', prompt='fox')
+        page.image = SimpleUploadedFile('fox.png', b'not an image')
+        page.save()
+        Task.objects.update(max_attempts=1)
+
+        self.assertEqual(tasks.run_pending(), (0, 1))
+        page.refresh_from_db()
+        self.assertEqual(page.image_status, ColoringPage.IMAGE_FAILED)
@@ -0,0 +1,137 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import io
+import shutil
+import tempfile
+from unittest import mock
+from xml.etree import ElementTree
+
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image, ImageDraw
+
+from coloring_pages import vectorize
+from coloring_pages.models import ColoringPage
+from coloring_pages.vectorize import polygon_area, trace_paths, trace_svg
+
+
+def drawing(size=256):
+    """An anti-aliased black ring and stroke on white, saved as PNG."""
+    img = Image.new('L', (size * 2, size * 2), 255)
+    draw = ImageDraw.Draw(img)
+    draw.ellipse((40, 40, size * 2 - 40, size * 2 - 40), outline=0, width=12)
+    draw.line((60, size, size * 2 - 60, size), fill=0, width=8)
+    buffer = io.BytesIO()
+    img.resize((size, size), Image.Resampling.LANCZOS).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class TracePathsTests(SimpleTestCase):
+    """Test the following of ink boundaries."""
+
+    def test_square_and_hole(self):
+        """Test that a ring gives an outer and an inner path of opposite orientation."""
+        ink = np.zeros((10, 10), dtype=bool)
+        ink[2:8, 2:8] = True
+        ink[4:6, 4:6] = False
+        paths = trace_paths(ink)
+        self.assertEqual(sorted(len(points) for points in paths), [4, 4])
+        areas = sorted(polygon_area(points) for points in paths)
+        self.assertEqual([abs(area) for area in areas], [36, 4])
+        self.assertLess(areas[0] * areas[1], 0)
+
+    def test_diagonal_pixels_connected(self):
+        """Test that pixels touching at a corner are one path."""
+        ink = np.zeros((6, 6), dtype=bool)
+        ink[2, 2] = ink[3, 3] = True
+        paths = trace_paths(ink, min_area=1)
+        self.assertEqual(len(paths), 1)
+        self.assertEqual(abs(polygon_area(paths[0])), 2)
+
+    def test_specks_dropped(self):
+        """Test that paths smaller than min_area are dropped."""
+        ink = np.zeros((6, 6), dtype=bool)
+        ink[1, 1] = True
+        self.assertEqual(trace_paths(ink, min_area=2), [])
+
+
+class TraceSvgTests(SimpleTestCase):
+    """Test the SVG output of the tracer."""
+
+    def test_svg(self):
+        """Test that a drawing traces to a compact SVG of curves."""
+        data = drawing()
+        svg = trace_svg(data)
+        root = ElementTree.fromstring(svg)
+        self.assertEqual(root.get('viewBox'), '0 0 1024 1024')
+        self.assertEqual(root.get('width'), '256')
+        path = root.find('{http://www.w3.org/2000/svg}path')
+        # The outline, and the hole of the ring split in two by the stroke
+        self.assertEqual(path.get('d').count('M'), 3)
+        self.assertIn('c', path.get('d'))
+        self.assertLess(len(svg), len(data))
+
+
+@override_settings(ROOT_URLCONF='ausmalbar.urls', MEDIA_DOWNLOAD_OFFLOAD='')
+class VectorDownloadTests(TestCase):
+    """Test the SVG download and the trace_vectors command."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        page = ColoringPage(title_en='Ring', title_de='Ring', description_en='', description_de='', prompt='ring')
+        # Store the image as it is, without the processing of save()
+        page.image.save('ring.png', SimpleUploadedFile('ring.png', drawing()), save=False)
+        ColoringPage.objects.bulk_create([page])
+        self.page = ColoringPage.objects.get(title_en='Ring')
+        self.url = reverse('coloring_pages:download_vector', args=[self.page.pk])
+
+    def test_traced_once_and_kept(self):
+        """Test that the first download traces the image and later ones reuse it."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn('Ring.svg', response['Content-Disposition'])
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'<svg'))
+        self.page.refresh_from_db()
+        self.assertEqual(self.page.vector.name, 'coloring_pages/vectors/ring.svg')
+
+        with mock.patch.object(vectorize, 'trace_svg') as trace:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        trace.assert_not_called()
+
+    def test_new_image_drops_tracing(self):
+        """Test that saving a new image deletes the old tracing."""
+        self.client.get(self.url)
+        self.page.refresh_from_db()
+        storage, name = self.page.vector.storage, self.page.vector.name
+        self.page.image = SimpleUploadedFile('other.png', drawing(128))
+        self.page.save()
+        self.assertFalse(self.page.vector)
+        self.assertFalse(storage.exists(name))
+
+    def test_trace_vectors_command(self):
+        """Test that the command traces the pages without a tracing."""
+        out = io.StringIO()
+        call_command('trace_vectors', workers=2, stdout=out)
+        self.assertIn('Traced 1 images, 0 failed', out.getvalue())
+        self.page.refresh_from_db()
+        self.assertTrue(self.page.vector.storage.exists(self.page.vector.name))
+
+        out = io.StringIO()
+        call_command('trace_vectors', stdout=out)
+        self.assertIn('Traced 0 images', out.getvalue())
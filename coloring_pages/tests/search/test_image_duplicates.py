@@ -0,0 +1,156 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+import io
+import random
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image, ImageDraw
+
+from coloring_pages.models import ColoringPage
+from coloring_pages.search.duplicates import MultiIndexHash, duplicate_index, image_hash, to_signed
+
+
+def draw_cat(size=512, offset=0):
+    image = Image.new('RGB', (size, size), 'white')
+    draw = ImageDraw.Draw(image)
+    scale = size / 512
+    box = lambda *xy: [(value + offset) * scale for value in xy]
+    draw.ellipse(box(96, 160, 416, 448), outline='black', width=int(8 * scale))
+    draw.polygon(box(128, 200, 160, 64, 224, 176), outline='black', width=int(8 * scale))
+    draw.polygon(box(288, 176, 352, 64, 384, 200), outline='black', width=int(8 * scale))
+    draw.ellipse(box(176, 256, 224, 304), fill='black')
+    draw.ellipse(box(288, 256, 336, 304), fill='black')
+    return image
+
+
+def draw_car():
+    image = Image.new('RGB', (512, 512), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([48, 224, 464, 352], outline='black', width=8)
+    draw.rectangle([144, 128, 368, 224], outline='black', width=8)
+    draw.ellipse([96, 320, 192, 416], outline='black', width=8)
+    draw.ellipse([320, 320, 416, 416], outline='black', width=8)
+    return image
+
+
+def distance(a, b):
+    return ((a ^ b) & (2 ** 64 - 1)).bit_count()
+
+
+class ImageHashTests(SimpleTestCase):
+    """Test the perceptual hash and the multi-index hash table."""
+
+    def test_similar_images_hash_alike(self):
+        """Test that resized, recompressed and shifted copies stay close."""
+        original = image_hash(draw_cat())
+        buffer = io.BytesIO()
+        draw_cat(1024).save(buffer, format='JPEG', quality=60)
+        self.assertLessEqual(distance(original, image_hash(Image.open(buffer))), 4)
+        self.assertLessEqual(distance(original, image_hash(draw_cat(offset=6))), 8)
+        self.assertGreater(distance(original, image_hash(draw_car())), 16)
+
+    def test_transparent_background_is_white(self):
+        """Test that a transparent PNG hashes like the same drawing on paper."""
+        rgba = draw_cat().convert('RGBA')
+        rgba.putdata([(0, 0, 0, 0) if pixel[:3] == (255, 255, 255) else pixel for pixel in rgba.getdata()])
+        self.assertLessEqual(distance(image_hash(draw_cat()), image_hash(rgba)), 2)
+
+    def test_search_matches_brute_force(self):
+        """Test that radius lookups find exactly the hashes within the radius."""
+        rng = random.Random(7)
+        hashes = {}
+        for pk in range(1, 2001):
+            value = rng.getrandbits(64)
+            if pk % 3 == 0:
+                # Close to an earlier hash
+                value = hashes[pk - 1] & (2 ** 64 - 1)
+                for bit in rng.sample(range(64), rng.randint(0, 10)):
+                    value ^= 1 << bit
+            hashes[pk] = to_signed(value)
+        index = MultiIndexHash()
+        for pk, value in hashes.items():
+            index.add(value, pk)
+
+        for query in list(hashes.values())[:200]:
+            expected = sorted((distance(query, value), pk) for pk, value in hashes.items() if distance(query, value) <= 8)
+            self.assertEqual(index.search(query, 8), expected)
+
+        index.remove(hashes[3], 3)
+        self.assertNotIn(3, [pk for _distance, pk in index.search(hashes[3], 8)])
+        self.assertEqual(len(index), 1999)
+
+
+class DuplicateWarningTests(TestCase):
+    """Test the duplicate warning on the confirm page and the backfill."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        duplicate_index.index = None
+
+    def png(self, image):
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+    def create_page(self, title, image):
+        return ColoringPage.objects.create(
+            title_en=title, title_de=title, description_en='', description_de='', prompt=title,
+            image=SimpleUploadedFile(f'{title.lower()}.png', self.png(image)),
+        )
+
+    def test_hash_is_stored_on_save(self):
+        """Test that saving a page with an image stores its hash."""
+        page = self.create_page('Cat', draw_cat())
+        self.assertEqual(page.image_hash, image_hash(draw_cat()))
+
+    @override_settings(ROOT_URLCONF='ausmalbar.urls')
+    def test_confirm_page_warns(self):
+        """Test that a generated image similar to a catalog page is flagged."""
+        cat = self.create_page('Cat', draw_cat())
+        self.create_page('Car', draw_car())
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+
+        pending = os.path.join(self.media_root, 'pending.png')
+        draw_cat(1024, offset=4).save(pending)
+        session = self.client.session
+        session['pending_page'] = {
+            'title_en': 'Another Cat', 'prompt': 'cat', 'image_path': pending,
+            'thumb_path': pending, 'temp_dir': self.media_root,
+        }
+        session.save()
+
+        response = self.client.get(reverse('admin:confirm_coloring_page'))
+        self.assertEqual([page.pk for page in response.context['duplicates']], [cat.pk])
+        self.assertContains(response, reverse('admin:coloring_pages_coloringpage_change', args=[cat.pk]))
+        self.assertIsNotNone(self.client.session['pending_page']['image_hash'])
+
+    def test_backfill_command(self):
+        """Test that the command hashes pages that have no hash yet."""
+        cat = self.create_page('Cat', draw_cat())
+        expected = cat.image_hash
+        ColoringPage.objects.update(image_hash=None)
+
+        out = StringIO()
+        call_command('compute_image_hashes', '--workers', '2', stdout=out)
+        cat.refresh_from_db()
+        self.assertEqual(cat.image_hash, expected)
+        self.assertIn('Hashed 1 images', out.getvalue())
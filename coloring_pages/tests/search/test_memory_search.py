@@ -0,0 +1,101 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from coloring_pages.catalog import get_catalog_version
+from coloring_pages.models import ColoringPage
+from coloring_pages.search import get_search_backend
+from coloring_pages.search.memory import InMemorySearchBackend, InvertedIndex, SearchEngine, engine
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class InvertedIndexTests(SimpleTestCase):
+    """Test the in-memory inverted index."""
+
+    def setUp(self):
+        self.index = InvertedIndex()
+        self.index.add(1, ('Sleeping Cat', 'Schlafende Katze', '', '', 'a cat on a pillow'))
+        self.index.add(2, ('Happy Dog', 'Fröhlicher Hund', 'A dog with a cat toy', '', ''))
+        self.index.add(3, ('Space Rocket', 'Weltraumrakete', '', '', 'rocket launch'))
+
+    def test_title_hits_rank_above_description_hits(self):
+        """Test that title matches come before description matches."""
+        self.assertEqual(self.index.search('cat', 10), [1, 2])
+
+    def test_prefix_and_conjunctive_matching(self):
+        """Test prefix matching and that every term has to match."""
+        self.assertEqual(self.index.search('rock', 10), [3])
+        self.assertEqual(self.index.search('space rocket', 10), [3])
+        self.assertEqual(self.index.search('space cat', 10), [])
+
+    def test_update_and_remove(self):
+        """Test that re-adding replaces a page and removing hides it."""
+        self.index.add(3, ('Moon Lander', 'Mondlandefähre', '', '', ''))
+        self.assertEqual(self.index.search('rocket', 10), [])
+        self.assertEqual(self.index.search('lander', 10), [3])
+        self.index.remove(1)
+        self.assertEqual(self.index.search('cat', 10), [2])
+        self.assertEqual(len(self.index), 2)
+
+    def test_compact_keeps_live_postings(self):
+        """Test that compaction drops tombstones without losing live pages."""
+        self.index.remove(1)
+        self.index.compact()
+        self.assertEqual(self.index.search('cat', 10), [2])
+        self.assertNotIn(0, self.index.postings[self.index.term_ids['cat']])
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE,
+    SEARCH_BACKEND='coloring_pages.search.memory.InMemorySearchBackend',
+    SEARCH_MEMORY_POLL_INTERVAL=0,
+)
+class InMemorySearchBackendTests(TestCase):
+    """Test that the in-memory backend follows catalog changes."""
+
+    def setUp(self):
+        cache.clear()
+        engine.index = None
+
+    def create_page(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ColoringPage.objects.create(
+                title_en=title, title_de=title, description_en='', description_de='', prompt=''
+            )
+
+    def test_backend_setting(self):
+        """Test that the in-memory backend can be selected."""
+        self.assertIsInstance(get_search_backend(), InMemorySearchBackend)
+
+    def test_changes_reach_other_workers(self):
+        """Test that a second engine catches up through the catalog version."""
+        cat = self.create_page('Sleeping Cat')
+        other_worker = SearchEngine()
+        self.assertEqual(other_worker.search('cat', 10), [cat.id])
+
+        dog = self.create_page('Cat and Dog')
+        self.assertEqual(get_catalog_version(), 2)
+        self.assertEqual(other_worker.search('cat', 10), [dog.id, cat.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ColoringPage.objects.filter(pk=cat.pk).delete()
+        self.assertEqual(other_worker.search('cat', 10), [dog.id])
+
+    def test_expired_changes_trigger_rebuild(self):
+        """Test that a worker rebuilds when it cannot replay the changes."""
+        other_worker = SearchEngine()
+        other_worker.search('cat', 10)
+        cat = self.create_page('Sleeping Cat')
+        cache.delete('catalog:change:1')
+        self.assertEqual(other_worker.search('cat', 10), [cat.id])
@@ -0,0 +1,112 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from coloring_pages.models import ColoringPage, SearchTermTranslation
+from coloring_pages.search import get_search_backend
+from coloring_pages.search.expansion import (
+    compute_term_map, english_stem, expand_term, german_stem, term_map,
+)
+from coloring_pages.search.memory import engine
+
+ALIGNED_PAGES = (
+    ('Sleeping Cat', 'Schlafende Katze', 'A cat on a pillow', 'Eine Katze auf einem Kissen'),
+    ('Cat with Hat', 'Katze mit Hut', 'A funny cat', 'Eine lustige Katze'),
+    ('Happy Dog', 'Fröhlicher Hund', 'A dog in the park', 'Ein Hund im Park'),
+    ('Dog and Ball', 'Hund und Ball', 'A dog plays', 'Ein Hund spielt'),
+)
+
+
+class StemmingTests(SimpleTestCase):
+    """Test the light stemmers and the expansion of single terms."""
+
+    def test_german_stem(self):
+        """Test that inflections and diminutives share a stem."""
+        for word in ('Katze', 'katzen', 'kätzchen'):
+            self.assertEqual(german_stem(word.lower()), 'katz')
+        self.assertEqual(german_stem('straße'), 'strass')
+        # Short stems are not stripped further
+        self.assertEqual(german_stem('tiger'), 'tiger')
+
+    def test_english_stem(self):
+        """Test that stems stay a prefix of their word forms."""
+        self.assertEqual(english_stem('puppies'), 'pupp')
+        self.assertEqual(english_stem('puppy'), 'pupp')
+        self.assertEqual(english_stem('running'), 'run')
+        self.assertEqual(english_stem('foxes'), 'fox')
+        self.assertEqual(english_stem('cat'), 'cat')
+
+    def test_expand_term(self):
+        """Test that a term expands to its stems and translations."""
+        translations = {'de': {'katz': ['cat']}}
+        self.assertEqual(expand_term('kätzchen', translations), ['cat', 'katz'])
+        self.assertEqual(expand_term('mit', translations), ['mit'])
+
+    def test_compute_term_map(self):
+        """Test that terms aligned on several pages become translations."""
+        pairs = {row[:3] for row in compute_term_map(ALIGNED_PAGES)}
+        self.assertIn(('de', 'katz', 'cat'), pairs)
+        self.assertIn(('en', 'dog', 'hund'), pairs)
+        self.assertNotIn(('de', 'katz', 'dog'), pairs)
+
+
+class CrossLingualSearchTests(TestCase):
+    """Test that queries find pages in the other language."""
+
+    def setUp(self):
+        term_map.invalidate()
+        engine.index = None
+        self.addCleanup(term_map.invalidate)
+        for title_en, title_de, description_en, description_de in ALIGNED_PAGES:
+            ColoringPage.objects.create(
+                title_en=title_en, title_de=title_de,
+                description_en=description_en, description_de=description_de, prompt=''
+            )
+        call_command('build_term_map', stdout=StringIO())
+        # A page that was never translated
+        self.kitten = ColoringPage.objects.create(
+            title_en='Cat in a Box', title_de='', description_en='', description_de='', prompt=''
+        )
+        self.kaetzchen = ColoringPage.objects.create(
+            title_en='', title_de='Kleines Kätzchen', description_en='', description_de='', prompt=''
+        )
+
+    def assertFinds(self, query, *pages):
+        ids = get_search_backend().search_ids(query)
+        for page in pages:
+            self.assertIn(page.id, ids)
+
+    def test_term_map_is_stored(self):
+        """Test that the command stores the learned translations."""
+        self.assertTrue(SearchTermTranslation.objects.filter(language='de', term='katz', translation='cat').exists())
+
+    def test_german_query_finds_english_page(self):
+        """Test that "Katze" finds the untranslated page and the diminutive."""
+        self.assertFinds('Katze', self.kitten, self.kaetzchen)
+
+    def test_english_query_finds_german_page(self):
+        """Test that "cat" and "cats" find the German-only page."""
+        self.assertFinds('cat', self.kitten, self.kaetzchen)
+        self.assertFinds('cats', self.kitten, self.kaetzchen)
+
+    @override_settings(SEARCH_BACKEND='coloring_pages.search.memory.InMemorySearchBackend')
+    def test_in_memory_backend(self):
+        """Test that the in-memory backend expands queries too."""
+        self.assertFinds('Katze', self.kitten, self.kaetzchen)
+
+    @override_settings(SEARCH_BACKEND='coloring_pages.search.backends.DatabaseSearchBackend')
+    def test_database_backend(self):
+        """Test that the icontains fallback expands queries too."""
+        self.assertFinds('Katze', self.kitten)
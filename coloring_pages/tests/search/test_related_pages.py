@@ -0,0 +1,124 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from io import StringIO
+
+import numpy as np
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from coloring_pages.models import ColoringPage, RelatedPage
+from coloring_pages.search.related import TfidfMatrix, page_terms, update_related_pages
+
+PAGES = (
+    ('Sleeping Cat', 'Schlafende Katze', 'A cat sleeping on a pillow'),
+    ('Cat with Hat', 'Katze mit Hut', 'A funny cat wearing a hat'),
+    ('Happy Dog', 'Fröhlicher Hund', 'A dog playing in the park'),
+    ('Dog and Ball', 'Hund und Ball', 'A dog playing with a ball'),
+    ('Race Car', 'Rennauto', 'A race car on a track'),
+)
+
+
+class TfidfMatrixTests(SimpleTestCase):
+    """Test the TF-IDF neighbour computation."""
+
+    def setUp(self):
+        self.matrix = TfidfMatrix(
+            list(range(1, len(PAGES) + 1)), [page_terms(*page) for page in PAGES]
+        )
+
+    def dense(self, row):
+        vector = np.zeros(len(self.matrix.vocabulary), dtype=np.float32)
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        vector[self.matrix.indices[start:end]] = self.matrix.data[start:end]
+        return vector
+
+    def test_page_terms(self):
+        """Test that title terms count double and stop words are ignored."""
+        terms = page_terms('Sleeping Cat', 'Schlafende Katze', 'A cat on a pillow')
+        self.assertEqual(terms['cat'], 3)
+        self.assertEqual(terms['katze'], 2)
+        self.assertNotIn('on', terms)
+
+    def test_neighbours(self):
+        """Test that pages sharing terms are neighbours, best first."""
+        neighbours = self.matrix.neighbours(1, 8)
+        self.assertEqual([pk for pk, _score in neighbours], [2])
+        self.assertAlmostEqual(neighbours[0][1], float(self.dense(0) @ self.dense(1)), places=5)
+        self.assertEqual([pk for pk, _score in self.matrix.neighbours(3, 8)], [4])
+        # Nothing in common with any other page
+        self.assertEqual(self.matrix.neighbours(5, 8), [])
+
+    def test_min_score(self):
+        """Test that weak neighbours are left out."""
+        (_pk, score), = self.matrix.neighbours(1, 8)
+        self.assertEqual(self.matrix.neighbours(1, 8, min_score=score + 0.01), [])
+
+
+class RelatedPagesTests(TestCase):
+    """Test the stored related pages and the detail page."""
+
+    def setUp(self):
+        self.pages = [
+            ColoringPage.objects.create(
+                title_en=title_en, title_de=title_de, description_en='', description_de='', prompt=prompt
+            )
+            for title_en, title_de, prompt in PAGES
+        ]
+
+    def related_ids(self, page):
+        return list(RelatedPage.get_related_pages(page).values_list('id', flat=True))
+
+    def test_build_command(self):
+        """Test that the command stores the neighbours of every page."""
+        call_command('build_related_pages', stdout=StringIO())
+        cat, hat, dog, ball, car = self.pages
+        self.assertEqual(self.related_ids(cat), [hat.id])
+        self.assertEqual(self.related_ids(ball), [dog.id])
+        self.assertEqual(self.related_ids(car), [])
+
+    def test_new_page_is_offered_to_neighbours(self):
+        """Test that a new page is added to the lists of similar pages."""
+        call_command('build_related_pages', stdout=StringIO())
+        cat, hat = self.pages[:2]
+        kitten = ColoringPage.objects.create(
+            title_en='Cat and Kitten', title_de='Katze und Kätzchen',
+            description_en='', description_de='', prompt='A cat with a pillow'
+        )
+        update_related_pages([kitten.id])
+
+        self.assertEqual(set(self.related_ids(kitten)), {cat.id, hat.id})
+        self.assertIn(kitten.id, self.related_ids(cat))
+        self.assertIn(kitten.id, self.related_ids(hat))
+
+    @override_settings(RELATED_PAGES_COUNT=1)
+    def test_neighbour_lists_stay_bounded(self):
+        """Test that offering a page keeps at most k neighbours per page."""
+        call_command('build_related_pages', stdout=StringIO())
+        cat = self.pages[0]
+        twin = ColoringPage.objects.create(
+            title_en='Sleeping Cat', title_de='Schlafende Katze',
+            description_en='', description_de='', prompt='A cat sleeping on a pillow'
+        )
+        update_related_pages([twin.id])
+        self.assertEqual(self.related_ids(cat), [twin.id])
+
+    def test_detail_page(self):
+        """Test that the detail page lists the related pages in one query."""
+        call_command('build_related_pages', stdout=StringIO())
+        cat, hat = self.pages[:2]
+        response = self.client.get(cat.get_absolute_url('en'))
+        self.assertEqual(list(response.context['related_pages']), [hat])
+        self.assertContains(response, hat.get_absolute_url('en'))
+
+        with self.assertNumQueries(1):
+            list(RelatedPage.get_related_pages(cat))
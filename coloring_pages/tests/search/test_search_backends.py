@@ -0,0 +1,133 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from django.test import TestCase, override_settings
+
+from coloring_pages.models import ColoringPage, DailySearchRollup, SearchQuery
+from coloring_pages.search import get_search_backend, hydrate_pages
+from coloring_pages.search.backends import DatabaseSearchBackend, SQLiteSearchBackend, tokenize
+from coloring_pages.search.trigram import (
+    TrigramIndex, page_index, suggest_queries, suggestion_index,
+)
+
+
+def create_page(title_en, title_de='', description_en='', description_de='', prompt=''):
+    return ColoringPage.objects.create(
+        title_en=title_en,
+        title_de=title_de or title_en,
+        description_en=description_en,
+        description_de=description_de,
+        prompt=prompt,
+    )
+
+
+class SearchBackendTests(TestCase):
+    """Test the full-text search backends on the test database."""
+
+    def setUp(self):
+        self.cat = create_page('Sleeping Cat', 'Schlafende Katze', prompt='a cat on a pillow')
+        self.dog = create_page('Happy Dog', 'Fröhlicher Hund', description_en='A dog playing with a cat toy')
+        self.rocket = create_page('Space Rocket', 'Weltraumrakete', prompt='rocket launch')
+
+    def test_vendor_backend_is_selected(self):
+        """Test that the SQLite test database uses the FTS5 backend."""
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+
+    def test_title_hits_rank_above_description_hits(self):
+        """Test that a title match is ranked before a description match."""
+        ids = get_search_backend().search_ids('cat')
+        self.assertEqual(ids, [self.cat.id, self.dog.id])
+
+    def test_prefix_and_german_matching(self):
+        """Test prefix matching on the German columns, ignoring umlauts."""
+        backend = get_search_backend()
+        self.assertEqual(backend.search_ids('katz'), [self.cat.id])
+        self.assertEqual(backend.search_ids('frohlich'), [self.dog.id])
+
+    def test_all_terms_must_match(self):
+        """Test that multi-word queries require every term."""
+        backend = get_search_backend()
+        self.assertEqual(backend.search_ids('space rocket'), [self.rocket.id])
+        self.assertEqual(backend.search_ids('space cat'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that the FTS triggers keep the index in sync."""
+        backend = get_search_backend()
+        ColoringPage.objects.filter(pk=self.rocket.pk).update(title_en='Moon Lander')
+        self.assertEqual(backend.search_ids('lander'), [self.rocket.id])
+        self.assertEqual(backend.search_ids('space'), [])
+
+        ColoringPage.objects.filter(pk=self.rocket.pk).delete()
+        self.assertEqual(backend.search_ids('lander'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Test that FTS operators in user input are treated as plain words."""
+        self.assertEqual(tokenize('cat" OR NEAR(dog*'), ['cat', 'or', 'near', 'dog'])
+        self.assertEqual(get_search_backend().search_ids('"*'), [])
+
+    @override_settings(SEARCH_BACKEND='coloring_pages.search.backends.DatabaseSearchBackend')
+    def test_backend_setting(self):
+        """Test that SEARCH_BACKEND overrides the vendor default."""
+        backend = get_search_backend()
+        self.assertIsInstance(backend, DatabaseSearchBackend)
+        self.assertEqual(set(backend.search_ids('cat')), {self.cat.id, self.dog.id})
+
+    def test_hydrate_pages_preserves_order(self):
+        """Test that hydration keeps the ranking order and skips missing ids."""
+        pages = hydrate_pages([self.rocket.id, 999999, self.cat.id])
+        self.assertEqual(pages, [self.rocket, self.cat])
+
+
+class SearchViewTests(TestCase):
+    """Test the search view on top of the search backend."""
+
+    def test_search_view_returns_ranked_results(self):
+        """Test that the search view renders the backend results."""
+        cat = create_page('Sleeping Cat', prompt='a cat')
+        create_page('Space Rocket')
+        response = self.client.get('/en/search/', {'q': 'cat'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['page_obj']), [cat])
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+
+
+class TrigramSearchTests(TestCase):
+    """Test the typo-tolerant fallback and query suggestions."""
+
+    def setUp(self):
+        page_index.invalidate()
+        suggestion_index.invalidate()
+
+    def test_trigram_index_lookup(self):
+        """Test that misspelled words find their indexed neighbours."""
+        index = TrigramIndex()
+        for word in ('dinosaur', 'einhorn', 'rocket'):
+            index.add(word)
+        self.assertEqual(index.lookup('dinosour')[0][0], 'dinosaur')
+        self.assertEqual(index.lookup('Einhorm')[0][0], 'einhorn')
+        self.assertEqual(index.lookup('zebra'), [])
+
+    def test_fuzzy_fallback_in_search_view(self):
+        """Test that a misspelled query falls back to similar pages."""
+        dino = create_page('Friendly Dinosaur', 'Freundlicher Dinosaurier')
+        create_page('Space Rocket')
+        response = self.client.get('/en/search/', {'q': 'dinosour'})
+        self.assertEqual(list(response.context['page_obj']), [dino])
+        self.assertTrue(response.context['is_fuzzy'])
+
+    def test_did_you_mean_uses_successful_queries(self):
+        """Test that suggestions come from queries that returned results."""
+        DailySearchRollup.add_searches([
+            SearchQuery.objects.create(query='Einhorn', result_count=4, language='de'),
+            SearchQuery.objects.create(query='Einhorm', result_count=0, language='de'),
+        ])
+        self.assertEqual(suggest_queries('Einhorm', 'de'), ['einhorn'])
+        self.assertEqual(suggest_queries('Einhorm', 'en'), [])
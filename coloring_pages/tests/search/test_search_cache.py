@@ -0,0 +1,67 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from coloring_pages.models import ColoringPage
+from coloring_pages.search.cache import get_cache_stats, normalize_query, search_page
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, SEARCH_RESULT_CACHE_TIMEOUT=600)
+class SearchResultCacheTests(TestCase):
+    """Test the versioned search result cache."""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_page(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ColoringPage.objects.create(
+                title_en=title, title_de=title, description_en='', description_de='', prompt=''
+            )
+
+    def test_normalize_query(self):
+        """Test that case and punctuation do not create separate entries."""
+        self.assertEqual(normalize_query('  Cute CAT! '), 'cute cat')
+
+    def test_hits_and_misses_are_counted(self):
+        """Test that a repeated query is served from the cache."""
+        cat = self.create_page('Sleeping Cat')
+        self.assertEqual(search_page('cat', 'en', 1, 8)['ids'], [cat.id])
+        self.assertEqual(search_page('CAT', 'en', '1', 8)['ids'], [cat.id])
+        self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_catalog_changes_invalidate_entries(self):
+        """Test that saving or deleting a page makes cached results unreachable."""
+        cat = self.create_page('Sleeping Cat')
+        self.assertEqual(search_page('cat', 'en', 1, 8)['count'], 1)
+
+        kitten = self.create_page('Cat Kitten')
+        self.assertEqual(search_page('cat', 'en', 1, 8)['ids'], [kitten.id, cat.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            kitten.title_en = kitten.title_de = 'Dog'
+            kitten.save()
+        self.assertEqual(search_page('cat', 'en', 1, 8)['ids'], [cat.id])
+        self.assertEqual(get_cache_stats()['hits'], 0)
+
+    def test_page_numbers_are_cached_separately(self):
+        """Test that each page of results has its own entry."""
+        pages = [self.create_page(f'Cat {i}') for i in range(3)]
+        first = search_page('cat', 'en', 1, 2)
+        second = search_page('cat', 'en', 2, 2)
+        self.assertEqual(first['count'], 3)
+        self.assertEqual(len(first['ids']), 2)
+        self.assertEqual(second['ids'], [pages[0].id])
+        self.assertEqual(search_page('cat', 'en', 'invalid', 2)['ids'], first['ids'])
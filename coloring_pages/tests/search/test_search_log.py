@@ -0,0 +1,79 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from coloring_pages.models import SearchQuery
+from coloring_pages.search.querylog import SearchLogBuffer
+
+
+@override_settings(SEARCH_LOG_FLUSH_INTERVAL=60, SEARCH_LOG_BATCH_SIZE=3)
+class SearchLogBufferTests(TestCase):
+    """Test the write-behind search query log."""
+
+    def setUp(self):
+        self.buffer = SearchLogBuffer()
+        # Flush by hand instead of from the background thread
+        patcher = mock.patch.object(self.buffer, 'start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_request(self, session_key=None):
+        request = RequestFactory().get('/search/', HTTP_USER_AGENT='test')
+        request.session = SessionStore(session_key)
+        request.LANGUAGE_CODE = 'de'
+        return request
+
+    def test_buffers_until_flush(self):
+        """Test that searches are only written when the buffer is flushed."""
+        self.assertTrue(self.buffer.log(self.make_request(), 'cat', 4))
+        self.assertFalse(SearchQuery.objects.exists())
+
+        self.assertEqual(self.buffer.flush(), 1)
+        search = SearchQuery.objects.get()
+        self.assertEqual((search.query, search.result_count, search.language), ('cat', 4, 'de'))
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_full_buffer_wakes_flusher(self):
+        """Test that reaching the batch size triggers a flush."""
+        for query in ('cat', 'dog'):
+            self.buffer.log(self.make_request(), query, 1)
+        self.assertFalse(self.buffer.wakeup.is_set())
+        self.buffer.log(self.make_request(), 'fox', 1)
+        self.assertTrue(self.buffer.wakeup.is_set())
+
+    def test_deduplicates_per_session(self):
+        """Test that a session repeating a query within the window is logged once."""
+        self.assertTrue(self.buffer.log(self.make_request('a' * 32), 'Cat', 1))
+        self.assertFalse(self.buffer.log(self.make_request('a' * 32), 'cat', 1))
+        self.assertTrue(self.buffer.log(self.make_request('b' * 32), 'cat', 1))
+        # Searches without a session cannot be told apart
+        self.assertTrue(self.buffer.log(self.make_request(), 'cat', 1))
+        self.assertTrue(self.buffer.log(self.make_request(), 'cat', 1))
+        self.buffer.flush()
+        self.assertEqual(SearchQuery.objects.count(), 4)
+
+    @override_settings(SEARCH_LOG_SAMPLE_RATE=0)
+    def test_sampling(self):
+        """Test that a sample rate of 0 logs nothing."""
+        self.assertFalse(self.buffer.log(self.make_request(), 'cat', 1))
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_search_view_logs_query(self):
+        """Test that the search view logs a search (immediately in tests)."""
+        with override_settings(SEARCH_LOG_FLUSH_INTERVAL=0):
+            response = self.client.get(reverse('coloring_pages:search'), {'q': 'unicorn'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(SearchQuery.objects.values_list('query', flat=True)), ['unicorn'])
@@ -0,0 +1,77 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from coloring_pages.models import DailySearchRollup, SearchQuery
+
+
+class DailySearchRollupTests(TestCase):
+    """Test the daily search rollups and the popular searches read from them."""
+
+    def log(self, *searches):
+        saved = SearchQuery.objects.bulk_create(
+            SearchQuery(query=query, language=language, result_count=results)
+            for query, language, results in searches
+        )
+        DailySearchRollup.add_searches(saved)
+
+    def test_add_searches_increments(self):
+        """Test that logged searches are added to their day's rollup."""
+        self.log(('Cat', 'en', 3), ('cat ', 'en', 0), ('cat', 'de', 1))
+        self.log(('cat', 'en', 2))
+
+        rollup = DailySearchRollup.objects.get(language='en', query='cat')
+        self.assertEqual(rollup.day, timezone.localdate())
+        self.assertEqual((rollup.search_count, rollup.zero_result_count), (3, 1))
+        self.assertEqual(DailySearchRollup.objects.get(language='de').search_count, 1)
+
+    def test_rebuild_matches_incremental(self):
+        """Test that rebuilding a day gives the same rollups."""
+        self.log(('Cat', 'en', 3), ('cat', 'en', 0), ('dog', 'en', 0), ('hund', 'de', 2))
+        rows = list(DailySearchRollup.objects.values_list('language', 'query', 'search_count', 'zero_result_count'))
+
+        out = StringIO()
+        call_command('rollup_search_queries', '--days', '1', stdout=out)
+        self.assertIn('3 queries', out.getvalue())
+        rebuilt = DailySearchRollup.objects.values_list('language', 'query', 'search_count', 'zero_result_count')
+        self.assertCountEqual(rebuilt, rows)
+
+    def test_popular_searches(self):
+        """Test that popular searches only count searches with results."""
+        self.log(('cat', 'en', 3), ('cat', 'en', 3), ('dog', 'en', 1), ('xyz', 'en', 0), ('xyz', 'en', 0))
+        self.assertEqual(
+            SearchQuery.get_popular_searches(days=30, limit=5, language='en'),
+            [{'query': 'cat', 'count': 2}, {'query': 'dog', 'count': 1}]
+        )
+        self.assertEqual(SearchQuery.get_popular_searches(language='de'), [])
+        self.assertEqual(
+            DailySearchRollup.get_top_queries(7, zero_results=True),
+            [{'query': 'xyz', 'count': 2}]
+        )
+
+    @override_settings(ROOT_URLCONF='ausmalbar.urls')
+    def test_admin_trends(self):
+        """Test that the admin trends page lists top and zero-result queries."""
+        self.log(('unicorn', 'en', 3), ('xyzzy', 'en', 0))
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('admin:coloring_pages_searchquery_trends'), {'days': 7})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['top_queries'], [{'query': 'unicorn', 'count': 1}])
+        self.assertEqual(response.context['zero_result_queries'], [{'query': 'xyzzy', 'count': 1}])
@@ -0,0 +1,92 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from coloring_pages.models import ColoringPage, DailySearchRollup, SearchQuery
+from coloring_pages.search.suggest import PrefixIndex, SuggestEngine, engine, query_index
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class PrefixIndexTests(SimpleTestCase):
+    """Test the sorted-array prefix index."""
+
+    def setUp(self):
+        self.index = PrefixIndex()
+        for key, rank, value in (('cat', 2, 'a'), ('car', 1, 'b'), ('catalog', 0, 'c'), ('dog', 0, 'd')):
+            self.index.add(key, rank, value)
+        self.index.finish()
+
+    def test_lookup_by_rank(self):
+        """Test that matches of a prefix come back best ranked first."""
+        self.assertEqual(self.index.lookup('ca', 10), ['c', 'b', 'a'])
+        self.assertEqual(self.index.lookup('cat', 1), ['c'])
+        self.assertEqual(self.index.lookup('x', 10), [])
+
+    def test_replace(self):
+        """Test that replacing a value's entries keeps the array sorted."""
+        self.index.replace(['c'], [('cab', 0, 'c')])
+        self.assertEqual(self.index.lookup('cat', 10), ['a'])
+        self.assertEqual(self.index.lookup('cab', 10), ['c'])
+        self.assertEqual(self.index.entries, sorted(self.index.entries))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, SEARCH_MEMORY_POLL_INTERVAL=0)
+class SearchSuggestViewTests(TestCase):
+    """Test the search suggestion endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        engine.index = None
+        query_index.invalidate()
+
+    def create_page(self, title_en, title_de):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ColoringPage.objects.create(
+                title_en=title_en, title_de=title_de, description_en='', description_de='', prompt=''
+            )
+
+    def test_suggests_titles_and_queries(self):
+        """Test that titles and popular queries matching the prefix are returned."""
+        cat = self.create_page('Sleeping Cat', 'Schlafende Katze')
+        self.create_page('Happy Dog', 'Fröhlicher Hund')
+        DailySearchRollup.add_searches([
+            SearchQuery.objects.create(query='cats', result_count=2, language='en'),
+            SearchQuery.objects.create(query='catapult', result_count=0, language='en'),
+        ])
+
+        response = self.client.get(reverse('coloring_pages:search_suggest'), {'q': 'Ca'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(response.json(), {
+            'query': 'Ca',
+            'titles': [{'title': 'Sleeping Cat', 'url': cat.get_absolute_url('en')}],
+            'queries': ['cats'],
+        })
+
+        # Warm indexes answer without touching the database
+        with self.assertNumQueries(0):
+            self.client.get(reverse('coloring_pages:search_suggest'), {'q': 'sle'})
+
+    def test_follows_catalog_changes(self):
+        """Test that another worker's index picks up new and deleted pages."""
+        other_worker = SuggestEngine()
+        self.assertEqual(other_worker.suggest('de', 'kat', 5), [])
+
+        cat = self.create_page('Sleeping Cat', 'Schlafende Katze')
+        self.assertEqual([row[1] for row in other_worker.suggest('de', 'kat', 5)], ['Schlafende Katze'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ColoringPage.objects.filter(pk=cat.pk).delete()
+        self.assertEqual(other_worker.suggest('de', 'kat', 5), [])
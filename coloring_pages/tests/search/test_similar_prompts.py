@@ -0,0 +1,100 @@
+import os
+import sys
+import django
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+# Configure Django settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'coloring_pages.tests.frontend.test_settings'
+django.setup()
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from coloring_pages.models import ColoringPage, SystemPrompt
+from coloring_pages.search.prompts import PromptIndex, engine
+
+PROMPTS = (
+    'A cute cat wearing a wizard hat',
+    'A dinosaur playing soccer in a stadium',
+    'An axolotl swimming between water plants',
+)
+
+
+class PromptIndexTests(SimpleTestCase):
+    """Test the similar prompt index."""
+
+    def setUp(self):
+        self.index = PromptIndex()
+        for pk, prompt in enumerate(PROMPTS, 1):
+            self.index.add(pk, prompt)
+
+    def test_finds_reworded_prompts(self):
+        """Test that inflected and reordered prompts are found."""
+        self.assertEqual([pk for pk, _score in self.index.search('cute cats wearing wizard hats')], [1])
+        self.assertEqual([pk for pk, _score in self.index.search('a wizard hat on a cute cat', threshold=0.3)], [1])
+        self.assertEqual(self.index.search('a race car on a track'), [])
+
+    def test_rare_words_weigh_more(self):
+        """Test that sharing a rare word beats sharing a common one."""
+        for pk in range(10, 30):
+            self.index.add(pk, f'A cute puppy number {pk}')
+        axolotl = dict(self.index.search('a cute axolotl', limit=50, threshold=0))
+        self.assertGreater(axolotl[3], axolotl[10])
+
+    def test_update_and_remove(self):
+        """Test that changed and removed prompts are no longer found."""
+        self.index.add(1, 'A race car on a track')
+        self.assertEqual([pk for pk, _score in self.index.search('race car track')], [1])
+        self.index.remove(1)
+        self.assertEqual(self.index.search('race car track'), [])
+        self.assertEqual(len(self.index), 2)
+
+
+@override_settings(ROOT_URLCONF='ausmalbar.urls')
+class SimilarPromptViewTests(TestCase):
+    """Test the precheck of the generate view and the JSON endpoint."""
+
+    def setUp(self):
+        engine.index = None
+        for prompt in PROMPTS:
+            ColoringPage.objects.create(
+                title_en=prompt, title_de=prompt, description_en='', description_de='', prompt=prompt
+            )
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        self.system_prompt = SystemPrompt.objects.first() or SystemPrompt.objects.create(
+            name='Test', prompt='%(prompt)s', model_provider='openai', model_name='gpt-image-1'
+        )
+
+    def test_endpoint(self):
+        """Test that the endpoint lists pages with similar prompts."""
+        response = self.client.get(
+            reverse('admin:coloring_pages_coloringpage_similar_prompts'),
+            {'prompt': 'cute cat in a wizard hat'},
+        )
+        self.assertEqual(response.status_code, 200)
+        similar = response.json()['similar']
+        self.assertEqual([page['title'] for page in similar], [PROMPTS[0]])
+        self.assertIn('/change/', similar[0]['admin_url'])
+
+    @mock.patch('coloring_pages.utils.generate_coloring_page_image')
+    @mock.patch('coloring_pages.utils.generate_titles_and_descriptions')
+    def test_generate_offers_similar_pages_first(self, titles, image):
+        """Test that a similar prompt is shown instead of calling the image API."""
+        url = reverse('admin:coloring_pages_coloringpage_generate')
+        data = {'prompt': 'A cute cat wearing a wizard hat!', 'system_prompt': self.system_prompt.pk}
+        response = self.client.post(url, data, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual([page['title'] for page in response.json()['similar']], [PROMPTS[0]])
+        titles.assert_not_called()
+        image.assert_not_called()
+
+        # Without JavaScript the form is shown again with the matches
+        response = self.client.post(url, data)
+        self.assertEqual(list(response.context['similar_pages']), [ColoringPage.objects.get(prompt=PROMPTS[0])])
+        self.assertContains(response, 'name="generate_anyway" id="id_generate_anyway" value="1"')
+        image.assert_not_called()
@@ -0,0 +1,212 @@
+"""
+On-demand image transforms: ``/media/t/<w>x<h>/<format>/<path>``.
+
+Templates can ask for an original in any size on ``TRANSFORM_SIZES`` and any
+format on ``TRANSFORM_FORMATS``, e.g. ``/media/t/512x512/webp/coloring_pages/cat.png``,
+instead of every layout change needing a new baked-in thumbnail and a
+backfill. The image is fitted into the box (never upscaled), flattened onto
+white and encoded like the derivatives (see ``coloring_pages.derivatives``).
+
+- Results are kept in a disk cache under ``TRANSFORM_CACHE_ROOT``, named by a
+  hash of the original's name, size and modification time and the transform,
+  so a replaced original is never served stale.
+- The cache is bounded by ``TRANSFORM_CACHE_MAX_BYTES`` with LRU eviction:
+  hits touch the file's mtime, and each worker keeps the files in recency
+  order, rescanning the directory every ``TRANSFORM_CACHE_RESCAN`` seconds to
+  see what other workers wrote. Evicting a file another worker is about to
+  serve only costs that worker a re-render.
+- Rendering runs on a small per-worker thread pool (``TRANSFORM_WORKERS``),
+  so a burst of cold URLs cannot take every core, and concurrent requests
+  for the same transform wait for one render (single flight). Workers write
+  to a temporary file and rename it, so a file is never seen half written.
+- The ETag derives from the cache key, so revalidations answer 304 without
+  rendering or opening anything.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.http import require_safe
+from PIL import Image
+
+from .derivatives import CONTENT_TYPES, can_encode, encode, to_line_art
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+class TransformCache:
+    """
+    Size-bounded LRU cache of rendered transforms on disk.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = OrderedDict()
+        self.total = 0
+        self.root = None
+        self.scanned_at = None
+        self.inflight = {}
+        self.executor = None
+
+    @property
+    def max_bytes(self):
+        return getattr(settings, 'TRANSFORM_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+
+    def get_root(self):
+        return settings.TRANSFORM_CACHE_ROOT
+
+    def scan(self):
+        """
+        Rebuild the recency order from the files on disk, oldest first.
+        """
+        root = self.get_root()
+        entries = []
+        for directory, _dirs, files in os.walk(root):
+            for filename in files:
+                if filename.startswith('.'):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+        entries.sort()
+        self.files = OrderedDict((path, size) for _mtime, path, size in entries)
+        self.total = sum(self.files.values())
+        self.root, self.scanned_at = root, time.monotonic()
+
+    def ensure_scanned(self):
+        rescan = getattr(settings, 'TRANSFORM_CACHE_RESCAN', 300)
+        if self.root != self.get_root() or time.monotonic() - self.scanned_at > rescan:
+            self.scan()
+
+    def touch(self, path):
+        """
+        Mark a cached file as used; returns False if it is gone.
+        """
+        try:
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.total -= self.files.pop(path, 0)
+            return False
+        with self.lock:
+            if path in self.files:
+                self.files.move_to_end(path)
+        return True
+
+    def add(self, path, size):
+        with self.lock:
+            self.ensure_scanned()
+            self.total += size - self.files.pop(path, 0)
+            self.files[path] = size
+            while self.total > self.max_bytes and len(self.files) > 1:
+                oldest, oldest_size = self.files.popitem(last=False)
+                self.total -= oldest_size
+                try:
+                    os.remove(oldest)
+                except OSError:
+                    pass
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'TRANSFORM_WORKERS', 2), thread_name_prefix='transform'
+                )
+            return self.executor
+
+    def get(self, key, path, render):
+        """
+        Get the path of a cached transform, rendering it once if missing.
+
+        Args:
+            key: Cache key of the transform
+            path: Where the transform is cached
+            render: Callable returning the encoded bytes
+
+        Returns:
+            str: ``path``
+        """
+        while True:
+            with self.lock:
+                self.ensure_scanned()
+                future = self.inflight.get(key)
+                owner = future is None and not os.path.exists(path)
+                if owner:
+                    future = self.inflight[key] = Future()
+            if future is None:
+                if self.touch(path):
+                    return path
+                # Evicted in the meantime
+                continue
+            if not owner:
+                return future.result()
+            try:
+                self.write(path, self.get_executor().submit(render).result())
+                future.set_result(path)
+                return path
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with self.lock:
+                    self.inflight.pop(key, None)
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+        self.add(path, len(data))
+
+
+transform_cache = TransformCache()
+
+
+def render_transform(name, width, height, fmt):
+    with default_storage.open(name, 'rb') as file, Image.open(file) as img:
+        img = to_line_art(img)
+        img.thumbnail((width, height), Image.Resampling.LANCZOS)
+        return encode(img, fmt)
+
+
+@require_safe
+def transform_image(request, width, height, fmt, path):
+    """
+    Serve an original from the media storage resized and converted.
+    """
+    if (width, height) not in {tuple(size) for size in settings.TRANSFORM_SIZES}:
+        raise Http404('Size not allowed')
+    if fmt not in settings.TRANSFORM_FORMATS or not can_encode(fmt):
+        raise Http404('Format not allowed')
+    name = os.path.normpath(path).lstrip('/')
+    if name.startswith('.') or '/.' in name or not name.lower().endswith(SOURCE_EXTENSIONS):
+        raise Http404('Image not found')
+    try:
+        version = f'{default_storage.size(name)}-{default_storage.get_modified_time(name).timestamp()}'
+    except (OSError, NotImplementedError):
+        raise Http404('Image not found')
+
+    key = hashlib.sha1(f'{name}|{version}|{width}x{height}|{fmt}'.encode('utf-8')).hexdigest()
+    etag = quote_etag(key[:20])
+    max_age = getattr(settings, 'MEDIA_MAX_AGE', 3600)
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and etag in parse_etags(if_none_match):
+        response = HttpResponseNotModified()
+    else:
+        cache_path = os.path.join(transform_cache.get_root(), key[:2], f'{key}.{fmt}')
+        cache_path = transform_cache.get(key, cache_path, lambda: render_transform(name, width, height, fmt))
+        response = FileResponse(open(cache_path, 'rb'), content_type=CONTENT_TYPES[fmt])
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    return response
@@ -5,8 +5,9 @@ from django.utils.translation import gettext_lazy as _
 
 # Import views from their respective modules
 from .views.home import home
-from .views.search import search
-from .views.detail import page_detail, download_image
+from .views.search import search, search_suggest
+from .views.detail import page_detail, download_image, download_vector, print_pdf
+from .views.packs import download_pack
 from .views.views_class_based import ColoringPageDetailView, ImprintView
 from .views_legal import PrivacyPolicyView, TermsOfServiceView
 from .views.admin import generate_coloring_page, confirm_coloring_page
@@ -20,6 +21,8 @@ urlpatterns = [
     # Search URLs
     path('search/', search, name='search'),  # English
     path('suche/', search, name='suche'),    # German
+    path('search/suggest/', search_suggest, name='search_suggest'),
+    path('suche/vorschlaege/', search_suggest, name='suche_vorschlaege'),
     
     # SEO-friendly URLs for coloring pages
     # English version
@@ -35,6 +38,9 @@ urlpatterns = [
     # Keep the old URL pattern for backward compatibility
     path('page/<int:pk>/', page_detail, name='page_detail'),
     path('page/<int:pk>/download/', download_image, name='download_image'),
+    path('page/<int:pk>/download/svg/', download_vector, name='download_vector'),
+    path('page/<int:pk>/print.pdf', print_pdf, name='print_pdf'),
+    path('pack.zip', download_pack, name='download_pack'),
     
     # Admin URLs
     path('admin/generate/', login_required(generate_coloring_page), name='generate_coloring_page'),
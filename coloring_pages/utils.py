@@ -9,6 +9,8 @@ from PIL import Image
 from django.core.files.base import ContentFile
 from django.conf import settings
 
+from .lineart import optimize_line_art
+
 def generate_titles_and_descriptions(prompt: str) -> tuple[str, str, str, str]:
     """Generate English and German titles and descriptions for the coloring page based on the prompt.
     
@@ -179,6 +181,12 @@ def generate_coloring_page_image(prompt, system_prompt=None, generate_thumbnail=
             ext = os.path.splitext(path)[1].lower() or ext
         else:
             raise ValueError("No image data found in the API response")
+
+        if getattr(settings, 'LINE_ART_OPTIMIZE', True):
+            # Black-and-white drawings fit in a small gray palette PNG
+            optimized = optimize_line_art(image_bytes, settings.LINE_ART_LEVELS)
+            if optimized is not image_bytes:
+                image_bytes, ext = optimized, '.png'
             
         result['image_bytes'] = image_bytes
         
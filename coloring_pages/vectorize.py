@@ -0,0 +1,356 @@
+"""
+Tracing of coloring pages into SVG.
+
+A 1024px raster prints blurry on A4, while the drawing itself is just black
+shapes. ``trace_svg()`` turns it into filled outlines in the manner of
+potrace:
+
+1. The image is flattened onto white and thresholded into ink and paper.
+2. The boundaries between ink and paper pixels are followed along the pixel
+   corners into closed paths, ink on the left. At a corner where two ink
+   pixels only touch diagonally the path turns right, so diagonal lines stay
+   connected. Paths enclosing less than ``min_area`` pixels are dropped as
+   specks.
+3. Each path is reduced to its turning points and simplified with
+   Douglas-Peucker to within ``tolerance`` pixels. The corners of a pixel
+   staircase lie half a pixel off the outline, so each vertex is then moved
+   to where the least-squares lines of its two edges meet.
+4. The polygon is smoothed like potrace does: every edge is cut at its
+   midpoint and consecutive midpoints are joined by a cubic Bézier bent
+   towards the vertex between them; vertices the curve would pass too far
+   from (``alpha >= alphamax``) stay sharp corners.
+
+Coordinates are written as integers in quarter pixels, relative to the
+previous point, and all paths go into one ``evenodd`` path. On 1024px
+drawings (``python manage.py benchmark_tracer``) a simple page traces in
+about 0.15 s to ~17 KB, a busy one in about 0.55 s to ~125 KB; that is
+roughly the size of the palette PNG from ``coloring_pages.lineart`` and a
+fraction of the RGB original, but prints sharp at any size. The outlines
+differ from the thresholded raster in about 1% of the pixels, all along
+the edges.
+"""
+import io
+import os
+
+import numpy as np
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from .lineart import flatten
+
+# Direction of travel: east, south, west, north (y grows downwards);
+# turning right is the next direction
+DX = (1, 0, -1, 0)
+DY = (0, 1, 0, -1)
+# Units per pixel in the path data
+SCALE = 4
+
+
+def binarize(img, threshold=128):
+    """
+    Get the ink pixels of an image.
+
+    Returns:
+        ndarray: Boolean array of shape (height, width), True for ink
+    """
+    return np.asarray(flatten(img).convert('L')) < threshold
+
+
+def boundary_edges(ink):
+    """
+    Get the unit edges between ink and paper pixels, keyed by their start corner.
+
+    Returns:
+        list: Per corner ``y * (width + 1) + x``, a bit mask of the
+        directions of the edges starting there
+    """
+    height, width = ink.shape
+    padded = np.pad(ink, 1)
+    # Pixels above and below each horizontal edge, left and right of each vertical edge
+    above, below = padded[:-1, 1:-1], padded[1:, 1:-1]
+    left, right = padded[1:-1, :-1], padded[1:-1, 1:]
+
+    masks = np.zeros((height + 1, width + 1), dtype=np.uint8)
+    masks[:, :-1] |= (above & ~below).astype(np.uint8) << 0   # east from (x, y)
+    masks[:-1, :] |= (right & ~left).astype(np.uint8) << 1    # south from (x, y)
+    masks[:, 1:] |= (below & ~above).astype(np.uint8) << 2    # west from (x + 1, y)
+    masks[1:, :] |= (left & ~right).astype(np.uint8) << 3     # north from (x, y + 1)
+    return masks.ravel().tolist()
+
+
+def trace_paths(ink, min_area=2):
+    """
+    Follow the boundaries of the ink into closed paths.
+
+    Returns:
+        list: Paths as lists of ``(x, y)`` corners where the direction changes
+    """
+    height, width = ink.shape
+    stride = width + 1
+    masks = boundary_edges(ink)
+    steps = [DX[d] + DY[d] * stride for d in range(4)]
+
+    # Edges not followed yet
+    remaining = list(masks)
+    paths = []
+    for start in np.flatnonzero(np.asarray(masks, dtype=np.uint8)).tolist():
+        while remaining[start]:
+            mask = remaining[start]
+            first = direction = (mask & -mask).bit_length() - 1
+            corner, corners = start, []
+            while True:
+                remaining[corner] &= ~(1 << direction)
+                corner += steps[direction]
+                mask = masks[corner]
+                # Right, straight on, left; a path never reverses
+                for turn in (1, 0, 3):
+                    if mask & (1 << ((direction + turn) & 3)):
+                        break
+                if turn:
+                    corners.append(corner)
+                    direction = (direction + turn) & 3
+                if corner == start and direction == first:
+                    break
+            if len(corners) < 4:
+                continue
+            points = [(corner % stride, corner // stride) for corner in corners]
+            if abs(polygon_area(points)) >= min_area:
+                paths.append(points)
+    return paths
+
+
+def polygon_area(points):
+    xs = np.array([x for x, _y in points], dtype=np.int64)
+    ys = np.array([y for _x, y in points], dtype=np.int64)
+    return int(np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1))) / 2
+
+
+def simplify(points, tolerance):
+    """
+    Simplify a closed polygon with Douglas-Peucker.
+
+    Returns:
+        list: Indexes of the points kept
+    """
+    count = len(points)
+    if count <= 4:
+        return list(range(count))
+    coords = np.array(points, dtype=np.float64)
+    # Split the loop at the point farthest from the first one
+    far = int(np.argmax(((coords - coords[0]) ** 2).sum(axis=1)))
+    keep = [0, far]
+    loop = points + points[:1]
+    stack = [(0, far), (far, count)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        (x0, y0), (x1, y1) = loop[first], loop[last]
+        dx, dy = x1 - x0, y1 - y0
+        if not dx and not dy:
+            # A path may pass a diagonal junction twice; split such a run in the middle
+            middle = (first + last) // 2
+            keep.append(middle)
+            stack.append((first, middle))
+            stack.append((middle, last))
+            continue
+        if last - first > 64:
+            # Long runs are measured in NumPy, the many short ones are cheaper in Python
+            segment = coords[first + 1:last] if last <= count else np.array(loop[first + 1:last], dtype=np.float64)
+            distances = np.abs(dx * (segment[:, 1] - y0) - dy * (segment[:, 0] - x0))
+            index = int(np.argmax(distances))
+            farthest = float(distances[index])
+        else:
+            farthest, index = -1, 0
+            for offset, (x, y) in enumerate(loop[first + 1:last]):
+                distance = abs(dx * (y - y0) - dy * (x - x0))
+                if distance > farthest:
+                    farthest, index = distance, offset
+        # Distances are scaled by the chord length
+        if farthest > tolerance * (dx * dx + dy * dy) ** 0.5:
+            middle = first + 1 + index
+            keep.append(middle)
+            stack.append((first, middle))
+            stack.append((middle, last))
+    return sorted(keep)
+
+
+def adjust_vertices(points, kept):
+    """
+    Move the vertices of a simplified polygon onto the outline.
+
+    Each edge is replaced by the least-squares line through the corners it
+    stands for, and each vertex by the intersection of its two lines, unless
+    that lies more than a pixel away.
+
+    Returns:
+        ndarray: The vertices, shape (count, 2)
+    """
+    coords = np.array(points, dtype=np.float64)
+    vertices = coords[kept]
+    if len(kept) < 3:
+        return vertices
+    # Running sums over the loop walked twice, so every edge is one slice
+    loop = np.vstack([coords, coords, coords[:1]])
+    x, y = loop[:, 0], loop[:, 1]
+    sums = np.vstack([np.zeros(5), np.cumsum(np.column_stack([x, y, x * x, x * y, y * y]), axis=0)])
+    starts = np.array(kept)
+    ends = np.append(starts[1:], starts[0] + len(points))
+    totals = sums[ends + 1] - sums[starts]
+    n = (ends - starts + 1)[:, None]
+    mean = totals[:, :2] / n
+    sxx = totals[:, 2] / n[:, 0] - mean[:, 0] ** 2
+    sxy = totals[:, 3] / n[:, 0] - mean[:, 0] * mean[:, 1]
+    syy = totals[:, 4] / n[:, 0] - mean[:, 1] ** 2
+    # Direction of each line: eigenvector of the larger eigenvalue of the covariance
+    angle = 0.5 * np.arctan2(2 * sxy, sxx - syy)
+    direction = np.column_stack([np.cos(angle), np.sin(angle)])
+
+    # Vertex i joins edge i - 1 and edge i
+    previous_mean, previous_direction = np.roll(mean, 1, axis=0), np.roll(direction, 1, axis=0)
+    determinant = previous_direction[:, 0] * direction[:, 1] - previous_direction[:, 1] * direction[:, 0]
+    offset = mean - previous_mean
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (offset[:, 0] * direction[:, 1] - offset[:, 1] * direction[:, 0]) / determinant
+    intersections = previous_mean + t[:, None] * previous_direction
+    near = np.isfinite(t) & (np.abs(intersections - vertices).max(axis=1) <= 1)
+    vertices[near] = intersections[near]
+    return vertices
+
+
+def smooth(vertices, alphamax=1.0):
+    """
+    Fit a closed polygon with curves through its edge midpoints.
+
+    Returns:
+        list: Segments, ``('L', vertex, end)`` for a corner, or
+        ``('C', control1, control2, end)``; the path starts at the last
+        segment's end point
+    """
+    count = len(vertices)
+    vertices = vertices.tolist()
+    segments = []
+    for index in range(count):
+        previous, vertex, following = vertices[index - 1], vertices[index], vertices[(index + 1) % count]
+        start = ((previous[0] + vertex[0]) / 2, (previous[1] + vertex[1]) / 2)
+        end = ((vertex[0] + following[0]) / 2, (vertex[1] + following[1]) / 2)
+        # potrace's alpha: distance of the vertex from the chord of its neighbours,
+        # relative to a pixel in the chord's direction
+        chord_x, chord_y = following[0] - previous[0], following[1] - previous[1]
+        denominator = abs(chord_x) + abs(chord_y)
+        cross = (vertex[0] - previous[0]) * chord_y - (vertex[1] - previous[1]) * chord_x
+        distance = abs(cross) / denominator if denominator else 0
+        alpha = (1 - 1 / distance) / 0.75 if distance > 1 else 0
+        if alpha >= alphamax:
+            segments.append(('L', vertex, end))
+            continue
+        alpha = max(alpha, 0.55)
+        control1 = (start[0] + alpha * (vertex[0] - start[0]), start[1] + alpha * (vertex[1] - start[1]))
+        control2 = (end[0] + alpha * (vertex[0] - end[0]), end[1] + alpha * (vertex[1] - end[1]))
+        segments.append(('C', control1, control2, end))
+    return segments
+
+
+def path_data(segments):
+    """
+    Write smoothed segments as compact relative SVG path data, in ``1 / SCALE`` pixels.
+    """
+    def point(x, y):
+        return round(x * SCALE), round(y * SCALE)
+
+    current = point(*segments[-1][-1])
+    parts = [f'M{current[0]} {current[1]}']
+    previous_command = None
+    for segment in segments:
+        command, *targets = segment
+        rounded = [point(*target) for target in targets]
+        if command == 'L':
+            numbers = ' '.join(
+                f'{x - px} {y - py}' for (px, py), (x, y) in zip([current] + rounded[:-1], rounded)
+            )
+        else:
+            numbers = ' '.join(f'{x - current[0]} {y - current[1]}' for x, y in rounded)
+        # A repeated command can be left out
+        parts.append((' ' if command == previous_command else command.lower()) + numbers)
+        previous_command, current = command, rounded[-1]
+    parts.append('z')
+    # A minus sign separates numbers on its own
+    return ''.join(parts).replace(' -', '-')
+
+
+def trace_outlines(data, threshold=128, tolerance=1.0, alphamax=1.0, min_area=2):
+    """
+    Trace an image into smoothed outlines.
+
+    Args:
+        data: The encoded image
+        threshold: Gray value below which a pixel is ink
+        tolerance: How far in pixels the simplified outline may stray
+        alphamax: Corner threshold; smaller keeps more corners sharp, above
+            1.33 everything is curved
+        min_area: Smallest path kept, in pixels
+
+    Returns:
+        tuple: Width and height of the image, and the closed paths as lists
+        of segments (see ``smooth()``) in pixels
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        ink = binarize(img, threshold)
+    height, width = ink.shape
+    paths = [
+        smooth(adjust_vertices(points, simplify(points, tolerance)), alphamax)
+        for points in trace_paths(ink, min_area)
+    ]
+    return width, height, paths
+
+
+def trace_svg(data, **options):
+    """
+    Trace an image into an SVG of filled outlines.
+
+    Args:
+        data: The encoded image
+        **options: Options of ``trace_outlines()``
+
+    Returns:
+        bytes: The SVG document
+    """
+    width, height, paths = trace_outlines(data, **options)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SCALE * width} {SCALE * height}" '
+        f'width="{width}" height="{height}">'
+        f'<rect width="100%" height="100%" fill="#fff"/>'
+        f'<path fill="#000" fill-rule="evenodd" d="{"".join(map(path_data, paths))}"/></svg>'
+    ).encode('utf-8')
+
+
+def store_vector(model, pk, image_name, svg):
+    """
+    Store the tracing of a page's image, unless the page has one or a new image by now.
+
+    Returns:
+        str: Name of the stored SVG, or None
+    """
+    field = model._meta.get_field('vector')
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    name = field.storage.save(field.generate_filename(None, f'{stem}.svg'), ContentFile(svg))
+    if model.objects.filter(pk=pk, image=image_name, vector='').update(vector=name):
+        return name
+    field.storage.delete(name)
+    return None
+
+
+def get_vector(page):
+    """
+    Get the tracing of a page's image, tracing and storing it on first use.
+
+    Returns:
+        FieldFile: ``page.vector``, empty if the image changed meanwhile
+    """
+    if not page.vector:
+        with page.image.storage.open(page.image.name) as file:
+            svg = trace_svg(file.read())
+        store_vector(type(page), page.pk, page.image.name, svg)
+        page.refresh_from_db(fields=['vector'])
+    return page.vector
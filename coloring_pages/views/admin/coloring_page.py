@@ -10,8 +10,9 @@ from django.utils.translation import gettext_lazy as _
 
 from ...models.coloring_page import ColoringPage
 from ...forms import ColoringPageForm
-from . import generate_coloring_page, confirm_coloring_page
+from . import generate_coloring_page, confirm_coloring_page, similar_prompts
 from ...utils import generate_coloring_page_image, generate_titles_and_descriptions
+from ...search import get_search_backend
 
 class ColoringPageAddForm(forms.ModelForm):
     class Meta:
@@ -26,10 +27,11 @@ class ColoringPageAddForm(forms.ModelForm):
         })
 
 class ColoringPageAdmin(admin.ModelAdmin):
-    list_display = ('title_en', 'title_de', 'seo_url_en_column', 'seo_url_de_column', 'created_at', 'updated_at')
-    list_filter = ('created_at', 'updated_at')
+    list_display = ('title_en', 'title_de', 'seo_url_en_column', 'seo_url_de_column', 'image_status',
+                    'created_at', 'updated_at')
+    list_filter = ('image_status', 'created_at', 'updated_at')
     search_fields = ('title_en', 'title_de', 'description_en', 'description_de', 'prompt')
-    readonly_fields = ('created_at', 'updated_at', 'thumbnail_preview', 'seo_url_en', 'seo_url_de')
+    readonly_fields = ('created_at', 'updated_at', 'thumbnail_preview', 'seo_url_en', 'seo_url_de', 'image_status')
     fieldsets = (
         ('English Content', {
             'fields': ('title_en', 'description_en')
@@ -39,7 +41,8 @@ class ColoringPageAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Metadata', {
-            'fields': ('prompt', 'image', 'thumbnail', 'seo_url_en', 'seo_url_de', 'created_at', 'updated_at'),
+            'fields': ('prompt', 'image', 'image_status', 'thumbnail', 'seo_url_en', 'seo_url_de', 'created_at',
+                       'updated_at'),
             'classes': ('collapse',)
         }),
     )
@@ -150,6 +153,13 @@ class ColoringPageAdmin(admin.ModelAdmin):
         
         super().save_model(request, obj, form, change)
     
+    def get_search_results(self, request, queryset, search_term):
+        """Run the changelist search through the full-text search backend"""
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        ids = get_search_backend().search_ids(search_term)
+        return queryset.filter(pk__in=ids), False
+    
     def thumbnail_preview(self, obj):
         if obj.thumbnail:
             return format_html(
@@ -170,6 +180,11 @@ class ColoringPageAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(generate_coloring_page),
                 name='coloring_pages_coloringpage_generate',
             ),
+            path(
+                'generate/similar/',
+                self.admin_site.admin_view(similar_prompts),
+                name='coloring_pages_coloringpage_similar_prompts',
+            ),
             path(
                 'confirm/',
                 self.admin_site.admin_view(confirm_coloring_page),
@@ -9,13 +9,14 @@ from django.contrib import messages
 from django.core.files.base import ContentFile
 from django.http import JsonResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import View
 from django.urls import reverse
 
 from coloring_pages.models.coloring_page import ColoringPage
 from coloring_pages.models.system_prompt import SystemPrompt
-from coloring_pages.models.base import create_unique_slug
+from coloring_pages.search.duplicates import find_duplicate_pages, image_hash_from_file
 from coloring_pages.utils import generate_titles_and_descriptions, generate_coloring_page_image
 
 
@@ -34,6 +35,18 @@ class ConfirmColoringPageView(View):
         context.update(kwargs)
         return context
     
+    def get_duplicates(self, pending_page):
+        """
+        Find catalog pages that look like the pending image. The hash is kept
+        in the session so it is only computed once per generated image.
+        """
+        if pending_page.get('image_hash') is None:
+            try:
+                pending_page['image_hash'] = image_hash_from_file(pending_page['image_path'])
+            except (KeyError, OSError):
+                return []
+        return find_duplicate_pages(pending_page['image_hash'])
+
     def get(self, request, *args, **kwargs):
         """Handle GET requests."""
         if 'pending_page' not in request.session:
@@ -56,11 +69,15 @@ class ConfirmColoringPageView(View):
         # Convert to string for template comparison
         current_system_prompt_id = str(current_system_prompt_id) if current_system_prompt_id is not None else ''
 
+        duplicates = self.get_duplicates(pending_page)
+        request.session.modified = True
+
         # For GET requests, show the confirmation page
         return render(request, self.template_name, self.get_context_data(
             pending_page=pending_page,
             system_prompts=system_prompts,
-            current_system_prompt_id=current_system_prompt_id
+            current_system_prompt_id=current_system_prompt_id,
+            duplicates=duplicates,
         ))
     
     def is_ajax(self, request):
@@ -104,7 +121,7 @@ class ConfirmColoringPageView(View):
                     except (SystemPrompt.DoesNotExist, ValueError):
                         pass  # Skip if system prompt not found
                 
-                # Save the main image
+                # Save the main image, which saves the page with its SEO URLs
                 with open(pending_page['image_path'], 'rb') as f:
                     image_content = ContentFile(f.read())
                     page.image.save(os.path.basename(pending_page['image_path']), image_content)
@@ -114,14 +131,6 @@ class ConfirmColoringPageView(View):
                     thumb_content = ContentFile(f.read())
                     page.thumbnail.save(os.path.basename(pending_page['thumb_path']), thumb_content)
                 
-                # Save the page first to get an ID
-                page.save()
-                
-                # Generate and save SEO URLs
-                page.seo_url_en = create_unique_slug(ColoringPage, page.title_en, 'title_en', 'seo_url_en')
-                page.seo_url_de = create_unique_slug(ColoringPage, page.title_de, 'title_de', 'seo_url_de')
-                page.save(update_fields=['seo_url_en', 'seo_url_de'])
-                
                 # Clean up temp files
                 if os.path.exists(pending_page['temp_dir']):
                     shutil.rmtree(pending_page['temp_dir'])
@@ -219,10 +228,12 @@ class ConfirmColoringPageView(View):
                     'thumb_path': temp_thumb_path,
                     'temp_dir': temp_dir,
                     'system_prompt_id': system_prompt.id if system_prompt else None,
+                    'image_hash': None,
                 }
                 
                 # Update the session with the new data
                 request.session['pending_page'].update(pending_update)
+                duplicates = self.get_duplicates(request.session['pending_page'])
                 request.session.modified = True
                 
                 # Read the new thumbnail and encode it as base64 for the response
@@ -238,7 +249,12 @@ class ConfirmColoringPageView(View):
                         'title_de': title_de,
                         'description_en': description_en,
                         'description_de': description_de,
-                        'prompt': prompt
+                        'prompt': prompt,
+                        'duplicates_html': render_to_string(
+                            'admin/coloring_pages/coloringpage/includes/duplicate_warning.html',
+                            {'duplicates': duplicates},
+                            request=request,
+                        ),
                     })
                 
                 # For non-AJAX requests, redirect back to the confirmation page
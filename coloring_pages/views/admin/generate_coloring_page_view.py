@@ -14,12 +14,38 @@ from django.views.decorators.csrf import csrf_exempt
 
 from coloring_pages.forms import GenerateColoringPageForm
 from coloring_pages.models.coloring_page import ColoringPage
+from coloring_pages.search.prompts import find_similar_pages
 
 
 def is_ajax(request):
     return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
 
 
+def serialize_similar_pages(pages):
+    return [
+        {
+            'id': page.pk,
+            'title': page.title_en,
+            'prompt': page.prompt,
+            'similarity': round(page.similarity, 2),
+            'thumbnail': page.thumbnail.url if page.thumbnail else '',
+            'admin_url': reverse('admin:coloring_pages_coloringpage_change', args=[page.pk]),
+            'url': page.get_absolute_url(),
+        }
+        for page in pages
+    ]
+
+
+def similar_prompts(request):
+    """
+    Return the pages whose prompts are similar to ``?prompt=`` as JSON, for
+    the generate form to show while the admin types.
+    """
+    prompt = request.GET.get('prompt', '').strip()
+    pages = find_similar_pages(prompt) if prompt else []
+    return JsonResponse({'prompt': prompt, 'similar': serialize_similar_pages(pages)})
+
+
 class GenerateColoringPageView(View):
     """
     Admin view for generating a new coloring page using AI.
@@ -61,6 +87,16 @@ class GenerateColoringPageView(View):
             messages.error(request, _('Please enter a prompt'))
             return render(request, self.template_name, self.get_context_data(form=form))
         
+        # Offer existing pages with a similar prompt before paying for a new image
+        if not request.POST.get('generate_anyway'):
+            similar_pages = find_similar_pages(prompt)
+            if similar_pages:
+                if is_ajax(request):
+                    return JsonResponse({'similar': serialize_similar_pages(similar_pages)})
+                return render(request, self.template_name, self.get_context_data(
+                    form=form, similar_pages=similar_pages
+                ))
+        
         # Generate titles and descriptions
         try:
             from coloring_pages.utils import generate_titles_and_descriptions
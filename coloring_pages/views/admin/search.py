@@ -1,4 +1,12 @@
+from django.conf import settings
 from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from ...models.search import DailySearchRollup
+
+TREND_PERIODS = (7, 30, 90)
+
 
 class SearchQueryAdmin(admin.ModelAdmin):
     list_display = ('query', 'language', 'result_count', 'created_at', 'ip_address')
@@ -7,3 +15,42 @@ class SearchQueryAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'created_at'
     list_per_page = 20
+    change_list_template = 'admin/coloring_pages/searchquery/change_list.html'
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                'trends/',
+                self.admin_site.admin_view(self.trends_view),
+                name='coloring_pages_searchquery_trends',
+            ),
+        ]
+        return custom_urls + urls
+
+    def trends_view(self, request):
+        """Show the top and zero-result queries from the daily rollups."""
+        try:
+            days = int(request.GET.get('days', 30))
+        except ValueError:
+            days = 30
+        if days not in TREND_PERIODS:
+            days = 30
+        language = request.GET.get('language') or None
+        if language not in dict(settings.LANGUAGES):
+            language = None
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Search trends',
+            'days': days,
+            'periods': TREND_PERIODS,
+            'language': language,
+            'languages': settings.LANGUAGES,
+            'top_queries': DailySearchRollup.get_top_queries(days, limit=25, language=language),
+            'zero_result_queries': DailySearchRollup.get_top_queries(
+                days, limit=25, language=language, zero_results=True
+            ),
+        }
+        return TemplateResponse(request, 'admin/coloring_pages/searchquery/trends.html', context)
@@ -0,0 +1,27 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from ...models.task import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'status', 'attempts', 'max_attempts', 'run_at', 'updated_at')
+    list_filter = ('status', 'name')
+    search_fields = ('key', 'last_error')
+    readonly_fields = ('name', 'key', 'payload', 'status', 'attempts', 'run_at', 'locked_at', 'last_error',
+                       'created_at', 'updated_at')
+    date_hierarchy = 'created_at'
+    list_per_page = 50
+    actions = ['retry_tasks']
+
+    def has_add_permission(self, request):
+        # Tasks are queued by the code that needs them
+        return False
+
+    @admin.action(description=_('Retry selected tasks'))
+    def retry_tasks(self, request, queryset):
+        count = queryset.exclude(status=Task.RUNNING).update(
+            status=Task.PENDING, attempts=0, run_at=timezone.now(), locked_at=None
+        )
+        messages.success(request, _('%(count)d tasks queued again.') % {'count': count})
@@ -2,9 +2,13 @@
 Views for individual coloring page details and downloads.
 """
 import re
-from django.http import Http404, HttpResponse
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_safe
 from ..models.coloring_page import ColoringPage
+from ..printing import PAPER_SIZES, get_print_pdf
+from ..serving import file_etag, serve_stored_file
+from ..vectorize import get_vector
 
 def page_detail(request, pk):
     """
@@ -13,21 +17,84 @@ def page_detail(request, pk):
     page = get_object_or_404(ColoringPage, pk=pk)
     return redirect(page.get_absolute_url(), permanent=True)
 
+@require_safe
 def download_image(request, pk):
     """
     Download the coloring page image.
+
+    The image is streamed in chunks, or handed to the web server or storage
+    when ``MEDIA_DOWNLOAD_OFFLOAD`` is set (see ``coloring_pages.serving``).
     """
-    coloring_page = get_object_or_404(ColoringPage, pk=pk)
+    coloring_page = get_object_or_404(
+        ColoringPage.objects.only('image', 'title_en', 'title_de', 'updated_at'), pk=pk
+    )
     if not coloring_page.image:
         raise Http404("Image not found")
     
+    image = coloring_page.image
+    return serve_stored_file(
+        request, image.storage, image.name, 'image/png',
+        etag=file_etag(image.name, coloring_page.updated_at.timestamp()),
+        filename=f'{get_download_name(request, coloring_page)}.png',
+    )
+
+@require_safe
+def download_vector(request, pk):
+    """
+    Download the coloring page traced as SVG, for sharp prints at any size.
+
+    The first download traces the image (see ``coloring_pages.vectorize``)
+    and keeps the result; ``python manage.py trace_vectors`` does so ahead.
+    """
+    coloring_page = get_object_or_404(
+        ColoringPage.objects.only('image', 'vector', 'title_en', 'title_de', 'updated_at'), pk=pk
+    )
+    if not coloring_page.image:
+        raise Http404("Image not found")
+    try:
+        vector = get_vector(coloring_page)
+    except OSError:
+        raise Http404("Image not found")
+    if not vector:
+        raise Http404("Image not found")
+
+    return serve_stored_file(
+        request, vector.storage, vector.name, 'image/svg+xml',
+        etag=file_etag(vector.name, coloring_page.updated_at.timestamp()),
+        filename=f'{get_download_name(request, coloring_page)}.svg',
+    )
+
+@require_safe
+def print_pdf(request, pk):
+    """
+    Serve the coloring page as a PDF for printing, on A4 or with
+    ``?size=letter`` on US Letter, shown inline by the browser.
+
+    Each page and size is rendered once (see ``coloring_pages.printing``).
+    """
+    size = request.GET.get('size', 'a4')
+    if size not in PAPER_SIZES:
+        raise Http404("Unknown paper size")
+    coloring_page = get_object_or_404(ColoringPage.objects.only('image', 'updated_at'), pk=pk)
+    if not coloring_page.image:
+        raise Http404("Image not found")
+    try:
+        name = get_print_pdf(coloring_page, size)
+    except OSError:
+        raise Http404("Image not found")
+
+    return serve_stored_file(
+        request, coloring_page.image.storage, name, 'application/pdf',
+        etag=file_etag(name, coloring_page.updated_at.timestamp()),
+    )
+
+def get_download_name(request, coloring_page):
+    """
+    File name for downloads, from the title in the current language.
+    """
     # Get the appropriate title based on the current language
     language = request.LANGUAGE_CODE or 'en'
     title = getattr(coloring_page, f'title_{language[:2]}', 'coloring_page')
     
     # Clean up the filename to be URL-safe
-    filename = re.sub(r'[^\w\s-]', '', title).strip().replace(' ', '_')
-    
-    response = HttpResponse(coloring_page.image.read(), content_type='image/png')
-    response['Content-Disposition'] = f'attachment; filename="{filename}.png"'
-    return response
+    return re.sub(r'[^\w\s-]', '', title).strip().replace(' ', '_')
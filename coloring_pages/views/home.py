@@ -3,10 +3,14 @@ Home view for the coloring pages application.
 """
 from django.shortcuts import render
 from ..models.coloring_page import ColoringPage
+from ..pagecache import cache_anonymous_page, set_page_validators
 
+@cache_anonymous_page
 def home(request):
     """
     Render the home page with the latest coloring pages.
     """
-    latest_pages = ColoringPage.objects.all()[:3]
-    return render(request, 'coloring_pages/home.html', {'latest_pages': latest_pages})
+    latest_pages = list(ColoringPage.objects.all()[:3])
+    response = render(request, 'coloring_pages/home.html', {'latest_pages': latest_pages})
+    set_page_validators(response, pages=latest_pages, listing=True)
+    return response
@@ -0,0 +1,61 @@
+"""
+ZIP downloads of several coloring pages at once.
+"""
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import content_disposition_header, parse_etags, quote_etag
+from django.utils.text import slugify
+from django.utils.translation import get_language
+from django.views.decorators.http import require_safe
+from ..models.coloring_page import ColoringPage
+from ..packs import get_max_pages, get_search_pack, iter_zip, pack_entries, pack_key
+from ..search.cache import normalize_query, search_page
+from ..serving import serve_stored_file
+
+@require_safe
+def download_pack(request):
+    """
+    Download up to ``PACK_MAX_PAGES`` pages as one ZIP file: the pages chosen
+    with ``?ids=1,2,3``, streamed, or the first results of a search with
+    ``?q=``, built once and then served as a stored file.
+    """
+    language = (get_language() or 'en')[:2]
+    max_pages = get_max_pages()
+    query = normalize_query(request.GET.get('q', ''))
+    if query:
+        ids = search_page(query, language, 1, max_pages)['ids']
+    else:
+        try:
+            ids = list(dict.fromkeys(int(value) for value in request.GET.get('ids', '').split(',') if value))
+        except ValueError:
+            return HttpResponseBadRequest("Invalid page ids")
+        if not ids or len(ids) > max_pages:
+            return HttpResponseBadRequest(f"Choose between 1 and {max_pages} pages")
+
+    pages = ColoringPage.objects.only('image', 'title_en', 'title_de', 'updated_at').in_bulk(ids)
+    pages = [pages[pk] for pk in ids if pk in pages and pages[pk].image]
+    if not pages:
+        raise Http404("No coloring pages found")
+
+    # Answered before any file is touched
+    etag = quote_etag(pack_key(pages, language))
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and etag in parse_etags(if_none_match):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    filename = f'{slugify(query) or "coloring-pages"}.zip'
+    if query:
+        storage = ColoringPage._meta.get_field('image').storage
+        name = get_search_pack(query, language, pages, storage)
+        return serve_stored_file(request, storage, name, 'application/zip', etag=etag, filename=filename)
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type='application/zip')
+    else:
+        response = StreamingHttpResponse(iter_zip(pack_entries(pages, language)), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
@@ -1,47 +1,57 @@
 """
 Search functionality for coloring pages.
 """
-from django.db.models import Q
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render
-from django.core.paginator import Paginator
+from django.utils.cache import patch_cache_control
 from django.utils.translation import get_language
 from ..models.search import SearchQuery
 from ..models.coloring_page import ColoringPage
+from ..pagination import ListingPaginator
+from ..search import hydrate_pages
+from ..search.cache import search_page
+from ..search.querylog import search_log
+from ..search.suggest import suggest
+
+RESULTS_PER_PAGE = 8
 
 def search(request):
     """
     Search for coloring pages with tracking of search queries.
     """
     query = request.GET.get('q', '').strip()
+    current_language = get_language() or 'en'
+    page_number = request.GET.get('page', 1)
+    is_fuzzy = False
+    suggestions = []
     
-    # Search in both English and German fields
+    # Search in both English and German fields through the search backend.
+    # Results are cached per query, language and page as a list of ids, so
+    # only the displayed page is loaded from the database.
     if query:
-        pages = ColoringPage.objects.filter(
-            Q(title_en__icontains=query) |
-            Q(description_en__icontains=query) |
-            Q(title_de__icontains=query) |
-            Q(description_de__icontains=query) |
-            Q(prompt__icontains=query)
-        ).distinct()
+        results = search_page(query, current_language, page_number, RESULTS_PER_PAGE)
         
-        # Track search query if not a duplicate
-        if not SearchQuery.is_duplicate_search(request, query):
-            SearchQuery.create_from_request(request, query, pages.count())
+        # Track search query if not a duplicate. The exact result count is
+        # logged so misspelled queries never become suggestions themselves.
+        # The write happens in the background, outside of this request.
+        search_log.log(request, query, results['exact_count'])
+        
+        # The paginator only needs the total count for the page links
+        paginator = ListingPaginator(range(results['count']), RESULTS_PER_PAGE)
+        page_obj = paginator.page(results['number'])
+        page_obj.object_list = hydrate_pages(results['ids'])
+        is_fuzzy = results['is_fuzzy']
+        suggestions = results['suggestions']
     else:
-        pages = ColoringPage.objects.all()
-    
-    # Order by most recent first
-    pages = pages.order_by('-created_at')
-    
-    # Pagination
-    paginator = Paginator(pages, 8)  # 8 items per page
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+        # Order by most recent first. Deep pages are fetched with a keyset
+        # cursor on (created_at, id) instead of an OFFSET.
+        paginator = ListingPaginator(ColoringPage.objects.order_by('-created_at', '-id'), RESULTS_PER_PAGE)
+        page_obj = paginator.get_listing_page(request.GET)
     
     # Get popular searches for the sidebar (only show on empty search)
     popular_searches = []
     if not query:
-        current_language = get_language() or 'en'
         popular_searches = SearchQuery.get_popular_searches(
             days=30, 
             limit=5,
@@ -53,6 +63,8 @@ def search(request):
         'page_obj': page_obj,
         'popular_searches': popular_searches,
         'is_search': bool(query),
+        'is_fuzzy': is_fuzzy,
+        'suggestions': suggestions,
     }
     
     # Store current search in session for back navigation
@@ -62,9 +74,34 @@ def search(request):
             
         request.session['last_search'] = {
             'query': query,
-            'result_count': pages.count(),
+            'result_count': paginator.count,
             'timestamp': request.session.get('last_search', {}).get('timestamp', ''),
-            'language': get_language() or 'en'  # Store the language with the search
+            'language': current_language  # Store the language with the search
         }
     
     return render(request, 'coloring_pages/search.html', context)
+
+
+def search_suggest(request):
+    """
+    Suggest page titles and popular queries for a search prefix as JSON.
+    
+    Answered from in-memory prefix indexes without a database query, and
+    cacheable by browsers and proxies for ``SEARCH_SUGGEST_MAX_AGE`` seconds.
+    """
+    query = request.GET.get('q', '').strip()
+    current_language = get_language() or 'en'
+    results = suggest(query, current_language)
+    
+    titles = []
+    for pk, title, seo_url_en, seo_url_de in results['titles']:
+        page = ColoringPage(pk=pk, seo_url_en=seo_url_en, seo_url_de=seo_url_de)
+        titles.append({'title': title, 'url': page.get_absolute_url(current_language)})
+    
+    response = JsonResponse({
+        'query': query,
+        'titles': titles,
+        'queries': results['queries'],
+    })
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'SEARCH_SUGGEST_MAX_AGE', 300))
+    return response
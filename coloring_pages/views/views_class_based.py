@@ -3,9 +3,13 @@ Class-based views for the coloring pages application.
 """
 from django.views.generic import DetailView, TemplateView
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from ..models.coloring_page import ColoringPage
+from ..models.related import RelatedPage
+from ..pagecache import cache_anonymous_page, set_page_validators
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class ColoringPageDetailView(DetailView):
     """
     View for displaying a single coloring page with SEO-friendly URLs.
@@ -39,9 +43,16 @@ class ColoringPageDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['current_year'] = timezone.now().year
+        context['related_pages'] = list(RelatedPage.get_related_pages(self.object))
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        set_page_validators(response, pages=[self.object, *context['related_pages']])
+        return response
 
+
+@method_decorator(cache_anonymous_page, name='dispatch')
 class ImprintView(TemplateView):
     """
     View for displaying the imprint page.
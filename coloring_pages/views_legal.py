@@ -1,7 +1,11 @@
 from django.shortcuts import render
 from django.utils.translation import get_language
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
+from .pagecache import cache_anonymous_page
+
+@method_decorator(cache_anonymous_page, name='dispatch')
 class LegalPageView(TemplateView):
     template_name = "coloring_pages/legal.html"
     
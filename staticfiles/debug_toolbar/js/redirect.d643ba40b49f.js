@@ -0,0 +1 @@
+document.getElementById("redirect_to").focus();